@@ -2,10 +2,10 @@ import sys
 import uvicorn
 
 def dev():
-    uvicorn.run("app.main:app", reload=True, port=8000)
+    uvicorn.run("app.main:create_app", factory=True, reload=True, port=8000)
 
 def prod():
-    uvicorn.run("app.main:app", host="0.0.0.0", port=8000)
+    uvicorn.run("app.main:create_app", factory=True, host="0.0.0.0", port=8000)
 
 def main():
     cmd = (sys.argv[1:] + ["dev"])[0]
@@ -2,7 +2,8 @@
 Configuration management for the Chat2Calendar server.
 """
 
-from typing import List, Optional
+from functools import lru_cache
+from typing import Any, List, Optional
 from pydantic_settings import BaseSettings
 
 
@@ -30,11 +31,90 @@ class Settings(BaseSettings):
     # OpenAI
     openai_api_key: str
     openai_model: str = "gpt-4o-mini"
+    # Model routing (see app/modules/ai/model_router.py); unset falls back to openai_model
+    openai_fast_model: Optional[str] = None
+    openai_strong_model: Optional[str] = None
+    
+    # Prompt history: last N messages verbatim, older ones folded into a rolling summary
+    conversation_history_limit: int = 10
+    conversation_summary_enabled: bool = True
+    conversation_summary_min_batch: int = 6
+    conversation_summary_max_chars: int = 800
+    
+    # Answer simple "what do I have <today/tomorrow/...>" messages without the LLM
+    intent_fast_path_enabled: bool = True
+    
+    # Fetch the range a message mentions ("tomorrow", "השבוע") while the first completion runs
+    speculative_prefetch_enabled: bool = False
+    
+    # Local event cache (0 disables) and update/delete lookup window cap
+    event_cache_ttl_seconds: int = 30
+    event_cache_watched_ttl_seconds: int = 900
+    event_search_max_window_days: int = 28
+    
+    # ETags of fetched events/calendar lists for conditional requests (0 disables)
+    etag_store_max_entries: int = 2000
+    
+    # Hedged event reads: resend after the p-th percentile latency, for at most BUDGET of requests
+    google_hedge_enabled: bool = False
+    google_hedge_percentile: float = 95.0
+    google_hedge_budget: float = 0.05
+    google_hedge_min_delay_ms: float = 50.0
+    
+    # create_event: an identical create within this window returns the first event (0 disables)
+    create_dedupe_ttl_seconds: int = 600
+    
+    # Per-user cache of Google userinfo (reused by /auth/refresh) and calendar lists
+    profile_cache_userinfo_ttl_seconds: int = 3600
+    profile_cache_max_users: int = 10000
+    
+    # find_free_slots: use Google's freeBusy endpoint instead of listing events
+    free_busy_use_google: bool = True
+    
+    # "all calendars" queries: calendar list cache (in the profile cache) and parallel fetch limit
+    calendar_list_ttl_seconds: int = 600
+    calendar_fanout_concurrency: int = 4
+    
+    # Google push notifications: public URL of /calendar/notifications (unset disables)
+    calendar_webhook_url: Optional[str] = None
+    calendar_watch_ttl_seconds: int = 7 * 24 * 3600
+    calendar_watch_renew_before_seconds: int = 3600
+    
+    # Background jobs for bulk operations; JOB_STORE_PATH keeps them across restarts
+    job_queue_max_size: int = 100
+    job_workers: int = 2
+    job_store_path: Optional[str] = None
+    job_retention_seconds: int = 24 * 3600
+    job_progress_save_interval_seconds: float = 1.0
+    
+    # Conversations on local disk without Redis (see app/modules/ai/memory_store.py); unset keeps them in memory only
+    conversation_store_path: Optional[str] = None
+    conversation_flush_interval_ms: int = 200
+    # compact once the log reaches this fraction of the last snapshot (and at least the minimum size)
+    conversation_snapshot_growth: float = 1.0
+    conversation_snapshot_min_bytes: int = 16 * 1024 * 1024
+    conversation_fsync: bool = True
+    
+    # Agent turn recording (JSONL file, see app/modules/ai/recording.py)
+    agent_record_path: Optional[str] = None
+    
+    # /ai/ws chat sockets (see app/modules/ai/chat_socket.py)
+    ws_max_connections: int = 1000
+    ws_max_connections_per_user: int = 5
+    ws_auth_timeout_seconds: float = 10.0
+    ws_idle_timeout_seconds: float = 300.0
+    ws_max_message_chars: int = 4000
+    ws_token_refresh_before_seconds: int = 300
     
     # Redis (Optional)
     redis_url: Optional[str] = None
     redis_password: Optional[str] = None
     
+    # Event-loop watchdog
+    loop_watchdog_enabled: bool = False
+    loop_watchdog_interval_ms: int = 100
+    loop_watchdog_threshold_ms: int = 250
+    
     # CORS
     allowed_origins: List[str] = ["http://localhost:3000", "http://localhost:8080"]
     allowed_methods: List[str] = ["GET", "POST", "PUT", "DELETE", "OPTIONS"]
@@ -45,8 +125,21 @@ class Settings(BaseSettings):
         case_sensitive = False
 
 
-# Global settings instance
-settings = Settings()
+@lru_cache(maxsize=None)
+def get_settings() -> Settings:
+    """The process-wide Settings, read from the environment on first call."""
+    return Settings()
+
+
+class _LazySettings:
+    """Stands in for Settings until an attribute is first read."""
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(get_settings(), name)
+
+
+# Global settings instance; importing it doesn't read the environment yet
+settings: Settings = _LazySettings()  # type: ignore[assignment]
 
 
 
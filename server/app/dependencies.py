@@ -2,11 +2,12 @@
 FastAPI dependencies for the Chat2Calendar server.
 """
 
-from fastapi import Depends
+from fastapi import Depends, Request
+from starlette.requests import HTTPConnection
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Optional
 from fastapi.security import OAuth2PasswordBearer
-from app.modules.auth.auth_service import AuthService
+from app.services import Services
 
 from fastapi import HTTPException, status
 
@@ -15,10 +16,18 @@ from fastapi import HTTPException, status
 # Security scheme
 security = HTTPBearer()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
-auth_service = AuthService()
 
-def get_current_user(token: str = Depends(oauth2_scheme)) -> dict:
-    payload = auth_service.verify_token(token)
+
+def get_services(connection: HTTPConnection) -> Services:
+    """The app's shared services (see create_app in app/main.py); works for websockets too."""
+    return connection.app.state.services
+
+
+def get_current_user(
+    request: Request,
+    token: str = Depends(oauth2_scheme),
+) -> dict:
+    payload = get_services(request).auth.verify_token(token)
     if not payload:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
     return {
@@ -29,19 +38,21 @@ def get_current_user(token: str = Depends(oauth2_scheme)) -> dict:
     }
 
 def get_optional_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ) -> Optional[dict]:
     """
     Get current authenticated user from JWT token (optional).
     Returns None if no valid token is provided.
-    
+
     Args:
+        request: Current request
         credentials: HTTP Bearer token credentials
-        
+
     Returns:
         dict | None: User information from token or None
     """
     try:
-        return get_current_user(credentials)
+        return get_current_user(request, credentials.credentials)
     except HTTPException:
         return None
@@ -1,32 +1,65 @@
+"""
+Application factory.
+
+Run with:
+    uvicorn --factory app.main:create_app
+"""
+
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import settings
 from app.modules.auth.auth_controller import router as auth_router
 from app.modules.ai.ai_controller import router as ai_router
+from app.modules.calendar.calendar_controller import router as calendar_router
+from app.services import Services
 from app.shared.middleware.app_auth import AppAuthMiddleware
 from app.shared.middleware.google_token import GoogleAccessTokenMiddleware
+from app.shared.metrics import metrics
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    services: Services = app.state.services
+    await services.start()
+    try:
+        yield
+    finally:
+        await services.stop()
+
+
+def create_app() -> FastAPI:
+    app = FastAPI(title=settings.app_name, debug=settings.debug, lifespan=lifespan)
+    app.state.services = Services()
+
+    app.add_middleware(
+        AppAuthMiddleware,
+        protected_prefixes=("/ai",))
+    app.add_middleware(
+        GoogleAccessTokenMiddleware,
+        protected_prefixes=("/ai",))
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.allowed_origins,
+        allow_credentials=True,
+        allow_methods=settings.allowed_methods,
+        allow_headers=settings.allowed_headers,
+    )
+
+    app.include_router(auth_router)
+    app.include_router(ai_router)
+    app.include_router(calendar_router)
+
+    @app.get("/health")
+    def health():
+        return {"status": "ok"}
+
+    @app.get("/metrics")
+    def get_metrics():
+        return metrics.snapshot()
 
-app = FastAPI(title=settings.app_name, debug=settings.debug)
-
-app.add_middleware(
-    AppAuthMiddleware,
-    protected_prefixes=("/ai",))
-app.add_middleware(
-    GoogleAccessTokenMiddleware,
-    protected_prefixes=("/ai",))
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.allowed_origins,
-    allow_credentials=True,
-    allow_methods=settings.allowed_methods,
-    allow_headers=settings.allowed_headers,
-)
-
-app.include_router(auth_router)
-app.include_router(ai_router)
-
-@app.get("/health")
-def health():
-    return {"status": "ok"}
\ No newline at end of file
+    return app
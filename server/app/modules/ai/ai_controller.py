@@ -1,32 +1,21 @@
-from typing import Optional
+import json
+from typing import Any, AsyncIterator, Dict, Optional
 
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, WebSocket
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from openai import OpenAI
 
-from app.config import settings
-from app.modules.ai.calendar_agent import CalendarAgent
-from app.modules.ai.memory import ConversationMemory
-from app.modules.calendar.google_calendar_service import GoogleCalendarService
+from app.dependencies import get_services
+from app.modules.ai.chat_socket import ChatSocket
+from app.modules.ai.recording import chat_turn
+from app.services import Services
+from app.shared.disconnect import run_until_disconnected
+from app.shared.jobs import Job
 
 
 router = APIRouter()
 
 
-# ---- singletons ----
-
-openai_client = OpenAI(api_key=settings.openai_api_key)
-
-calendar_service = GoogleCalendarService()
-memory = ConversationMemory()
-
-agent = CalendarAgent(
-    client=openai_client,
-    service=calendar_service,
-    memory=memory,
-)
-
-
 # ---- API models ----
 
 class ChatRequest(BaseModel):
@@ -40,16 +29,30 @@ class ChatResponse(BaseModel):
     conversation_id: str
 
 
+class JobResponse(BaseModel):
+    id: str
+    kind: str
+    status: str
+    done: int
+    total: int
+    result: Dict[str, Any]
+    error: Optional[str] = None
+
+
 # ---- endpoint ----
 
 @router.post("/ai/message", response_model=ChatResponse)
-async def chat_message(req: ChatRequest, request: Request) -> ChatResponse:
+async def chat_message(
+    req: ChatRequest,
+    request: Request,
+    services: Services = Depends(get_services),
+) -> Any:
     """
     Entry point from the frontend:
     - Receives message + timezone + optional conversation_id.
     - Reads user_id and google_access_token from request.state (middleware).
     - Manages conversation id via memory.
-    - Delegates to CalendarAgent.
+    - Delegates to CalendarAgent; the turn is cancelled if the client disconnects.
     """
 
     user_id = getattr(request.state, "user_id", "demo-user")
@@ -62,19 +65,103 @@ async def chat_message(req: ChatRequest, request: Request) -> ChatResponse:
             conversation_id=req.conversation_id or "",
         )
 
+    memory = services.memory
+
+    # jobs recovered after a restart wait for a fresh token from their user
+    services.job_queue.resume(user_id, access_token)
+
     conversation_id = req.conversation_id
     if not conversation_id or not memory.conversation_exists(user_id, conversation_id):
         conversation_id = memory.start_conversation(user_id)
 
-    reply = await agent.handle_user_message(
-        user_id=user_id,
-        conversation_id=conversation_id,
-        user_message=req.message,
-        user_timezone=req.timezone,
-        access_token=access_token,
+    turn_recording = chat_turn(
+        services.recorder, services.agent, user_id, conversation_id, req.message, req.timezone
     )
 
+    with turn_recording as turn:
+        reply = await run_until_disconnected(
+            request,
+            services.agent.handle_user_message(
+                user_id=user_id,
+                conversation_id=conversation_id,
+                user_message=req.message,
+                user_timezone=req.timezone,
+                access_token=access_token,
+            ),
+        )
+        if reply is None:
+            # nobody is listening; 499 is nginx's "client closed request"
+            turn["cancelled"] = True
+            return Response(status_code=499)
+        turn["reply"] = reply
+
     return ChatResponse(
         reply=reply,
         conversation_id=conversation_id,
     )
+
+
+@router.websocket("/ai/ws")
+async def chat_socket(
+    websocket: WebSocket,
+    services: Services = Depends(get_services),
+) -> None:
+    """
+    Same conversation as /ai/message over one long-lived connection:
+    authenticated once, with progress updates while the agent works.
+    See app/modules/ai/chat_socket.py for the protocol.
+    """
+    await ChatSocket(websocket, services, services.chat_sockets).run()
+
+
+# ---- background jobs ----
+
+def _get_user_job(job_id: str, request: Request, services: Services) -> Job:
+    user_id = getattr(request.state, "user_id", "demo-user")
+    job = services.job_queue.get(job_id)
+    if job is None or job.user_id != user_id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+def _job_response(job: Job) -> JobResponse:
+    return JobResponse(
+        id=job.id,
+        kind=job.kind,
+        status=job.status,
+        done=job.done,
+        total=job.total,
+        result=job.result,
+        error=job.error,
+    )
+
+
+@router.get("/ai/jobs/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: str,
+    request: Request,
+    services: Services = Depends(get_services),
+) -> JobResponse:
+    """Current status and progress of a background job."""
+    return _job_response(_get_user_job(job_id, request, services))
+
+
+@router.get("/ai/jobs/{job_id}/events")
+async def stream_job(
+    job_id: str,
+    request: Request,
+    services: Services = Depends(get_services),
+) -> StreamingResponse:
+    """
+    Server-sent events: one "progress" event per change, then a final
+    "done" event when the job succeeds or fails.
+    """
+    _get_user_job(job_id, request, services)
+
+    async def events() -> AsyncIterator[str]:
+        async for job in services.job_queue.watch(job_id):
+            name = "done" if job.finished else "progress"
+            data = json.dumps(_job_response(job).model_dump(), ensure_ascii=False)
+            yield f"event: {name}\ndata: {data}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
@@ -1,35 +1,271 @@
 from __future__ import annotations
 
+import asyncio
 import json
-from datetime import datetime, timezone, timedelta
-from typing import Any, Dict, List, Optional
-
-from openai import OpenAI
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime, time as dt_time, timezone, timedelta, tzinfo
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
 
 from app.config import settings
-from app.modules.calendar.google_calendar_service import GoogleCalendarService
-from app.modules.ai.memory import ConversationMemory
+from app.modules.calendar.availability import (
+    DEFAULT_WORKING_HOURS,
+    Interval,
+    busy_from_events,
+    busy_from_freebusy,
+    find_free_slots,
+    freebusy_failures,
+)
+from app.modules.calendar.event_cache import EventCache, event_overlaps
+from app.modules.calendar.fanout import event_start_key, gather_bounded, merge_by_start
+from app.modules.calendar.recurrence import expand_events
+from app.modules.calendar.google_calendar_service import EventConflict, GoogleCalendarService
+from app.modules.calendar.watch_manager import CalendarWatchManager
+from app.modules.ai.memory import ConversationMemory, EventRefDict
+from app.modules.ai.model_router import (
+    PARSE_FAILURE,
+    REPLY,
+    TOOL_SELECTION,
+    ModelRouter,
+    ambiguity_reason,
+)
+from app.modules.ai.summarizer import ConversationSummarizer, build_prompt_history
+from app.modules.ai.intent import find_range_mention, parse_list_intent, render_list_reply
+from app.modules.ai.tool_validation import ToolValidator
+from app.modules.ai.event_matcher import MIN_TITLE_SCORE, select_events, title_similarity, tokenize
+from app.modules.auth.profile_cache import ProfileCache
+from app.shared.datetime_utils import get_zone, is_valid_zone, parse_rfc3339
+from app.shared.idempotency import IdempotencyStore
+from app.shared.jobs import JobContext, JobQueue, JobQueueFull
+from app.shared.metrics import metrics
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI, OpenAI
+
+
+fast_path_hits = metrics.counter(
+    "intent_fast_path_hits_total", "Turns answered by the local intent parser."
+)
+fast_path_misses = metrics.counter(
+    "intent_fast_path_misses_total", "Turns the local intent parser passed to the LLM."
+)
+fast_path_turn_ms = metrics.histogram(
+    "agent_turn_fast_path_ms", "Latency of turns answered by the local intent parser."
+)
+llm_turn_ms = metrics.histogram(
+    "agent_turn_llm_ms", "Latency of turns answered through the LLM."
+)
+tool_calls_invalid = metrics.counter(
+    "agent_tool_calls_invalid_total", "Tool calls rejected by argument validation."
+)
+tool_repair_rounds = metrics.counter(
+    "agent_tool_repair_rounds_total", "Extra completions asking the model to fix tool calls."
+)
+tool_calls_repeated = metrics.counter(
+    "agent_tool_calls_repeated_total",
+    "Tool calls a repair round re-sent after they had already run; answered from the first run.",
+)
+prefetch_started = metrics.counter(
+    "speculative_prefetch_started_total", "Event fetches started alongside the first completion."
+)
+prefetch_hits = metrics.counter(
+    "speculative_prefetch_hits_total", "Event reads served from a speculative prefetch."
+)
+prefetch_wasted = metrics.counter(
+    "speculative_prefetch_wasted_total", "Speculative prefetches no tool call used."
+)
+turns_cancelled = metrics.counter(
+    "agent_turns_cancelled_total", "Turns cancelled before replying (client disconnected)."
+)
+writes_finished_after_cancel = metrics.counter(
+    "agent_writes_finished_after_cancel_total", "Calendar writes completed after their turn was cancelled."
+)
+recurrence_expanded = metrics.counter(
+    "recurrence_series_expanded_total", "Recurring series expanded locally."
+)
+create_deduplicated = metrics.counter(
+    "agent_create_event_deduplicated_total", "create_event calls answered with an event created moments before."
+)
+recurrence_fallbacks = metrics.counter(
+    "recurrence_instances_fetched_total", "Recurring series whose instances were fetched from Google."
+)
+freebusy_fallbacks = metrics.counter(
+    "freebusy_calendar_fallbacks_total", "Calendars freeBusy failed for, read from their events instead."
+)
 
 
-def _parse_rfc3339(value: str) -> datetime:
-    """
-    Accept strings like:
-    - 2025-12-04T10:30:00+02:00
-    - 2025-12-04T10:30:00
-    - 2025-12-04T10:30:00Z
+@dataclass
+class _Prefetch:
+    calendar_id: str
+    start: datetime
+    end: datetime
+    max_results: int
+    task: "asyncio.Task[List[Dict[str, Any]]]"
+    used: bool = False
+    # set once this turn writes to the calendar; the listing predates the write
+    stale: bool = False
+
+    def covers(self, calendar_id: str, start: datetime, end: datetime) -> bool:
+        return (
+            not self.stale
+            and calendar_id == self.calendar_id
+            and self.start <= start
+            and end <= self.end
+        )
+
+    async def result(self) -> Optional[List[Dict[str, Any]]]:
+        try:
+            return await self.task
+        except Exception:
+            return None
 
-    If no tzinfo -> attach UTC.
-    tz_name is kept in the signature for future use but not required here.
-    """
-    if value.endswith("Z"):
-        value = value.replace("Z", "+00:00")
 
-    dt = datetime.fromisoformat(value)
+# prefetch started for the turn currently running (see CalendarAgent._start_prefetch)
+_active_prefetch: ContextVar[Optional[_Prefetch]] = ContextVar("_active_prefetch", default=None)
 
-    if dt.tzinfo is None:
-        dt = dt.replace(tzinfo=timezone.utc)
+# called with {"stage": ...} updates while a turn runs; must not block
+ProgressCallback = Callable[[Dict[str, Any]], None]
+
+
+def _report(progress: Optional[ProgressCallback], stage: str, **fields: Any) -> None:
+    if progress is not None:
+        progress({"stage": stage, **fields})
+
+
+# calendar_id value meaning "every calendar the user has selected"
+ALL_CALENDARS = "all"
+
+# background job kind behind the bulk_delete_events tool
+BULK_DELETE_JOB = "bulk_delete_events"
+
+# tools that change the calendar; see CalendarAgent._dispatch_write
+WRITE_TOOLS = {"create_event", "update_event", "delete_event", "bulk_delete_events"}
+
+# Progressive search for update/delete lookups without an explicit window
+SEARCH_START_HALF_WIDTH = timedelta(hours=1)
+SEARCH_DEFAULT_SPAN = timedelta(days=1)
+SEARCH_GROWTH_FACTOR = 4
+
+
+def _search_windows(
+    start: Optional[datetime],
+    end: Optional[datetime],
+    now: datetime,
+    max_span: timedelta,
+) -> Iterator[Tuple[datetime, datetime]]:
+    """
+    Yield successively wider (start, end) windows, each containing the previous:
+    - start and end given -> just that window
+    - only start given -> start +/- 1h, 4h, 16h, ... up to max_span in total
+    - nothing given -> now + 1d, 4d, 16d, ... up to max_span
+    """
+    if start and end:
+        yield start, end
+        return
+
+    if start:
+        half, cap = SEARCH_START_HALF_WIDTH, max_span / 2
+        while True:
+            half = min(half, cap)
+            yield start - half, start + half
+            if half >= cap:
+                return
+            half *= SEARCH_GROWTH_FACTOR
+
+    span = SEARCH_DEFAULT_SPAN
+    while True:
+        span = min(span, max_span)
+        yield now, now + span
+        if span >= max_span:
+            return
+        span *= SEARCH_GROWTH_FACTOR
+
+
+def _candidate_summary(event: Dict[str, Any]) -> Dict[str, Any]:
+    candidate = {
+        "id": event.get("id"),
+        "summary": event.get("summary"),
+        "start": event.get("start"),
+        "end": event.get("end"),
+    }
+    if "calendarId" in event:
+        candidate["calendar_id"] = event["calendarId"]
+    return candidate
+
+
+def _clarification(events: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Tool result asking the model to confirm which event the user means."""
+    if len(events) == 1:
+        message = "One event partly matches; confirm with the user before changing it"
+    else:
+        message = "Multiple events match, need a more specific request"
+    return {
+        "ok": False,
+        "message": message,
+        "data": {
+            "candidates": [_candidate_summary(e) for e in events]
+        },
+    }
+
+
+def _update_conflict(conflict: EventConflict) -> Dict[str, Any]:
+    """Tool result for an update Google refused because the event had changed."""
+    return {
+        "ok": False,
+        "message": (
+            "The event was changed by someone else since it was read; nothing was "
+            "updated. Show the user the current version and confirm the change again"
+        ),
+        "data": {"event": conflict.latest},
+    }
+
+
+def _assistant_tool_calls(tool_calls: List[Any]) -> Dict[str, Any]:
+    """The assistant message that carried these tool calls, for the next request."""
+    return {
+        "role": "assistant",
+        "tool_calls": [
+            {
+                "id": tc.id,
+                "type": "function",
+                "function": {
+                    "name": tc.function.name,
+                    "arguments": tc.function.arguments,
+                },
+            }
+            for tc in tool_calls
+        ],
+    }
+
+
+def _event_ref(event: Dict[str, Any], calendar_id: str) -> Optional[EventRefDict]:
+    """Compact reference to an event for the conversation's turn context."""
+    if not event.get("id"):
+        return None
+    start = event.get("start") or {}
+    end = event.get("end") or {}
+    return EventRefDict(
+        event_id=event["id"],
+        calendar_id=event.get("calendarId") or event.get("calendar_id") or calendar_id,
+        summary=event.get("summary"),
+        start=start.get("dateTime") or start.get("date"),
+        end=end.get("dateTime") or end.get("date"),
+    )
+
+
+def _event_context_message(refs: List[EventRefDict]) -> Dict[str, Any]:
+    lines = [json.dumps(ref, ensure_ascii=False) for ref in refs]
+    return {
+        "role": "system",
+        "content": (
+            "Events referenced earlier in this conversation, newest first. When the user "
+            "refers to one of them ('it', 'that meeting', 'the second one'), pass its "
+            "event_id and calendar_id to update_event or delete_event instead of a "
+            "title/time search:\n" + "\n".join(lines)
+        ),
+    }
 
-    return dt
 
 SYSTEM_PROMPT_TEMPLATE = (
     "You are an assistant that manages the user's Google Calendar.\n"
@@ -44,8 +280,11 @@ SYSTEM_PROMPT_TEMPLATE = (
     "\n"
     "EVENT LOOKUP LOGIC:\n"
     "- For creating or listing events: call create_event or list_events with explicit times.\n"
+    "- For availability questions ('when am I free for 2 hours this week?'), call "
+    "find_free_slots instead of listing events and computing gaps yourself.\n"
     "- For updating or deleting events:\n"
-    "    * Try to rely on user-provided event_id.\n"
+    "    * Try to rely on user-provided event_id, or an event_id from the events "
+    "      referenced earlier in this conversation.\n"
     "    * If the user does NOT give an event_id but describes an event, "
     "      you must NOT call list_events yourself.\n"
     "    * Instead, try first pass the user's description (summary/title and/or time range) "
@@ -53,6 +292,9 @@ SYSTEM_PROMPT_TEMPLATE = (
     "    * The backend will search for the correct event.\n"
     "    * If the backend reports multiple or zero matches, respond to the user "
     "      asking for clarification. Do NOT attempt your own search.\n"
+    "- To delete many events at once ('clear my Thursday'), call bulk_delete_events. "
+    "It runs in the background: tell the user how many events it covers and that "
+    "it has started.\n"
     "\n"
     "- If the user asks something unrelated to the calendar, answer directly without using tools.\n"
 )
@@ -69,7 +311,10 @@ TOOLS: List[Dict[str, Any]] = [
                 "properties": {
                     "calendar_id": {
                         "type": "string",
-                        "description": "Google Calendar ID. Defaults to 'primary' if omitted.",
+                        "description": (
+                            "Google Calendar ID. Defaults to 'primary' if omitted. "
+                            "Use 'all' to include every calendar the user has selected."
+                        ),
                     },
                     "start": {
                         "type": "string",
@@ -145,7 +390,11 @@ TOOLS: List[Dict[str, Any]] = [
                 "properties": {
                     "calendar_id": {
                         "type": "string",
-                        "description": "Google Calendar ID. Defaults to 'primary' if omitted.",
+                        "description": (
+                            "Google Calendar ID. Defaults to 'primary' if omitted. "
+                            "Use 'all' to search every calendar the user has selected "
+                            "when event_id is not provided."
+                        ),
                     },
 
                     # --- How to identify which event to update ---
@@ -221,7 +470,11 @@ TOOLS: List[Dict[str, Any]] = [
                 "properties": {
                     "calendar_id": {
                         "type": "string",
-                        "description": "Google Calendar ID. Defaults to 'primary' if omitted.",
+                        "description": (
+                            "Google Calendar ID. Defaults to 'primary' if omitted. "
+                            "Use 'all' to search every calendar the user has selected "
+                            "when event_id is not provided."
+                        ),
                     },
 
                     # --- How to identify which event to delete ---
@@ -261,8 +514,113 @@ TOOLS: List[Dict[str, Any]] = [
             },
         },
     },
+    {
+        "type": "function",
+        "function": {
+            "name": "find_free_slots",
+            "description": (
+                "Find free time in the user's calendar(s) within a range, "
+                "optionally restricted to working hours and days of the week."
+            ),
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "start": {
+                        "type": "string",
+                        "description": "Start of the search range in RFC3339 with timezone.",
+                    },
+                    "end": {
+                        "type": "string",
+                        "description": "End of the search range in RFC3339 with timezone.",
+                    },
+                    "duration_minutes": {
+                        "type": "integer",
+                        "minimum": 1,
+                        "description": "Minimum length of a free slot, in minutes.",
+                    },
+                    "calendar_ids": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": (
+                            "Calendars whose events count as busy. Defaults to ['primary']. "
+                            "Use ['all'] for every calendar the user has selected."
+                        ),
+                    },
+                    "working_hours_start": {
+                        "type": "string",
+                        "description": "Earliest local time of day for a slot (HH:MM). Defaults to 09:00.",
+                    },
+                    "working_hours_end": {
+                        "type": "string",
+                        "description": "Latest local time of day for a slot (HH:MM). Defaults to 18:00.",
+                    },
+                    "any_time_of_day": {
+                        "type": "boolean",
+                        "description": "Ignore working hours and search the whole day.",
+                    },
+                    "weekdays": {
+                        "type": "array",
+                        "items": {"type": "integer", "minimum": 0, "maximum": 6},
+                        "description": (
+                            "Allowed days of the week, 0=Monday ... 6=Sunday. "
+                            "Defaults to every day."
+                        ),
+                    },
+                    "max_results": {
+                        "type": "integer",
+                        "minimum": 1,
+                        "description": "Maximum number of slots to return. Defaults to 10.",
+                    },
+                },
+                "required": ["start", "end", "duration_minutes"],
+                "additionalProperties": False,
+            },
+        },
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "bulk_delete_events",
+            "description": (
+                "Delete every event in a time range, optionally only those whose title "
+                "matches. Runs as a background job and returns a job id."
+            ),
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "calendar_id": {
+                        "type": "string",
+                        "description": (
+                            "Google Calendar ID. Defaults to 'primary' if omitted. "
+                            "Use 'all' to include every calendar the user has selected."
+                        ),
+                    },
+                    "start": {
+                        "type": "string",
+                        "description": "Start of the range in RFC3339 with timezone.",
+                    },
+                    "end": {
+                        "type": "string",
+                        "description": "End of the range in RFC3339 with timezone.",
+                    },
+                    "title": {
+                        "type": "string",
+                        "description": "Only delete events whose title matches this.",
+                    },
+                },
+                "required": ["start", "end"],
+                "additionalProperties": False,
+            },
+        },
+    },
 ]
 
+# argument models compiled once from the schemas above
+TOOL_VALIDATOR = ToolValidator(TOOLS)
+
+# how many times the model may resend tool calls that failed validation
+MAX_REPAIR_ROUNDS = 1
+
 
 class CalendarAgent:
     """
@@ -276,17 +634,46 @@ class CalendarAgent:
 
     def __init__(
         self,
-        client: OpenAI,
+        client: Union[AsyncOpenAI, OpenAI],
         service: GoogleCalendarService,
         memory: ConversationMemory,
         default_timezone: str = "Asia/Jerusalem",
         model: Optional[str] = None,
+        intent_fast_path: Optional[bool] = None,
+        event_cache: Optional[EventCache] = None,
+        watch_manager: Optional[CalendarWatchManager] = None,
+        summarizer: Optional[ConversationSummarizer] = None,
+        job_queue: Optional[JobQueue] = None,
+        router: Optional[ModelRouter] = None,
+        create_dedupe: Optional[IdempotencyStore] = None,
+        profiles: Optional[ProfileCache] = None,
     ) -> None:
         self.client = client
         self.service = service
         self.memory = memory
         self.default_timezone = default_timezone
-        self.model = model or getattr(settings, "openai_model", "gpt-4.1-mini")
+        # an explicit model pins both routes (used by replay)
+        self.router = router or (ModelRouter(model) if model else ModelRouter.from_settings())
+        self.model = self.router.fast_model
+        self.intent_fast_path = (
+            settings.intent_fast_path_enabled if intent_fast_path is None else intent_fast_path
+        )
+        self.event_cache = event_cache
+        self.watch_manager = watch_manager
+        self.summarizer = summarizer
+        self.history_limit = summarizer.window if summarizer else settings.conversation_history_limit
+        self.use_google_free_busy = settings.free_busy_use_google
+        self.fanout_concurrency = settings.calendar_fanout_concurrency
+        self.profiles = profiles or ProfileCache(
+            calendar_list_ttl_seconds=settings.calendar_list_ttl_seconds
+        )
+        self.search_max_span = timedelta(days=settings.event_search_max_window_days)
+        self.speculative_prefetch = settings.speculative_prefetch_enabled
+        self.create_dedupe = create_dedupe
+
+        self.job_queue = job_queue
+        if job_queue is not None:
+            job_queue.register(BULK_DELETE_JOB, self._run_bulk_delete)
 
     # ---------- main entry ----------
 
@@ -297,10 +684,51 @@ class CalendarAgent:
         user_message: str,
         user_timezone: Optional[str],
         access_token: str,
+        progress: Optional[ProgressCallback] = None,
     ) -> str:
         # keep tz_name as string only (for Google + prompt)
-        tz_name = user_timezone or self.default_timezone
+        tz_name = user_timezone if is_valid_zone(user_timezone) else self.default_timezone
+        turn_started = time.perf_counter()
 
+        if self.intent_fast_path:
+            fast_reply = await self._try_fast_path(
+                user_id, conversation_id, user_message, tz_name, access_token, progress
+            )
+            if fast_reply is not None:
+                fast_path_turn_ms.observe((time.perf_counter() - turn_started) * 1000.0)
+                return fast_reply
+
+        prefetch = self._start_prefetch(user_id, user_message, tz_name, access_token)
+        token = _active_prefetch.set(prefetch)
+        writes: List[Tuple[str, Any]] = []
+        try:
+            return await self._run_llm_turn(
+                user_id, conversation_id, user_message, tz_name, access_token, turn_started, writes,
+                progress,
+            )
+        except asyncio.CancelledError:
+            turns_cancelled.inc()
+            if prefetch is not None:
+                prefetch.task.cancel()
+            if writes:
+                self._remember_interrupted_turn(user_id, conversation_id, user_message, writes)
+            raise
+        finally:
+            _active_prefetch.reset(token)
+            if prefetch is not None and not prefetch.used:
+                prefetch_wasted.inc()
+
+    async def _run_llm_turn(
+        self,
+        user_id: str,
+        conversation_id: str,
+        user_message: str,
+        tz_name: str,
+        access_token: str,
+        turn_started: float,
+        writes: List[Tuple[str, Any]],
+        progress: Optional[ProgressCallback] = None,
+    ) -> str:
         # we work in UTC for our own clock; tz is just metadata
         now = datetime.now(timezone.utc)
         current_time_iso = now.isoformat()
@@ -310,92 +738,262 @@ class CalendarAgent:
             current_time_iso=current_time_iso,
         )
 
-        # history for this conversation
-        history = self.memory.get_recent_messages(user_id, conversation_id, limit=10)
+        # history for this conversation: rolling summary + recent messages
+        history = build_prompt_history(
+            self.memory, user_id, conversation_id, window=self.history_limit,
+            summarizing=self.summarizer is not None,
+        )
+
+        # events resolved in earlier turns, so follow-ups can use their ids directly
+        event_refs = self.memory.get_recent_events(user_id, conversation_id)
+        context: List[Dict[str, Any]] = (
+            [_event_context_message(event_refs)] if event_refs else []
+        )
 
         # build messages for first call
         messages: List[Dict[str, Any]] = [{"role": "system", "content": system_prompt}]
+        messages.extend(context)
         messages.extend(history)
         messages.append({"role": "user", "content": user_message})
 
-        first_response = self.client.chat.completions.create(
-            model=self.model,
-            messages=messages,
-            tools=TOOLS,
-            tool_choice="auto",
+        response = await self._complete(
+            TOOL_SELECTION, messages=messages, tools=TOOLS, tool_choice="auto"
         )
 
-        assistant_msg = first_response.choices[0].message
+        assistant_msg = response.choices[0].message
         tool_calls = getattr(assistant_msg, "tool_calls", None) or []
 
         # no tools -> simple reply
         if not tool_calls:
             reply_content = assistant_msg.content or ""
 
-            self.memory.add_message(user_id, conversation_id, "user", user_message)
-            self.memory.add_message(user_id, conversation_id, "assistant", reply_content)
+            self._remember_turn(user_id, conversation_id, user_message, reply_content)
 
+            llm_turn_ms.observe((time.perf_counter() - turn_started) * 1000.0)
             return reply_content
 
-        # there ARE tool calls
-        tool_messages: List[Dict[str, Any]] = []
+        # there ARE tool calls; invalid ones are answered with a structured error
+        # and the model gets MAX_REPAIR_ROUNDS chances to fix them in this turn
+        tool_results: List[Any] = []
+        repair_round = 0
+        # (name, normalized args) -> result of every call run this turn; a repair
+        # round often re-sends the whole batch, and writes must not run twice
+        executed: Dict[Tuple[str, str], Any] = {}
+
+        while True:
+            tool_messages: List[Dict[str, Any]] = []
+            invalid_calls = 0
+
+            for tool_call in tool_calls:
+                func_name = tool_call.function.name
+                args, error = TOOL_VALIDATOR.validate(func_name, tool_call.function.arguments)
+
+                call_key = None
+                if error is None:
+                    call_key = (func_name, json.dumps(args, sort_keys=True, default=str))
+                if error is not None:
+                    invalid_calls += 1
+                    result = error
+                    _report(progress, "tool", tool=func_name, status="invalid")
+                elif call_key in executed:
+                    tool_calls_repeated.inc()
+                    result = executed[call_key]
+                else:
+                    _report(progress, "tool", tool=func_name, status="started")
+                    if func_name in WRITE_TOOLS:
+                        result = await self._dispatch_write(
+                            func_name, access_token, args, tz_name, user_id, writes
+                        )
+                    else:
+                        result = await self._dispatch_tool(
+                            func_name, access_token, args, tz_name, user_id=user_id
+                        )
+                    executed[call_key] = result
+                    self._track_events(user_id, conversation_id, func_name, args, result)
+                    tool_results.append(result)
+                    failed = isinstance(result, dict) and "error" in result
+                    _report(progress, "tool", tool=func_name, status="failed" if failed else "finished")
+
+                tool_messages.append(
+                    {
+                        "role": "tool",
+                        "tool_call_id": tool_call.id,
+                        "name": func_name,
+                        "content": json.dumps(result, ensure_ascii=False),
+                    }
+                )
 
-        for tool_call in tool_calls:
-            func_name = tool_call.function.name
-            raw_args = tool_call.function.arguments or "{}"
+            messages = [*messages, _assistant_tool_calls(tool_calls), *tool_messages]
 
-            try:
-                args = json.loads(raw_args)
-            except Exception:
-                args = {}
-            print(raw_args, args)
-            result = await self._dispatch_tool(
-                func_name, access_token, args, tz_name
-            )
+            if not invalid_calls:
+                break
+            tool_calls_invalid.inc(invalid_calls)
+            if repair_round >= MAX_REPAIR_ROUNDS:
+                break
 
-            tool_messages.append(
-                {
-                    "role": "tool",
-                    "tool_call_id": tool_call.id,
-                    "name": func_name,
-                    "content": json.dumps(result, ensure_ascii=False),
-                }
+            repair_round += 1
+            tool_repair_rounds.inc()
+            response = await self._complete(
+                TOOL_SELECTION, PARSE_FAILURE, messages=messages, tools=TOOLS, tool_choice="auto"
             )
-
-        # second call with tool results
-        second_messages: List[Dict[str, Any]] = [
-            {"role": "system", "content": system_prompt},
-            *history,
-            {"role": "user", "content": user_message},
-            {
-                "role": "assistant",
-                "tool_calls": [
-                    {
-                        "id": tc.id,
-                        "type": "function",
-                        "function": {
-                            "name": tc.function.name,
-                            "arguments": tc.function.arguments,
-                        },
-                    }
-                    for tc in tool_calls
-                ],
-            },
-            *tool_messages,
-        ]
-
-        second_response = self.client.chat.completions.create(
-            model=self.model,
-            messages=second_messages,
+            assistant_msg = response.choices[0].message
+            tool_calls = getattr(assistant_msg, "tool_calls", None) or []
+
+            if not tool_calls:
+                # the model replied (e.g. asked the user) instead of retrying
+                reply_content = assistant_msg.content or ""
+                self._remember_turn(user_id, conversation_id, user_message, reply_content)
+                llm_turn_ms.observe((time.perf_counter() - turn_started) * 1000.0)
+                return reply_content
+
+        # final call with tool results
+        _report(progress, "replying")
+        second_response = await self._complete(
+            REPLY, ambiguity_reason(tool_results), messages=messages
         )
         final_msg = second_response.choices[0].message
         final_content = final_msg.content or ""
 
-        self.memory.add_message(user_id, conversation_id, "user", user_message)
-        self.memory.add_message(user_id, conversation_id, "assistant", final_content)
+        self._remember_turn(user_id, conversation_id, user_message, final_content)
 
+        llm_turn_ms.observe((time.perf_counter() - turn_started) * 1000.0)
         return final_content
 
+    async def _try_fast_path(
+        self,
+        user_id: str,
+        conversation_id: str,
+        user_message: str,
+        tz_name: str,
+        access_token: str,
+        progress: Optional[ProgressCallback] = None,
+    ) -> Optional[str]:
+        """
+        Answer plain "what do I have <range>" messages without calling the model.
+        Returns None when the message is not a confident match.
+        """
+        intent = parse_list_intent(user_message, tz_name)
+        if intent is None:
+            fast_path_misses.inc()
+            return None
+
+        _report(progress, "tool", tool="list_events", status="started")
+        result = await self._handle_list_events(
+            access_token,
+            {"start": intent.start.isoformat(), "end": intent.end.isoformat()},
+            tz_name,
+            user_id=user_id,
+        )
+        if "error" in result:
+            fast_path_misses.inc()
+            return None
+
+        fast_path_hits.inc()
+        self._track_events(user_id, conversation_id, "list_events", {}, result)
+        reply = render_list_reply(result["events"], intent)
+
+        self._remember_turn(user_id, conversation_id, user_message, reply)
+        return reply
+
+    async def _complete(self, stage: str, reason: Optional[str] = None, **kwargs: Any) -> Any:
+        return await self.router.complete(self.client, stage, reason, **kwargs)
+
+    def _start_prefetch(
+        self,
+        user_id: str,
+        user_message: str,
+        tz_name: str,
+        access_token: str,
+    ) -> Optional[_Prefetch]:
+        """
+        Speculatively fetch the primary calendar for a range the message
+        mentions, while the first completion runs. _get_events serves tool
+        calls from it when their window falls inside.
+        """
+        if not self.speculative_prefetch:
+            return None
+        mention = find_range_mention(user_message, tz_name)
+        if mention is None:
+            return None
+        if self.event_cache is not None and self.event_cache.get(
+            user_id, "primary", mention.start, mention.end
+        ) is not None:
+            return None
+
+        task = asyncio.get_running_loop().create_task(
+            self._get_events(access_token, "primary", mention.start, mention.end, user_id=user_id)
+        )
+        prefetch_started.inc()
+        return _Prefetch("primary", mention.start, mention.end, 100, task)
+
+    def _remember_turn(
+        self,
+        user_id: str,
+        conversation_id: str,
+        user_message: str,
+        reply: str,
+    ) -> None:
+        self.memory.add_message(user_id, conversation_id, "user", user_message)
+        self.memory.add_message(user_id, conversation_id, "assistant", reply)
+        if self.summarizer is not None:
+            self.summarizer.schedule(user_id, conversation_id)
+
+    def _remember_interrupted_turn(
+        self,
+        user_id: str,
+        conversation_id: str,
+        user_message: str,
+        writes: List[Tuple[str, Any]],
+    ) -> None:
+        """
+        Memory for a cancelled turn. A turn that changed nothing leaves no
+        trace (the user will send it again). One that did is kept with a note
+        of the completed writes, so the next turn doesn't repeat them.
+        """
+        done = [{"tool": name, "result": result} for name, result in writes]
+        note = (
+            "(The reply to this message was never delivered: the client disconnected. "
+            "Calendar changes already made: " + json.dumps(done, ensure_ascii=False) + ")"
+        )
+        self._remember_turn(user_id, conversation_id, user_message, note)
+
+    def _track_events(
+        self,
+        user_id: str,
+        conversation_id: str,
+        name: str,
+        args: Dict[str, Any],
+        result: Any,
+    ) -> None:
+        """Remember which events a tool call resolved (or removed) for later turns."""
+        if not isinstance(result, dict) or "error" in result:
+            return
+
+        calendar_id = args.get("calendar_id") or "primary"
+        data = result.get("data") or {}
+        events: List[Dict[str, Any]] = []
+
+        if name == "list_events":
+            # a long listing says little about what a follow-up refers to
+            listed = result.get("events") or []
+            if len(listed) <= self.memory.max_recent_events:
+                events = listed
+        elif name == "create_event":
+            events = [result["event"]] if result.get("event") else []
+        elif name == "update_event":
+            calendar_id = data.get("calendar_id", calendar_id)
+            events = [data["event"]] if data.get("event") else data.get("candidates") or []
+        elif name == "delete_event":
+            if result.get("ok"):
+                self.memory.forget_event(
+                    user_id, conversation_id, data.get("calendar_id", calendar_id), data["event_id"]
+                )
+                return
+            events = data.get("candidates") or []
+
+        refs = [ref for ref in (_event_ref(e, calendar_id) for e in events) if ref]
+        self.memory.remember_events(user_id, conversation_id, refs)
+
     # ---------- tool dispatch ----------
 
     async def _dispatch_tool(
@@ -404,24 +1002,195 @@ class CalendarAgent:
         access_token: str,
         args: Dict[str, Any],
         tz_name: str,
+        user_id: Optional[str] = None,
     ) -> Any:
         if name == "list_events":
-            return await self._handle_list_events(access_token, args)
+            return await self._handle_list_events(access_token, args, tz_name, user_id=user_id)
         if name == "create_event":
-            return await self._handle_create_event(access_token, args, tz_name)
+            return await self._handle_create_event(access_token, args, tz_name, user_id=user_id)
         if name == "update_event":
-            return await self._handle_update_event(access_token, args)
+            return await self._handle_update_event(access_token, args, tz_name, user_id=user_id)
         if name == "delete_event":
-            return await self._handle_delete_event(access_token, args)
+            return await self._handle_delete_event(access_token, args, tz_name, user_id=user_id)
+        if name == "find_free_slots":
+            return await self._handle_find_free_slots(access_token, args, tz_name, user_id=user_id)
+        if name == "bulk_delete_events":
+            return await self._handle_bulk_delete_events(access_token, args, tz_name, user_id=user_id)
         return {"error": f"Unknown tool: {name}"}
 
+    async def _dispatch_write(
+        self,
+        name: str,
+        access_token: str,
+        args: Dict[str, Any],
+        tz_name: str,
+        user_id: Optional[str],
+        writes: List[Tuple[str, Any]],
+    ) -> Any:
+        """
+        Run a write tool to completion even if the turn is cancelled meanwhile,
+        so it is never left half done and its outcome ends up in `writes`.
+        """
+        task = asyncio.ensure_future(
+            self._dispatch_tool(name, access_token, args, tz_name, user_id=user_id)
+        )
+        try:
+            result = await asyncio.shield(task)
+        except asyncio.CancelledError:
+            try:
+                writes.append((name, await task))
+                writes_finished_after_cancel.inc()
+            except Exception:
+                pass
+            raise
+        writes.append((name, result))
+        return result
+
+    # ---------- event reads ----------
+
+    async def _get_events(
+        self,
+        access_token: str,
+        calendar_id: str,
+        start: datetime,
+        end: datetime,
+        max_results: int = 100,
+        user_id: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch events, served from the local event cache when possible.
+        Recurring series come back as their instances in [start, end).
+        """
+        prefetch = _active_prefetch.get()
+        if prefetch is not None and prefetch.covers(calendar_id, start, end):
+            prefetched = await prefetch.result()
+            # a full page may be truncated, so only a complete listing can be filtered
+            if prefetched is not None and len(prefetched) < prefetch.max_results:
+                prefetch.used = True
+                prefetch_hits.inc()
+                return [e for e in prefetched if event_overlaps(e, start, end)][:max_results]
+
+        use_cache = self.event_cache is not None and user_id is not None
+
+        if use_cache and self.watch_manager is not None:
+            # keeps a push channel open so cached windows stay trustworthy
+            self.watch_manager.ensure_watch(user_id, access_token, calendar_id)
+
+        events = self.event_cache.get(user_id, calendar_id, start, end) if use_cache else None
+        if events is None:
+            # a change notification or write during the fetch makes its result unsafe to cache
+            version = self.event_cache.version(user_id, calendar_id) if use_cache else None
+            events = await self.service.get_events(
+                access_token=access_token,
+                calendar_id=calendar_id,
+                start_date=start,
+                end_date=end,
+                max_results=max_results,
+            )
+            # a full page may be truncated, so it can't vouch for the whole window
+            if use_cache and len(events) < max_results:
+                self.event_cache.put(user_id, calendar_id, start, end, events, version=version)
+
+        # the cache keeps series masters; instances are derived per window
+        events = await self._expand_recurring(access_token, calendar_id, events, start, end)
+        return events[:max_results]
+
+    async def _expand_recurring(
+        self,
+        access_token: str,
+        calendar_id: str,
+        events: List[Dict[str, Any]],
+        start: datetime,
+        end: datetime,
+    ) -> List[Dict[str, Any]]:
+        """
+        Replace series masters by their instances, expanded locally when the
+        rule is supported and fetched from Google otherwise. Cancelled
+        instances are dropped.
+        """
+        masters = sum(1 for e in events if e.get("recurrence"))
+        expanded, unsupported = expand_events(events, start, end, self.default_timezone)
+        if not masters:
+            return expanded
+
+        recurrence_expanded.inc(masters - len(unsupported))
+        for master in unsupported:
+            recurrence_fallbacks.inc()
+            expanded.extend(await self.service.get_event_instances(
+                access_token, calendar_id, master["id"], start, end
+            ))
+        return sorted(expanded, key=event_start_key)
+
+    async def _get_events_multi(
+        self,
+        access_token: str,
+        calendar_ids: List[str],
+        start: datetime,
+        end: datetime,
+        max_results: int = 100,
+        user_id: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch several calendars concurrently (bounded) and merge them by start
+        time. Each returned event is a copy tagged with its "calendarId".
+        """
+        async def fetch(calendar_id: str) -> List[Dict[str, Any]]:
+            events = await self._get_events(
+                access_token, calendar_id, start, end, max_results, user_id=user_id
+            )
+            return [{**e, "calendarId": calendar_id} for e in events]
+
+        batches = await gather_bounded(fetch, calendar_ids, self.fanout_concurrency)
+        return merge_by_start(batches)
+
+    async def _resolve_calendar_ids(
+        self,
+        access_token: str,
+        calendar_ids: List[str],
+        user_id: Optional[str] = None,
+    ) -> List[str]:
+        """Expand 'all' into the user's selected calendars."""
+        if ALL_CALENDARS not in calendar_ids:
+            return calendar_ids
+
+        calendars = self.profiles.calendars(user_id) if user_id else None
+        if calendars is None:
+            calendars = await self.service.get_calendars(access_token, user_id=user_id)
+            if calendars and user_id:
+                self.profiles.put_calendars(user_id, calendars)
+
+        selected = [
+            c["id"] for c in calendars
+            if (c.get("selected") or c.get("primary")) and not c.get("deleted")
+        ]
+        return selected or ["primary"]
+
+    def _invalidate_cached_events(
+        self,
+        user_id: Optional[str],
+        calendar_id: str,
+        event_id: Optional[str] = None,
+    ) -> None:
+        """Call after a write; `event_id` is the event that was updated or deleted."""
+        prefetch = _active_prefetch.get()
+        if prefetch is not None and prefetch.calendar_id == calendar_id:
+            prefetch.stale = True
+        if self.event_cache is not None and user_id is not None:
+            self.event_cache.invalidate(user_id, calendar_id)
+        if self.create_dedupe is not None and event_id is not None:
+            # a later identical create must not be answered with the old event
+            self.create_dedupe.forget(lambda event: event.get("id") == event_id)
+
     # ---------- tool handlers ----------
 
     async def _handle_list_events(
         self,
         access_token: str,
         args: Dict[str, Any],
+        tz_name: str,
+        user_id: Optional[str] = None,
     ) -> Dict[str, Any]:
+        zone = get_zone(tz_name)
         calendar_id = args.get("calendar_id") or "primary"
         start_str = args.get("start")
         end_str = args.get("end")
@@ -429,28 +1198,32 @@ class CalendarAgent:
         if not start_str or not end_str:
             return {"error": "start and end are required"}
 
-        start_dt = _parse_rfc3339(start_str)
-        end_dt = _parse_rfc3339(end_str)
+        start_dt = parse_rfc3339(start_str, zone)
+        end_dt = parse_rfc3339(end_str, zone)
 
-        events = await self.service.get_events(
-            access_token=access_token,
-            calendar_id=calendar_id,
-            start_date=start_dt,
-            end_date=end_dt,
-        )
+        if calendar_id == ALL_CALENDARS:
+            calendar_ids = await self._resolve_calendar_ids(access_token, [calendar_id], user_id)
+            events = await self._get_events_multi(
+                access_token, calendar_ids, start_dt, end_dt, user_id=user_id
+            )
+        else:
+            events = await self._get_events(
+                access_token, calendar_id, start_dt, end_dt, user_id=user_id
+            )
 
         simplified: List[Dict[str, Any]] = []
         for e in events:
-            simplified.append(
-                {
-                    "id": e.get("id"),
-                    "summary": e.get("summary"),
-                    "description": e.get("description"),
-                    "htmlLink": e.get("htmlLink"),
-                    "start": e.get("start"),
-                    "end": e.get("end"),
-                }
-            )
+            item = {
+                "id": e.get("id"),
+                "summary": e.get("summary"),
+                "description": e.get("description"),
+                "htmlLink": e.get("htmlLink"),
+                "start": e.get("start"),
+                "end": e.get("end"),
+            }
+            if "calendarId" in e:
+                item["calendar_id"] = e["calendarId"]
+            simplified.append(item)
 
         return {"events": simplified}
 
@@ -459,7 +1232,9 @@ class CalendarAgent:
         access_token: str,
         args: Dict[str, Any],
         tz_name: str,
+        user_id: Optional[str] = None,
     ) -> Dict[str, Any]:
+        zone = get_zone(tz_name)
         calendar_id = args.get("calendar_id") or "primary"
         summary = args.get("summary")
         start_str = args.get("start")
@@ -469,8 +1244,8 @@ class CalendarAgent:
         if not summary or not start_str or not end_str:
             return {"error": "summary, start and end are required"}
 
-        start_dt = _parse_rfc3339(start_str)
-        end_dt = _parse_rfc3339(end_str)
+        start_dt = parse_rfc3339(start_str, zone)
+        end_dt = parse_rfc3339(end_str, zone)
 
         event_data: Dict[str, Any] = {
             "summary": summary,
@@ -485,17 +1260,135 @@ class CalendarAgent:
             },
         }
 
-        created = await self.service.create_event(
-            access_token=access_token,
-            calendar_id=calendar_id,
-            event_data=event_data,
-        )
+        async def create() -> Optional[Dict[str, Any]]:
+            created = await self.service.create_event(
+                access_token=access_token,
+                calendar_id=calendar_id,
+                event_data=event_data,
+            )
+            if created:
+                # here rather than in the caller: a shared create outlives a
+                # cancelled caller, and a replay must not skip it either
+                self._invalidate_cached_events(user_id, calendar_id)
+            return created
+
+        replayed = False
+        if self.create_dedupe is not None and user_id is not None:
+            # a re-sent message (client timeout) must not create the event twice
+            key = (user_id, calendar_id, summary.strip(), start_dt, end_dt)
+            created, replayed = await self.create_dedupe.run(key, create)
+        else:
+            created = await create()
 
         if not created:
             return {"error": "Failed to create event"}
 
+        if replayed:
+            create_deduplicated.inc()
+            # the create ran in another turn; this turn's prefetch predates it
+            self._invalidate_cached_events(user_id, calendar_id)
+            return {
+                "event": created,
+                "note": "An identical event was created moments ago; it was not created again.",
+            }
+
         return {"event": created}
 
+    async def _handle_find_free_slots(
+        self,
+        access_token: str,
+        args: Dict[str, Any],
+        tz_name: str,
+        user_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        zone = get_zone(tz_name)
+        calendar_ids = args.get("calendar_ids") or ["primary"]
+        start_str = args.get("start")
+        end_str = args.get("end")
+        duration_minutes = args.get("duration_minutes")
+
+        if not start_str or not end_str or not duration_minutes:
+            return {"error": "start, end and duration_minutes are required"}
+        max_results = int(args.get("max_results") or 10)
+        if int(duration_minutes) < 1 or max_results < 1:
+            return {"error": "duration_minutes and max_results must be at least 1"}
+
+        start_dt = parse_rfc3339(start_str, zone)
+        end_dt = parse_rfc3339(end_str, zone)
+
+        working_hours: Optional[Tuple[dt_time, dt_time]] = None
+        if not args.get("any_time_of_day"):
+            day_start = args.get("working_hours_start")
+            day_end = args.get("working_hours_end")
+            try:
+                working_hours = (
+                    dt_time.fromisoformat(day_start) if day_start else DEFAULT_WORKING_HOURS[0],
+                    dt_time.fromisoformat(day_end) if day_end else DEFAULT_WORKING_HOURS[1],
+                )
+            except ValueError:
+                return {"error": "working hours must be in HH:MM format"}
+
+        calendar_ids = await self._resolve_calendar_ids(access_token, calendar_ids, user_id)
+        busy = await self._get_busy_intervals(
+            access_token, calendar_ids, start_dt, end_dt, zone, user_id=user_id
+        )
+        if busy is None:
+            return {"error": "Failed to load busy times"}
+
+        slots = find_free_slots(
+            busy,
+            start_dt,
+            end_dt,
+            min_duration=timedelta(minutes=int(duration_minutes)),
+            zone=zone,
+            working_hours=working_hours,
+            weekdays=args.get("weekdays"),
+            max_results=max_results,
+        )
+
+        return {
+            "timezone": tz_name,
+            "free_slots": [
+                {
+                    "start": slot_start.astimezone(zone).isoformat(),
+                    "end": slot_end.astimezone(zone).isoformat(),
+                    "duration_minutes": int((slot_end - slot_start).total_seconds() // 60),
+                }
+                for slot_start, slot_end in slots
+            ],
+        }
+
+    async def _get_busy_intervals(
+        self,
+        access_token: str,
+        calendar_ids: List[str],
+        start: datetime,
+        end: datetime,
+        zone: tzinfo,
+        user_id: Optional[str] = None,
+    ) -> Optional[List[Interval]]:
+        """
+        Busy intervals across calendars: one freeBusy request when enabled,
+        otherwise (or if it fails) from the calendars' events. Calendars the
+        freeBusy response reports errors for are read from their events too.
+        """
+        busy: List[Interval] = []
+        if self.use_google_free_busy:
+            response = await self.service.query_free_busy(
+                access_token, calendar_ids, start, end
+            )
+            if response is not None:
+                busy = busy_from_freebusy(response, calendar_ids)
+                calendar_ids = freebusy_failures(response, calendar_ids)
+                if not calendar_ids:
+                    return busy
+                freebusy_fallbacks.inc(len(calendar_ids))
+
+        events = await self._get_events_multi(
+            access_token, calendar_ids, start, end, max_results=2500, user_id=user_id
+        )
+        return busy + busy_from_events(events, zone)
+
     async def _find_events_for_action(
             self,
             access_token: str,
@@ -503,128 +1396,203 @@ class CalendarAgent:
             title: Optional[str],
             start: Optional[datetime],
             end: Optional[datetime],
+            user_id: Optional[str] = None,
     ) -> list:
         """
         Finds candidate events for update/delete.
-        - Filters by time
-        - Filters by partial title match (tokenized)
+        - Searches a narrow window first and widens it only on zero matches
+        - Ranks by fuzzy title match and proximity to `start`
+        - Returns (events, auto_selected): auto_selected is True only for a
+          single clear winner, which the caller may act on without asking
         """
-
-        # ---------- Time Range Logic ----------
-        if start and end:
-            search_start = start
-            search_end = end
-
-        elif start and not end:
-            # If only a start time was given, search +24 hours around it
-            search_start = start - timedelta(hours=2)
-            search_end = start + timedelta(hours=6)
-
+        # hour-aligned so repeated lookups reuse cached windows
+        now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+        searched: Optional[Tuple[datetime, datetime]] = None
+
+        if calendar_id == ALL_CALENDARS:
+            calendar_ids = await self._resolve_calendar_ids(access_token, [calendar_id], user_id)
+
+            async def fetch(seg_start: datetime, seg_end: datetime) -> List[Dict[str, Any]]:
+                return await self._get_events_multi(
+                    access_token, calendar_ids, seg_start, seg_end,
+                    max_results=50, user_id=user_id,
+                )
         else:
-            # Default fallback window: 7 days
-            now = datetime.now(timezone.utc)
-            search_start = now
-            search_end = now + timedelta(days=7)
-
-        # ---------- Fetch events ----------
-        events = await self.service.get_events(
-            access_token=access_token,
-            calendar_id=calendar_id,
-            start_date=search_start,
-            end_date=search_end,
-            max_results=50,
-        )
-
-        if not events:
-            return []
-
-        # ---------- Title Filtering ----------
-        if title:
-            title_words = [
-                word.lower()
-                for word in title.replace("-", " ").replace("_", " ").split()
-                if word.strip()
-            ]
-
-            def title_matches(event_title: str) -> bool:
-                t = event_title.lower()
-                # Each keyword must appear somewhere in title
-                return all(word in t for word in title_words)
-
-            filtered = [
-                e for e in events
-                if "summary" in e and title_matches(e["summary"])
-            ]
-
-            return filtered
-
-        return events
-
-    async def _handle_delete_event(self, access_token: str, args: Dict[str, Any]) -> Dict[str, Any]:
+            async def fetch(seg_start: datetime, seg_end: datetime) -> List[Dict[str, Any]]:
+                return await self._get_events(
+                    access_token, calendar_id, seg_start, seg_end,
+                    max_results=50, user_id=user_id,
+                )
+
+        for window_start, window_end in _search_windows(start, end, now, self.search_max_span):
+            # the inner window had no match, so only fetch the new outer ring
+            if searched is None:
+                segments = [(window_start, window_end)]
+            else:
+                segments = [(window_start, searched[0]), (searched[1], window_end)]
+            searched = (window_start, window_end)
+
+            batches = await asyncio.gather(*(
+                fetch(seg_start, seg_end)
+                for seg_start, seg_end in segments
+                if seg_start < seg_end
+            ))
+
+            events: Dict[Tuple[Any, Any], Dict[str, Any]] = {}
+            for batch in batches:
+                for e in batch:
+                    events.setdefault((e.get("calendarId"), e.get("id")), e)
+            if not events:
+                continue
+
+            matches, auto_selected = select_events(list(events.values()), title, start)
+            if matches:
+                return matches, auto_selected
+
+        return [], False
+
+    async def _handle_delete_event(
+        self,
+        access_token: str,
+        args: Dict[str, Any],
+        tz_name: str,
+        user_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        zone = get_zone(tz_name)
         calendar_id = args.get("calendar_id", "primary")
         event_id = args.get("event_id")
         title = args.get("title")
         start_str = args.get("start")
         end_str = args.get("end")
 
+        if event_id and calendar_id == ALL_CALENDARS:
+            return {"ok": False, "message": "calendar_id must be a specific calendar when event_id is given"}
+
         # If event_id already provided → delete directly
         if event_id:
-            ok = await self.service.delete_event(access_token, calendar_id, event_id)
+            ok = await self.service.delete_event(access_token, calendar_id, event_id, user_id=user_id)
             if ok:
+                self._invalidate_cached_events(user_id, calendar_id, event_id)
                 return {
                     "ok": True,
                     "message": "Deleted",
-                    "data": {"event_id": event_id},
+                    "data": {"event_id": event_id, "calendar_id": calendar_id},
                 }
             return {"ok": False, "message": "Failed to delete event"}
 
         # Otherwise → find event manually (by title + time window if provided)
-        start_dt = _parse_rfc3339(start_str) if start_str else None
-        end_dt = _parse_rfc3339(end_str) if end_str else None
+        start_dt = parse_rfc3339(start_str, zone) if start_str else None
+        end_dt = parse_rfc3339(end_str, zone) if end_str else None
 
-        events = await self._find_events_for_action(
+        events, auto_selected = await self._find_events_for_action(
             access_token=access_token,
             calendar_id=calendar_id,
             title=title,
             start=start_dt,
             end=end_dt,
+            user_id=user_id,
         )
 
         if len(events) == 0:
             return {"ok": False, "message": "No matching event found"}
 
-        if len(events) > 1:
+        if not auto_selected:
             # Let the model handle the clarification with the user
-            return {
-                "ok": False,
-                "message": "Multiple events match, need a more specific request",
-                "data": {
-                    "candidates": [
-                        {
-                            "id": e.get("id"),
-                            "summary": e.get("summary"),
-                            "start": e.get("start"),
-                            "end": e.get("end"),
-                        }
-                        for e in events
-                    ]
-                },
-            }
+            return _clarification(events)
 
         event = events[0]
         event_id = event["id"]
+        calendar_id = event.get("calendarId", calendar_id)
 
-        ok = await self.service.delete_event(access_token, calendar_id, event_id)
+        ok = await self.service.delete_event(access_token, calendar_id, event_id, user_id=user_id)
         if not ok:
             return {"ok": False, "message": "Failed to delete event"}
 
+        self._invalidate_cached_events(user_id, calendar_id, event_id)
+
         return {
             "ok": True,
             "message": "Deleted",
-            "data": {"event_id": event_id},
+            "data": {"event_id": event_id, "calendar_id": calendar_id},
+        }
+
+    async def _handle_bulk_delete_events(
+        self,
+        access_token: str,
+        args: Dict[str, Any],
+        tz_name: str,
+        user_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        zone = get_zone(tz_name)
+        calendar_id = args.get("calendar_id") or "primary"
+        start_str = args.get("start")
+        end_str = args.get("end")
+        title = args.get("title")
+
+        if not start_str or not end_str:
+            return {"error": "start and end are required"}
+        if self.job_queue is None or user_id is None:
+            return {"ok": False, "message": "Background jobs are not available"}
+
+        start_dt = parse_rfc3339(start_str, zone)
+        end_dt = parse_rfc3339(end_str, zone)
+
+        calendar_ids = await self._resolve_calendar_ids(access_token, [calendar_id], user_id)
+        events = await self._get_events_multi(
+            access_token, calendar_ids, start_dt, end_dt, max_results=2500, user_id=user_id
+        )
+        if title:
+            query = tokenize(title)
+            events = [
+                e for e in events
+                if title_similarity(query, e.get("summary") or "") >= MIN_TITLE_SCORE
+            ]
+        if not events:
+            return {"ok": False, "message": "No matching events found"}
+
+        payload = {
+            "events": [
+                {"id": e["id"], "calendar_id": e["calendarId"], "summary": e.get("summary")}
+                for e in events
+            ]
         }
+        try:
+            job = await self.job_queue.submit(user_id, BULK_DELETE_JOB, payload, access_token)
+        except JobQueueFull:
+            return {"ok": False, "message": "Too many background jobs, try again in a few minutes"}
 
-    async def _handle_update_event(self, access_token: str, args: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "ok": True,
+            "message": "Deletion started in the background",
+            "data": {"job_id": job.id, "count": len(events), "status_url": f"/ai/jobs/{job.id}"},
+        }
+
+    async def _run_bulk_delete(self, ctx: JobContext) -> None:
+        """Job handler; `job.result` doubles as the checkpoint for resumed jobs."""
+        events = ctx.job.payload["events"]
+        deleted: List[str] = ctx.job.result.setdefault("deleted", [])
+        failed: List[str] = ctx.job.result.setdefault("failed", [])
+        handled = set(deleted) | set(failed)
+        await ctx.report(len(handled), len(events))
+
+        for event in events:
+            if event["id"] in handled:
+                continue
+            ok = await self.service.delete_event(
+                ctx.access_token, event["calendar_id"], event["id"], user_id=ctx.job.user_id
+            )
+            (deleted if ok else failed).append(event["id"])
+            self._invalidate_cached_events(ctx.job.user_id, event["calendar_id"], event["id"])
+            await ctx.report(len(deleted) + len(failed))
+
+    async def _handle_update_event(
+        self,
+        access_token: str,
+        args: Dict[str, Any],
+        tz_name: str,
+        user_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        zone = get_zone(tz_name)
         calendar_id = args.get("calendar_id", "primary")
         event_id = args.get("event_id")
         title = args.get("title")
@@ -640,11 +1608,11 @@ class CalendarAgent:
             patch["description"] = args["new_description"]
 
         if "new_start" in args:
-            new_start_dt = _parse_rfc3339(args["new_start"])
+            new_start_dt = parse_rfc3339(args["new_start"], zone)
             patch.setdefault("start", {})
             patch["start"]["dateTime"] = new_start_dt.isoformat()
         if "new_end" in args:
-            new_end_dt = _parse_rfc3339(args["new_end"])
+            new_end_dt = parse_rfc3339(args["new_end"], zone)
             patch.setdefault("end", {})
             patch["end"]["dateTime"] = new_end_dt.isoformat()
 
@@ -655,67 +1623,74 @@ class CalendarAgent:
                 "message": "No fields to update (new_* fields are missing)",
             }
 
+        if event_id and calendar_id == ALL_CALENDARS:
+            return {"ok": False, "message": "calendar_id must be a specific calendar when event_id is given"}
+
         # 1. Direct update by event_id
         if event_id:
-            updated = await self.service.update_event(
-                access_token=access_token,
-                calendar_id=calendar_id,
-                event_id=event_id,
-                event_data=patch,
-            )
+            try:
+                updated = await self.service.update_event(
+                    access_token=access_token,
+                    calendar_id=calendar_id,
+                    event_id=event_id,
+                    event_data=patch,
+                    user_id=user_id,
+                )
+            except EventConflict as conflict:
+                self._invalidate_cached_events(user_id, calendar_id, event_id)
+                return _update_conflict(conflict)
             if updated:
+                self._invalidate_cached_events(user_id, calendar_id, event_id)
                 return {
                     "ok": True,
                     "message": "Updated",
-                    "data": {"event": updated},
+                    "data": {"event": updated, "calendar_id": calendar_id},
                 }
             return {"ok": False, "message": "Failed to update event"}
 
         # 2. Otherwise, find event to update (by title + time window if provided)
-        start_dt = _parse_rfc3339(start_str) if start_str else None
-        end_dt = _parse_rfc3339(end_str) if end_str else None
+        start_dt = parse_rfc3339(start_str, zone) if start_str else None
+        end_dt = parse_rfc3339(end_str, zone) if end_str else None
 
-        events = await self._find_events_for_action(
+        events, auto_selected = await self._find_events_for_action(
             access_token=access_token,
             calendar_id=calendar_id,
             title=title,
             start=start_dt,
             end=end_dt,
+            user_id=user_id,
         )
 
         if len(events) == 0:
             return {"ok": False, "message": "No matching event found"}
 
-        if len(events) > 1:
-            return {
-                "ok": False,
-                "message": "Multiple events match, need a more specific request",
-                "data": {
-                    "candidates": [
-                        {
-                            "id": e.get("id"),
-                            "summary": e.get("summary"),
-                            "start": e.get("start"),
-                            "end": e.get("end"),
-                        }
-                        for e in events
-                    ]
-                },
-            }
+        if not auto_selected:
+            return _clarification(events)
 
         event_id = events[0]["id"]
+        calendar_id = events[0].get("calendarId", calendar_id)
 
-        updated = await self.service.update_event(
-            access_token=access_token,
-            calendar_id=calendar_id,
-            event_id=event_id,
-            event_data=patch,
-        )
+        try:
+            updated = await self.service.update_event(
+                access_token=access_token,
+                calendar_id=calendar_id,
+                event_id=event_id,
+                event_data=patch,
+                # the version that was matched; a concurrent edit makes Google answer 412
+                etag=events[0].get("etag"),
+                user_id=user_id,
+            )
+        except EventConflict as conflict:
+            # the cached listing holds the version the user no longer sees
+            self._invalidate_cached_events(user_id, calendar_id, event_id)
+            return _update_conflict(conflict)
         if not updated:
             return {"ok": False, "message": "Failed to update event"}
 
+        self._invalidate_cached_events(user_id, calendar_id, event_id)
+
         return {
             "ok": True,
             "message": "Updated",
-            "data": {"event": updated},
+            "data": {"event": updated, "calendar_id": calendar_id},
         }
\ No newline at end of file
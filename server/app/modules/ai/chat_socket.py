@@ -0,0 +1,445 @@
+"""
+Chat over a WebSocket (/ai/ws).
+
+Every POST /ai/message verifies the app JWT, refreshes the Google access
+token and looks up the conversation before the agent starts. A socket does
+that once: the first frame authenticates, the Google token is kept fresh in
+the background, and the conversation stays resolved while the connection
+lasts. After that, a message costs only the agent turn.
+
+Protocol (JSON text frames):
+    -> {"type": "auth", "token": <app JWT>, "conversation_id"?: str, "timezone"?: str}
+    <- {"type": "ready", "conversation_id": str}
+    -> {"type": "message", "message": str, "timezone"?: str}
+    <- {"type": "progress", "stage": "tool" | "replying", ...}   (zero or more)
+    <- {"type": "reply", "reply": str, "conversation_id": str}
+    -> {"type": "cancel"}                                        (while a turn runs)
+    <- {"type": "cancelled"}
+    -> {"type": "ping"}  <- {"type": "pong"}
+    <- {"type": "error", "error": str}
+
+The Google refresh token comes from the same google_refresh_token cookie the
+HTTP endpoints use. Connections are bounded in total and per user. Idle
+sockets and sockets that never authenticate are closed. Only one turn runs
+per connection at a time. Outgoing frames wait in a bounded queue; a client
+that lets it fill up by not reading is disconnected with 1008.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+from starlette.websockets import WebSocket, WebSocketDisconnect
+
+from app.config import settings
+from app.modules.ai.recording import chat_turn
+from app.shared.metrics import metrics
+
+if TYPE_CHECKING:
+    from app.modules.auth.google_oauth_service import GoogleOAuthService
+    from app.services import Services
+
+
+logger = logging.getLogger(__name__)
+
+# close codes; 4401 mirrors HTTP 401 in the application range
+NORMAL_CLOSURE = 1000
+POLICY_VIOLATION = 1008
+TRY_AGAIN_LATER = 1013
+UNAUTHORIZED = 4401
+
+# progress updates beyond this many unsent frames are dropped
+MAX_QUEUED_PROGRESS = 32
+# any other frame that finds this many unsent closes the connection
+MAX_QUEUED_FRAMES = 64
+
+connections_opened = metrics.counter("ws_connections_total", "Chat sockets accepted")
+connections_rejected = metrics.counter(
+    "ws_connections_rejected_total", "Chat sockets refused by the connection limits"
+)
+idle_closes = metrics.counter("ws_idle_closed_total", "Chat sockets closed for inactivity")
+socket_turns = metrics.counter("ws_turns_total", "Agent turns run over a chat socket")
+progress_dropped = metrics.counter(
+    "ws_progress_dropped_total", "Progress updates dropped because the client was not reading"
+)
+slow_closes = metrics.counter(
+    "ws_slow_consumer_closed_total", "Chat sockets closed because the client stopped reading"
+)
+token_refreshes = metrics.counter(
+    "ws_google_token_refreshes_total", "Google access tokens refreshed for open chat sockets"
+)
+
+
+class ConnectionLimiter:
+    """Counts open chat sockets, in total and per authenticated user."""
+
+    def __init__(self, max_total: int, max_per_user: int) -> None:
+        self.max_total = max_total
+        self.max_per_user = max_per_user
+        self.active = 0
+        self._per_user: Dict[str, int] = {}
+
+    def acquire(self) -> bool:
+        """Reserve a slot for a new, not yet authenticated socket."""
+        if self.active >= self.max_total:
+            return False
+        self.active += 1
+        return True
+
+    def assign(self, user_id: str) -> bool:
+        """Attribute a reserved slot to a user; False if they already have too many."""
+        count = self._per_user.get(user_id, 0)
+        if count >= self.max_per_user:
+            return False
+        self._per_user[user_id] = count + 1
+        return True
+
+    def release(self, user_id: Optional[str]) -> None:
+        self.active -= 1
+        if user_id is None:
+            return
+        count = self._per_user.get(user_id, 0) - 1
+        if count > 0:
+            self._per_user[user_id] = count
+        else:
+            self._per_user.pop(user_id, None)
+
+
+class GoogleTokenKeeper:
+    """A Google access token for one socket, refreshed shortly before it expires."""
+
+    # used when Google's response has no expires_in
+    DEFAULT_LIFETIME_SECONDS = 3600.0
+    RETRY_SECONDS = 15.0
+
+    def __init__(
+        self,
+        google: GoogleOAuthService,
+        refresh_token: str,
+        refresh_before_seconds: float,
+    ) -> None:
+        self.google = google
+        self.refresh_token = refresh_token
+        self.refresh_before_seconds = refresh_before_seconds
+        self._token: Optional[str] = None
+        self._expires_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def token(self) -> Optional[str]:
+        """The current token, or None once it has expired without a successful refresh."""
+        if self._token is None or time.monotonic() >= self._expires_at:
+            return None
+        return self._token
+
+    async def start(self) -> bool:
+        if not await self._refresh():
+            return False
+        self._task = asyncio.create_task(self._keep_fresh())
+        return True
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _refresh(self) -> bool:
+        tokens = await self.google.refresh_access_token(self.refresh_token)
+        if not tokens or "access_token" not in tokens:
+            return False
+        lifetime = float(tokens.get("expires_in") or self.DEFAULT_LIFETIME_SECONDS)
+        self._token = tokens["access_token"]
+        self._expires_at = time.monotonic() + lifetime
+        token_refreshes.inc()
+        return True
+
+    async def _keep_fresh(self) -> None:
+        while True:
+            delay = self._expires_at - self.refresh_before_seconds - time.monotonic()
+            await asyncio.sleep(max(delay, self.RETRY_SECONDS))
+            while not await self._refresh():
+                if time.monotonic() >= self._expires_at:
+                    # revoked or Google is down; the next message closes the socket
+                    logger.warning("Google token refresh failed for a chat socket")
+                    return
+                await asyncio.sleep(self.RETRY_SECONDS)
+
+
+class ChatSocket:
+    """One /ai/ws connection, from handshake to close."""
+
+    def __init__(self, websocket: WebSocket, services: Services, limiter: ConnectionLimiter) -> None:
+        self.websocket = websocket
+        self.services = services
+        self.limiter = limiter
+        self.user_id: Optional[str] = None
+        self.session_expires_at: Optional[float] = None
+        self.conversation_id = ""
+        self.timezone: Optional[str] = None
+        self.tokens: Optional[GoogleTokenKeeper] = None
+        # frames are sent by one task so progress never interleaves with replies
+        self._outbox: asyncio.Queue = asyncio.Queue(maxsize=MAX_QUEUED_FRAMES)
+        self._sender: Optional[asyncio.Task] = None
+
+    async def run(self) -> None:
+        origin = self.websocket.headers.get("origin")
+        if origin is not None and origin not in settings.allowed_origins:
+            await self.websocket.close(code=POLICY_VIOLATION)
+            return
+        if not self.limiter.acquire():
+            connections_rejected.inc()
+            await self.websocket.close(code=TRY_AGAIN_LATER)
+            return
+
+        try:
+            await self.websocket.accept()
+            connections_opened.inc()
+            self._sender = asyncio.create_task(self._send_loop())
+            if await self._authenticate():
+                await self._serve()
+        except WebSocketDisconnect:
+            pass
+        finally:
+            if self.tokens is not None:
+                await self.tokens.stop()
+            if self._sender is not None and not self._sender.done():
+                self._sender.cancel()
+            # user_id is set once the slot has been assigned to the user
+            self.limiter.release(self.user_id)
+
+    # ---- handshake ----
+
+    async def _authenticate(self) -> bool:
+        try:
+            hello = await asyncio.wait_for(self._receive(), settings.ws_auth_timeout_seconds)
+        except asyncio.TimeoutError:
+            await self._close(POLICY_VIOLATION, "Authentication timed out")
+            return False
+        if not hello or hello.get("type") != "auth" or not isinstance(hello.get("token"), str):
+            await self._close(POLICY_VIOLATION, "Expected an auth message")
+            return False
+
+        payload = self.services.auth.verify_token(hello["token"])
+        if not payload or not payload.get("sub"):
+            await self._close(UNAUTHORIZED, "Invalid or expired token")
+            return False
+        refresh_token = self.websocket.cookies.get("google_refresh_token")
+        if not refresh_token:
+            await self._close(UNAUTHORIZED, "Missing refresh cookie")
+            return False
+
+        user_id = payload["sub"]
+        if not self.limiter.assign(user_id):
+            connections_rejected.inc()
+            await self._close(TRY_AGAIN_LATER, "Too many open connections")
+            return False
+        self.user_id = user_id
+
+        self.tokens = GoogleTokenKeeper(
+            self.services.google_oauth, refresh_token, settings.ws_token_refresh_before_seconds
+        )
+        if not await self.tokens.start():
+            await self._close(UNAUTHORIZED, "Failed to refresh Google access token")
+            return False
+
+        exp = payload.get("exp")
+        if isinstance(exp, (int, float)):
+            self.session_expires_at = time.monotonic() + (exp - time.time())
+        self.timezone = hello.get("timezone") if isinstance(hello.get("timezone"), str) else None
+
+        # jobs recovered after a restart wait for a fresh token from their user
+        self.services.job_queue.resume(user_id, self.tokens.token)
+
+        memory = self.services.memory
+        conversation_id = hello.get("conversation_id")
+        if not isinstance(conversation_id, str) or not memory.conversation_exists(user_id, conversation_id):
+            conversation_id = memory.start_conversation(user_id)
+        self.conversation_id = conversation_id
+
+        await self._send({"type": "ready", "conversation_id": conversation_id})
+        return True
+
+    # ---- messages ----
+
+    async def _serve(self) -> None:
+        while not self._sender.done():
+            try:
+                msg = await asyncio.wait_for(self._receive(), settings.ws_idle_timeout_seconds)
+            except asyncio.TimeoutError:
+                idle_closes.inc()
+                await self._close(NORMAL_CLOSURE, "Idle timeout")
+                return
+
+            kind = msg.get("type") if msg else None
+            if kind == "ping":
+                await self._send({"type": "pong"})
+                continue
+            if kind == "cancel":
+                # nothing is running; the turn it was meant for already finished
+                continue
+            text = msg.get("message") if kind == "message" else None
+            if not isinstance(text, str) or not text.strip():
+                await self._send_error("Expected a message")
+                continue
+            if len(text) > settings.ws_max_message_chars:
+                await self._send_error("Message is too long")
+                continue
+
+            if self.session_expires_at is not None and time.monotonic() >= self.session_expires_at:
+                await self._close(UNAUTHORIZED, "Session expired")
+                return
+            access_token = self.tokens.token
+            if access_token is None:
+                await self._close(UNAUTHORIZED, "Google access token expired")
+                return
+
+            timezone = msg.get("timezone") if isinstance(msg.get("timezone"), str) else self.timezone
+            await self._run_turn(text, timezone, access_token)
+
+    async def _run_turn(self, text: str, timezone: Optional[str], access_token: str) -> None:
+        socket_turns.inc()
+        with chat_turn(
+            self.services.recorder, self.services.agent,
+            self.user_id, self.conversation_id, text, timezone,
+        ) as record:
+            turn = asyncio.ensure_future(
+                self.services.agent.handle_user_message(
+                    user_id=self.user_id,
+                    conversation_id=self.conversation_id,
+                    user_message=text,
+                    user_timezone=timezone,
+                    access_token=access_token,
+                    progress=self._progress,
+                )
+            )
+            try:
+                cancelled, error = await self._await_turn(turn)
+            except WebSocketDisconnect:
+                record["cancelled"] = True
+                raise
+            if cancelled:
+                record["cancelled"] = True
+                await self._send({"type": "cancelled"})
+                return
+            if error is not None:
+                logger.error("Chat socket turn failed", exc_info=error)
+                record["error"] = repr(error)
+                await self._send_error("Failed to answer the message")
+                return
+            reply = turn.result()
+            record["reply"] = reply
+
+        await self._send({"type": "reply", "reply": reply, "conversation_id": self.conversation_id})
+
+    async def _await_turn(self, turn: asyncio.Future) -> Tuple[bool, Optional[BaseException]]:
+        """
+        Wait for the turn while still reading frames, so a cancel (or the
+        client leaving) stops it. Returns (cancelled, error).
+        """
+        receiving: Optional[asyncio.Future] = None
+        try:
+            while True:
+                if receiving is None:
+                    receiving = asyncio.ensure_future(self._receive())
+                done, _ = await asyncio.wait({turn, receiving}, return_when=asyncio.FIRST_COMPLETED)
+                if turn in done:
+                    return False, turn.exception()
+
+                msg = receiving.result()  # WebSocketDisconnect if the client left
+                receiving = None
+                if msg and msg.get("type") == "cancel":
+                    await _cancel(turn)
+                    return True, None
+                if msg and msg.get("type") == "ping":
+                    await self._send({"type": "pong"})
+                else:
+                    await self._send_error("Still answering the previous message")
+        except BaseException:
+            # disconnected, or the server is shutting down; writes still finish
+            await _cancel(turn)
+            raise
+        finally:
+            if receiving is not None and not receiving.done():
+                receiving.cancel()
+
+    # ---- frames ----
+
+    async def _receive(self) -> Optional[Dict[str, Any]]:
+        """The next JSON object from the client; None for anything else."""
+        message = await self.websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            raise WebSocketDisconnect(message.get("code", NORMAL_CLOSURE))
+        text = message.get("text")
+        if text is None:
+            return None
+        try:
+            data = json.loads(text)
+        except ValueError:
+            return None
+        return data if isinstance(data, dict) else None
+
+    def _progress(self, update: Dict[str, Any]) -> None:
+        if self._outbox.qsize() >= MAX_QUEUED_PROGRESS:
+            progress_dropped.inc()
+            return
+        self._outbox.put_nowait(("send", {"type": "progress", **update}))
+
+    async def _send(self, frame: Dict[str, Any]) -> None:
+        """Queue a frame; raises WebSocketDisconnect if the client stopped reading."""
+        try:
+            self._outbox.put_nowait(("send", frame))
+        except asyncio.QueueFull:
+            await self._abort()
+            raise WebSocketDisconnect(POLICY_VIOLATION)
+
+    async def _send_error(self, error: str) -> None:
+        await self._send({"type": "error", "error": error})
+
+    async def _close(self, code: int, reason: str) -> None:
+        """Close after everything queued so far has been sent."""
+        try:
+            self._outbox.put_nowait(("close", (code, reason)))
+        except asyncio.QueueFull:
+            await self._abort()
+            return
+        await asyncio.wait({self._sender})
+
+    async def _abort(self) -> None:
+        """Drop the unsent frames and close at once: the client is not reading."""
+        slow_closes.inc()
+        if self._sender is not None and not self._sender.done():
+            await _cancel(self._sender)
+        try:
+            await self.websocket.close(code=POLICY_VIOLATION, reason="Client is not reading")
+        except Exception:
+            pass
+
+    async def _send_loop(self) -> None:
+        while True:
+            action, value = await self._outbox.get()
+            try:
+                if action == "close":
+                    code, reason = value
+                    await self.websocket.close(code=code, reason=reason)
+                    return
+                await self.websocket.send_text(json.dumps(value, ensure_ascii=False))
+            except Exception:
+                # the client is gone; the receive side notices on its next read
+                return
+
+
+async def _cancel(task: asyncio.Future) -> None:
+    task.cancel()
+    try:
+        await task
+    except (asyncio.CancelledError, Exception):
+        pass
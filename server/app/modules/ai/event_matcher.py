@@ -0,0 +1,201 @@
+"""
+Ranking of candidate events for update/delete lookups.
+
+The model describes the event it wants ("meeting with John", "הפגישה עם דני")
+and we score every event in the search window by:
+- fuzzy token similarity between the description and the event title
+  (Hebrew-aware: niqqud, final letters and one-letter prefixes are normalized),
+- proximity of the event start to the hinted start time, if any.
+
+A single clear winner is auto-selected; otherwise the ranked candidates are
+returned so the model can ask the user.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.shared.datetime_utils import parse_event_time
+
+
+MIN_TITLE_SCORE = 0.5          # below this an event is not a candidate
+AUTO_SELECT_SCORE = 0.75       # top candidate must reach this ...
+AUTO_SELECT_MARGIN = 0.15      # ... and beat the runner-up by this much
+TIME_WEIGHT = 0.25             # share of the score given to start-time proximity
+TIME_SCALE_HOURS = 2.0         # proximity halves every TIME_SCALE_HOURS
+MAX_CANDIDATES = 10
+
+_STOPWORDS = {
+    # English
+    "a", "an", "the", "my", "with", "w", "and", "at", "on", "in", "to", "for", "of",
+    # Hebrew (after normalization)
+    "עמ", "של", "את", "עלי", "על",
+}
+
+_NIQQUD = re.compile(r"[֑-ׇ]")
+_SPLIT = re.compile(r"[^\w]+", re.UNICODE)
+_FINAL_LETTERS = str.maketrans("ךםןףץ", "כמנפצ")
+_HEBREW_PREFIXES = "והבכלמש"
+
+
+@dataclass
+class RankedEvent:
+    event: Dict[str, Any]
+    score: float
+    title_score: float
+    time_score: float
+
+
+# ---------- tokenization ----------
+
+def _is_hebrew(token: str) -> bool:
+    return "א" <= token[0] <= "ת"
+
+
+@lru_cache(maxsize=4096)
+def tokenize(text: str) -> Tuple[Tuple[str, ...], ...]:
+    """
+    Split text into normalized tokens. Each token is returned with its
+    variants (e.g. Hebrew "הפגישה" -> ("הפגישה", "פגישה")).
+    """
+    text = _NIQQUD.sub("", text.casefold()).replace("w/", "with ")
+    text = text.translate(_FINAL_LETTERS)
+
+    tokens = []
+    for raw in _SPLIT.split(text):
+        if not raw or raw in _STOPWORDS:
+            continue
+        variants = [raw]
+        if len(raw) >= 4 and _is_hebrew(raw) and raw[0] in _HEBREW_PREFIXES:
+            variants.append(raw[1:])
+        tokens.append(tuple(variants))
+    return tuple(tokens)
+
+
+# ---------- similarity ----------
+
+def _levenshtein(a: str, b: str) -> int:
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ca != cb),
+            ))
+        previous = current
+    return previous[-1]
+
+
+@lru_cache(maxsize=65536)
+def _token_similarity(a: str, b: str) -> float:
+    if a == b:
+        return 1.0
+    shorter = min(len(a), len(b))
+    if shorter >= 3 and (a.startswith(b) or b.startswith(a)):
+        return 0.9
+    if abs(len(a) - len(b)) > 2 or shorter < 3:
+        return 0.0
+    ratio = 1.0 - _levenshtein(a, b) / max(len(a), len(b))
+    return ratio if ratio >= 0.6 else 0.0
+
+
+def title_similarity(query_tokens: Tuple[Tuple[str, ...], ...], title: str) -> float:
+    """Mean best-match similarity of each query token against the title."""
+    if not query_tokens:
+        return 0.0
+    title_tokens = tokenize(title)
+    if not title_tokens:
+        return 0.0
+
+    total = 0.0
+    for q_variants in query_tokens:
+        best = 0.0
+        for t_variants in title_tokens:
+            for q in q_variants:
+                for t in t_variants:
+                    sim = _token_similarity(q, t)
+                    if sim > best:
+                        best = sim
+            if best == 1.0:
+                break
+        total += best
+    return total / len(query_tokens)
+
+
+def _event_start(event: Dict[str, Any]) -> Optional[datetime]:
+    try:
+        return parse_event_time(event.get("start") or {}, timezone.utc)
+    except ValueError:
+        return None
+
+
+def _time_proximity(event: Dict[str, Any], start_hint: datetime) -> float:
+    event_start = _event_start(event)
+    if event_start is None:
+        return 0.0
+    hours = abs((event_start - start_hint).total_seconds()) / 3600.0
+    return 0.5 ** (hours / TIME_SCALE_HOURS)
+
+
+# ---------- ranking ----------
+
+def rank_events(
+    events: List[Dict[str, Any]],
+    title: Optional[str],
+    start_hint: Optional[datetime] = None,
+) -> List[RankedEvent]:
+    """Score and sort events, dropping those whose title clearly doesn't match."""
+    query_tokens = tokenize(title) if title else ()
+
+    ranked: List[RankedEvent] = []
+    for event in events:
+        title_score = 0.0
+        if query_tokens:
+            title_score = title_similarity(query_tokens, event.get("summary") or "")
+            if title_score < MIN_TITLE_SCORE:
+                continue
+
+        time_score = _time_proximity(event, start_hint) if start_hint else 0.0
+
+        if query_tokens and start_hint:
+            score = (1 - TIME_WEIGHT) * title_score + TIME_WEIGHT * time_score
+        elif query_tokens:
+            score = title_score
+        else:
+            score = time_score
+
+        ranked.append(RankedEvent(event, score, title_score, time_score))
+
+    ranked.sort(key=lambda r: r.score, reverse=True)
+    return ranked
+
+
+def select_events(
+    events: List[Dict[str, Any]],
+    title: Optional[str],
+    start_hint: Optional[datetime] = None,
+) -> Tuple[List[Dict[str, Any]], bool]:
+    """
+    Return ([event], True) when there is one clear winner, otherwise
+    (candidates, False) with the ranked candidates (possibly empty) for the
+    model to clarify with the user. A lone candidate is not a clear winner
+    unless its score is: it may only share a word with the description.
+    """
+    ranked = rank_events(events, title, start_hint)
+    if not ranked:
+        return [], False
+
+    top = ranked[0]
+    runner_up = ranked[1].score if len(ranked) > 1 else 0.0
+    if top.score >= AUTO_SELECT_SCORE and top.score - runner_up >= AUTO_SELECT_MARGIN:
+        return [top.event], True
+
+    return [r.event for r in ranked[:MAX_CANDIDATES]], False
@@ -0,0 +1,276 @@
+"""
+Rule-based detection of simple "what's on my calendar <when>" messages.
+
+Only whole-message matches are accepted: a query phrase, an optional filler
+("on my calendar", "ביומן") and a single range phrase. Anything else (a time,
+a name, a verb we don't know) returns None so the caller falls back to the LLM.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import Any, Dict, List, Literal, Optional
+
+from app.shared.datetime_utils import get_zone, parse_event_time
+
+
+Language = Literal["he", "en"]
+
+
+@dataclass(frozen=True)
+class ListIntent:
+    """A resolved list_events request in the user's time zone."""
+
+    range_key: str
+    start: datetime
+    end: datetime
+    language: Language
+
+
+# ---- grammar ----
+
+# query phrases that are a complete request on their own ("show tomorrow")
+_EN_QUERY = (
+    r"(?:what do i have|what have i got|show(?: me)?|list|"
+    r"do i have (?:anything|any (?:events|meetings))|any (?:events|meetings)|"
+    r"my (?:schedule|calendar|agenda|events))"
+)
+# bare "what" needs a filler, otherwise "what is today" would list events
+_EN_WEAK_QUERY = r"(?:what|what's|what is|whats)"
+_EN_FILLER = (
+    r"(?:(?:on|in) (?:my )?(?:calendar|schedule|agenda)|"
+    r"(?:my )?(?:events|meetings|schedule|calendar|agenda|plans)|"
+    r"planned|scheduled|on)"
+)
+_EN_RANGES = {
+    "today": r"today|for today",
+    "tomorrow": r"tomorrow|for tomorrow",
+    "day_after_tomorrow": r"the day after tomorrow|day after tomorrow",
+    "this_week": r"this week|for this week",
+    "next_week": r"next week|for next week",
+}
+
+_HE_QUERY = (
+    r"(?:מה יש לי|מה יש|מה מתוכנן|מה בלוז|מה הלוז|מה בלו\"ז|מה הלו\"ז|"
+    r"תראה לי|תראי לי|הראה לי|הצג|הצג לי|יש לי משהו|יש לי פגישות|"
+    r"האירועים שלי|הפגישות שלי|הלוז שלי|הלו\"ז שלי)"
+)
+_HE_FILLER = (
+    r"(?:ביומן|ביומן שלי|בלוז|בלו\"ז|את האירועים|את הפגישות|את הלוז|את הלו\"ז|"
+    r"אירועים|פגישות|לי)"
+)
+_HE_RANGES = {
+    "today": r"היום|להיום",
+    "tomorrow": r"מחר|למחר",
+    "day_after_tomorrow": r"מחרתיים|למחרתיים",
+    "this_week": r"השבוע|לשבוע הזה|בשבוע הזה",
+    "next_week": r"שבוע הבא|השבוע הבא|בשבוע הבא|לשבוע הבא",
+}
+
+
+def _compile(
+    query: str,
+    filler: str,
+    ranges: Dict[str, str],
+    filler_required: bool = False,
+) -> List[tuple]:
+    # "<query> [filler...] <range> [filler]"
+    repeat = "+?" if filler_required else "*?"
+    compiled = []
+    for key, range_re in ranges.items():
+        pattern = rf"^{query}(?: {filler}){repeat} (?:{range_re})(?: {filler})?$"
+        compiled.append((key, re.compile(pattern)))
+    return compiled
+
+
+_EN_PATTERNS = _compile(_EN_QUERY, _EN_FILLER, _EN_RANGES)
+_EN_PATTERNS += _compile(_EN_WEAK_QUERY, _EN_FILLER, _EN_RANGES, filler_required=True)
+# "<range>'s events"
+_EN_PATTERNS += [
+    (key, re.compile(rf"^(?:{range_re})(?:'s)? (?:events|meetings|schedule|agenda|plans)$"))
+    for key, range_re in _EN_RANGES.items()
+]
+_HE_PATTERNS = _compile(_HE_QUERY, _HE_FILLER, _HE_RANGES)
+
+_HEBREW_CHARS = re.compile(r"[֐-׿]")
+_PUNCT = re.compile(r"[?!.,;:¿־׃]+")
+_QUOTES = re.compile(r"[״”“]")
+_SPACES = re.compile(r"\s+")
+
+
+def _normalize(message: str) -> str:
+    text = _QUOTES.sub('"', message.strip().lower())
+    text = text.replace("’", "'")
+    text = _PUNCT.sub(" ", text)
+    return _SPACES.sub(" ", text).strip()
+
+
+def _range_bounds(range_key: str, now_local: datetime, language: Language) -> tuple:
+    today = now_local.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    if range_key == "today":
+        return today, today + timedelta(days=1)
+    if range_key == "tomorrow":
+        return today + timedelta(days=1), today + timedelta(days=2)
+    if range_key == "day_after_tomorrow":
+        return today + timedelta(days=2), today + timedelta(days=3)
+
+    # Israeli weeks start on Sunday, English-speaking users get Monday
+    week_start_weekday = 6 if language == "he" else 0
+    days_since_week_start = (today.weekday() - week_start_weekday) % 7
+    week_start = today - timedelta(days=days_since_week_start)
+
+    if range_key == "this_week":
+        return today, week_start + timedelta(days=7)
+    if range_key == "next_week":
+        return week_start + timedelta(days=7), week_start + timedelta(days=14)
+
+    raise ValueError(f"Unknown range: {range_key}")
+
+
+def parse_list_intent(
+    message: str,
+    tz_name: str,
+    now: Optional[datetime] = None,
+) -> Optional[ListIntent]:
+    """
+    Return a ListIntent if the message is confidently a plain
+    "list my events for <range>" request, otherwise None.
+    """
+    if len(message) > 80:
+        return None
+
+    text = _normalize(message)
+    language: Language = "he" if _HEBREW_CHARS.search(text) else "en"
+    patterns = _HE_PATTERNS if language == "he" else _EN_PATTERNS
+
+    for range_key, pattern in patterns:
+        if pattern.match(text):
+            zone = get_zone(tz_name)
+            now_local = (now or datetime.now(timezone.utc)).astimezone(zone)
+            start, end = _range_bounds(range_key, now_local, language)
+            return ListIntent(range_key=range_key, start=start, end=end, language=language)
+
+    return None
+
+
+# ---- loose mentions ----
+
+# longer phrases first, so "day after tomorrow" isn't also read as "tomorrow"
+_MENTION_ORDER = ("day_after_tomorrow", "next_week", "this_week", "tomorrow", "today")
+_EN_MENTIONS = [
+    (key, re.compile(rf"(?<!\w)(?:{_EN_RANGES[key]})(?!\w)")) for key in _MENTION_ORDER
+]
+_HE_MENTIONS = [
+    (key, re.compile(rf"(?<!\w)(?:{_HE_RANGES[key]})(?!\w)")) for key in _MENTION_ORDER
+]
+
+
+def find_range_mention(
+    message: str,
+    tz_name: str,
+    now: Optional[datetime] = None,
+) -> Optional[ListIntent]:
+    """
+    Range phrases anywhere in the message ("move my 3pm tomorrow to 5"),
+    merged into one window. Only a hint for prefetching: unlike
+    parse_list_intent it says nothing about what the user wants done.
+    """
+    text = _normalize(message)
+    language: Language = "he" if _HEBREW_CHARS.search(text) else "en"
+    mentions = _HE_MENTIONS if language == "he" else _EN_MENTIONS
+
+    found = []
+    for range_key, pattern in mentions:
+        text, count = pattern.subn(" ", text)
+        if count:
+            found.append(range_key)
+    if not found:
+        return None
+
+    zone = get_zone(tz_name)
+    now_local = (now or datetime.now(timezone.utc)).astimezone(zone)
+    bounds = [_range_bounds(key, now_local, language) for key in found]
+    return ListIntent(
+        range_key=found[0] if len(found) == 1 else "mixed",
+        start=min(start for start, _ in bounds),
+        end=max(end for _, end in bounds),
+        language=language,
+    )
+
+
+# ---- rendering ----
+
+_RANGE_LABELS = {
+    "en": {
+        "today": "today",
+        "tomorrow": "tomorrow",
+        "day_after_tomorrow": "the day after tomorrow",
+        "this_week": "for the rest of this week",
+        "next_week": "next week",
+    },
+    "he": {
+        "today": "היום",
+        "tomorrow": "מחר",
+        "day_after_tomorrow": "מחרתיים",
+        "this_week": "השבוע",
+        "next_week": "בשבוע הבא",
+    },
+}
+
+_HE_WEEKDAYS = ["שני", "שלישי", "רביעי", "חמישי", "שישי", "שבת", "ראשון"]
+
+
+def _event_start_local(value: Dict[str, Any], zone: tzinfo) -> Optional[datetime]:
+    dt = parse_event_time(value, zone)
+    return dt.astimezone(zone) if dt is not None else None
+
+
+def _format_event_line(event: Dict[str, Any], intent: ListIntent, zone: tzinfo) -> str:
+    summary = event.get("summary") or ("(ללא כותרת)" if intent.language == "he" else "(no title)")
+    start_info = event.get("start") or {}
+    start = _event_start_local(start_info, zone)
+    end = _event_start_local(event.get("end") or {}, zone)
+
+    multi_day = intent.range_key in ("this_week", "next_week")
+    day_prefix = ""
+    if multi_day and start is not None:
+        if intent.language == "he":
+            day_prefix = f"יום {_HE_WEEKDAYS[start.weekday()]} {start:%d/%m} "
+        else:
+            day_prefix = f"{start:%a %d/%m} "
+
+    if "date" in start_info or start is None:
+        when = "כל היום" if intent.language == "he" else "all day"
+    elif end is not None:
+        when = f"{start:%H:%M}–{end:%H:%M}"
+    else:
+        when = f"{start:%H:%M}"
+
+    return f"- {day_prefix}{when} {summary}"
+
+
+def render_list_reply(events: List[Dict[str, Any]], intent: ListIntent) -> str:
+    """Build the reply the model would otherwise write for a list_events result."""
+    zone = intent.start.tzinfo or timezone.utc
+    label = _RANGE_LABELS[intent.language][intent.range_key]
+
+    if not events:
+        if intent.language == "he":
+            return f"אין לך אירועים {label}."
+        return f"You have no events {label}."
+
+    if intent.language == "he":
+        header = f"אלה האירועים שלך {label}:"
+    else:
+        header = f"Here are your events {label}:"
+
+    far_future = datetime.max.replace(tzinfo=timezone.utc)
+    ordered = sorted(
+        events,
+        key=lambda e: _event_start_local(e.get("start") or {}, zone) or far_future,
+    )
+    lines = [_format_event_line(e, intent, zone) for e in ordered]
+    return "\n".join([header, *lines])
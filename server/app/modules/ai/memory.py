@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+import threading
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Dict, List, Literal, TypedDict
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Literal, Optional, Tuple, TypedDict
 from uuid import uuid4
 
+if TYPE_CHECKING:
+    from app.modules.ai.memory_store import ConversationLog
+
 
 Role = Literal["user", "assistant"]
 
@@ -21,6 +25,36 @@ class Message:
     created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
 
 
+class EventRefDict(TypedDict):
+    event_id: str
+    calendar_id: str
+    summary: Optional[str]
+    start: Optional[str]
+    end: Optional[str]
+
+
+@dataclass
+class Conversation:
+    """
+    Messages of one conversation plus a rolling summary of older ones.
+
+    Message positions are counted from the start of the conversation:
+    `dropped` messages were trimmed from the front of `messages`, and the
+    first `summarized` messages are covered by `summary`.
+    `recent_events` are events the tools resolved in earlier turns, newest first.
+    """
+
+    messages: List[Message] = field(default_factory=list)
+    summary: str = ""
+    summarized: int = 0
+    dropped: int = 0
+    recent_events: List[EventRefDict] = field(default_factory=list)
+
+    @property
+    def total(self) -> int:
+        return self.dropped + len(self.messages)
+
+
 class ConversationMemory:
     """
     Very simple in-memory conversation store.
@@ -28,14 +62,40 @@ class ConversationMemory:
     Structure:
         {
             user_id: {
-                conversation_id: [Message, Message, ...]
+                conversation_id: Conversation(messages=[Message, ...], summary="...")
             }
         }
+
+    With a ConversationLog every change is also appended to a log on disk
+    (see memory_store.py), and the store is rebuilt from it on construction.
     """
 
-    def __init__(self, max_messages_per_conversation: int = 30) -> None:
+    def __init__(
+        self,
+        max_messages_per_conversation: int = 30,
+        max_recent_events: int = 10,
+        log: Optional[ConversationLog] = None,
+    ) -> None:
         self.max_messages_per_conversation = max_messages_per_conversation
-        self._store: Dict[str, Dict[str, List[Message]]] = {}
+        self.max_recent_events = max_recent_events
+        self._store: Dict[str, Dict[str, Conversation]] = {}
+        # held while changing the store, so the log sees changes in order
+        self._lock = threading.Lock()
+        self._log: Optional[ConversationLog] = None
+        if log is not None:
+            log.recover(self)
+            log.start(self)
+            self._log = log
+
+    def close(self) -> None:
+        """Flush and close the log, if any."""
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+    def _record(self, *record: Any) -> None:
+        if self._log is not None:
+            self._log.append(record)
 
     # ---- conversation management ----
 
@@ -44,8 +104,9 @@ class ConversationMemory:
         Create a new empty conversation for this user and return its id.
         """
         conv_id = str(uuid4())
-        user_convs = self._store.setdefault(user_id, {})
-        user_convs[conv_id] = []
+        with self._lock:
+            self._store.setdefault(user_id, {})[conv_id] = Conversation()
+            self._record("c", user_id, conv_id)
         return conv_id
 
     def conversation_exists(self, user_id: str, conversation_id: str) -> bool:
@@ -54,6 +115,9 @@ class ConversationMemory:
         """
         return conversation_id in self._store.get(user_id, {})
 
+    def _get(self, user_id: str, conversation_id: str) -> Optional[Conversation]:
+        return self._store.get(user_id, {}).get(conversation_id)
+
     # ---- messages ----
 
     def add_message(
@@ -62,18 +126,30 @@ class ConversationMemory:
         conversation_id: str,
         role: Role,
         content: str,
+        created_at: Optional[datetime] = None,
     ) -> None:
         """
         Append a message to a specific user's conversation.
         """
-        user_convs = self._store.setdefault(user_id, {})
-        messages = user_convs.setdefault(conversation_id, [])
+        message = Message(role=role, content=content)
+        if created_at is not None:
+            message.created_at = created_at
+
+        with self._lock:
+            user_convs = self._store.setdefault(user_id, {})
+            conversation = user_convs.setdefault(conversation_id, Conversation())
 
-        messages.append(Message(role=role, content=content))
+            # a new list rather than an append: snapshots hold on to the old one
+            messages = conversation.messages + [message]
 
-        # keep only last N messages
-        if len(messages) > self.max_messages_per_conversation:
-            user_convs[conversation_id] = messages[-self.max_messages_per_conversation :]
+            # keep only last N messages
+            overflow = len(messages) - self.max_messages_per_conversation
+            if overflow > 0:
+                messages = messages[overflow:]
+                conversation.dropped += overflow
+            conversation.messages = messages
+
+            self._record("m", user_id, conversation_id, role, content, message.created_at.timestamp())
 
     def get_recent_messages(
         self,
@@ -85,11 +161,145 @@ class ConversationMemory:
         Return the last `limit` messages for this user + conversation,
         in the exact format OpenAI expects: {"role": "...", "content": "..."}.
         """
-        user_convs = self._store.get(user_id, {})
-        messages = user_convs.get(conversation_id, [])
+        conversation = self._get(user_id, conversation_id)
+        messages = conversation.messages if conversation else []
 
         recent = messages[-limit:]
         return [
             MessageDict(role=m.role, content=m.content)
             for m in recent
         ]
+
+    def get_unsummarized_messages(
+        self,
+        user_id: str,
+        conversation_id: str,
+        limit: int = 10,
+    ) -> List[MessageDict]:
+        """
+        Return every message the summary does not cover yet, and at least the
+        last `limit` messages. Between a message leaving the recent window and
+        the next summary refresh, that is more than `limit`.
+        """
+        conversation = self._get(user_id, conversation_id)
+        if conversation is None:
+            return []
+
+        start = max(conversation.summarized - conversation.dropped, 0)
+        recent = conversation.messages[min(start, max(len(conversation.messages) - limit, 0)):]
+        return [
+            MessageDict(role=m.role, content=m.content)
+            for m in recent
+        ]
+
+    # ---- summary ----
+
+    def get_summary(self, user_id: str, conversation_id: str) -> str:
+        """
+        Return the rolling summary of messages older than the recent window.
+        """
+        conversation = self._get(user_id, conversation_id)
+        return conversation.summary if conversation else ""
+
+    def pending_summary_messages(
+        self,
+        user_id: str,
+        conversation_id: str,
+        window: int,
+    ) -> Tuple[List[MessageDict], int]:
+        """
+        Return messages that fell out of the last `window` messages but are not
+        in the summary yet, and the position the summary will cover once they
+        are folded in.
+        """
+        conversation = self._get(user_id, conversation_id)
+        if conversation is None:
+            return [], 0
+
+        fold_until = conversation.total - window
+        # messages trimmed before being summarized are lost for good
+        fold_from = max(conversation.summarized, conversation.dropped)
+        if fold_until <= fold_from:
+            return [], conversation.summarized
+
+        pending = conversation.messages[
+            fold_from - conversation.dropped : fold_until - conversation.dropped
+        ]
+        return [MessageDict(role=m.role, content=m.content) for m in pending], fold_until
+
+    def set_summary(
+        self,
+        user_id: str,
+        conversation_id: str,
+        summary: str,
+        summarized_until: int,
+    ) -> None:
+        """
+        Store a new rolling summary covering the first `summarized_until` messages.
+        """
+        with self._lock:
+            conversation = self._get(user_id, conversation_id)
+            if conversation is None or summarized_until < conversation.summarized:
+                return
+            conversation.summary = summary
+            conversation.summarized = summarized_until
+            self._record("s", user_id, conversation_id, summary, summarized_until)
+
+    # ---- turn context ----
+
+    def remember_events(
+        self,
+        user_id: str,
+        conversation_id: str,
+        events: List[EventRefDict],
+    ) -> None:
+        """
+        Record events a tool call resolved, so follow-up turns can address
+        them by id. Newer references replace older ones for the same event.
+        """
+        if not events:
+            return
+        with self._lock:
+            user_convs = self._store.setdefault(user_id, {})
+            conversation = user_convs.setdefault(conversation_id, Conversation())
+
+            keys = {(e["calendar_id"], e["event_id"]) for e in events}
+            older = [
+                e for e in conversation.recent_events
+                if (e["calendar_id"], e["event_id"]) not in keys
+            ]
+            conversation.recent_events = (list(events) + older)[: self.max_recent_events]
+            self._record("e", user_id, conversation_id, list(events))
+
+    def forget_event(
+        self,
+        user_id: str,
+        conversation_id: str,
+        calendar_id: str,
+        event_id: str,
+    ) -> None:
+        """Drop a reference to an event that no longer exists."""
+        with self._lock:
+            conversation = self._get(user_id, conversation_id)
+            if conversation is None:
+                return
+            conversation.recent_events = [
+                e for e in conversation.recent_events
+                if (e["calendar_id"], e["event_id"]) != (calendar_id, event_id)
+            ]
+            self._record("f", user_id, conversation_id, calendar_id, event_id)
+
+    def get_recent_events(self, user_id: str, conversation_id: str) -> List[EventRefDict]:
+        """Events referenced in earlier turns, newest first."""
+        conversation = self._get(user_id, conversation_id)
+        return list(conversation.recent_events) if conversation else []
+
+    # ---- persistence (used by memory_store.py, with the lock held) ----
+
+    def _conversations(self) -> Iterator[Tuple[str, str, Conversation]]:
+        for user_id, user_convs in self._store.items():
+            for conversation_id, conversation in user_convs.items():
+                yield user_id, conversation_id, conversation
+
+    def _put(self, user_id: str, conversation_id: str, conversation: Conversation) -> None:
+        self._store.setdefault(user_id, {})[conversation_id] = conversation
@@ -0,0 +1,375 @@
+"""
+Crash-safe local persistence for ConversationMemory, for single-node
+deployments without Redis.
+
+Every change to the memory is appended to a log file. ConversationMemory only
+adds the record to an in-memory batch. A background thread writes each batch
+to disk with one write and one fsync, so requests never wait on the disk.
+Once the log has grown to `snapshot_growth` times the size of the last
+snapshot, the thread writes a compacted snapshot with one line per
+conversation and deletes the older files. A startup therefore replays at
+most about that fraction of the snapshot, and once the store stops growing,
+bytes written settle at (1 + 1/snapshot_growth) times the bytes logged.
+
+Files in the directory, for generation N:
+    snapshot-N.jsonl   the whole store as of the moment log-N was started
+    log-N.jsonl        changes since then, one JSON array per line
+
+Startup loads the newest snapshot and replays every log of the same or a
+later generation. Both are read through mmap. A torn last line, left by a
+crash in the middle of a write, is cut off. At most the last unflushed
+batch (flush_interval_ms) is lost.
+
+Benchmark: python -m benchmarks.bench_memory_store
+"""
+
+from __future__ import annotations
+
+import gc
+import json
+import logging
+import mmap
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from app.shared.metrics import metrics
+
+if TYPE_CHECKING:
+    from app.modules.ai.memory import ConversationMemory
+
+
+logger = logging.getLogger(__name__)
+
+_FILE_RE = re.compile(r"^(snapshot|log)-(\d+)\.jsonl$")
+
+log_bytes = metrics.counter("conversation_log_bytes_total", "Bytes appended to the conversation log")
+snapshot_bytes = metrics.counter(
+    "conversation_snapshot_bytes_total", "Bytes written to conversation snapshots"
+)
+log_write_errors = metrics.counter(
+    "conversation_log_write_errors_total", "Failed writes of conversation log batches"
+)
+flush_ms = metrics.histogram("conversation_log_flush_ms", "Time to write and fsync one log batch")
+snapshot_ms = metrics.histogram("conversation_snapshot_ms", "Time to write one compacted snapshot")
+
+
+def _encode(record: Any) -> bytes:
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+@contextmanager
+def _gc_paused() -> Iterator[None]:
+    """
+    Bulk loads and copies allocate millions of objects, and the collector's
+    full passes over them more than double the time; pause it meanwhile.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _scan(path: str, apply: Callable[[Any], None]) -> Tuple[int, int, int]:
+    """
+    Apply every complete JSON line of a file.
+    Returns (records applied, offset after the last complete line, file size).
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return 0, 0, 0
+        applied = 0
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            pos = 0
+            while pos < size:
+                end = mm.find(b"\n", pos)
+                if end < 0:
+                    # torn write at the tail
+                    break
+                try:
+                    apply(json.loads(mm[pos:end]))
+                    applied += 1
+                except (ValueError, TypeError, KeyError, IndexError):
+                    logger.warning("Skipping unreadable record at %s:%d", path, pos)
+                pos = end + 1
+        return applied, pos, size
+
+
+class ConversationLog:
+    """Append-only log plus periodic snapshots of one ConversationMemory."""
+
+    def __init__(
+        self,
+        directory: str,
+        flush_interval_ms: float = 200.0,
+        snapshot_growth: float = 1.0,
+        snapshot_min_bytes: int = 16 * 1024 * 1024,
+        fsync: bool = True,
+    ) -> None:
+        self.directory = directory
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.snapshot_growth = snapshot_growth
+        self.snapshot_min_bytes = snapshot_min_bytes
+        self.fsync = fsync
+
+        self._memory: Optional[ConversationMemory] = None
+        self._generation = 0
+        self._file: Optional[Any] = None
+        # appended to under the memory's lock
+        self._pending: List[Tuple[Any, ...]] = []
+        # bytes in the current snapshot, and logged since it was taken
+        self._snapshot_size = 0
+        self._logged_since = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # guards the files, so close() and the flusher never write at once
+        self._io_lock = threading.Lock()
+
+    # ---- lifecycle ----
+
+    def recover(self, memory: ConversationMemory) -> Dict[str, float]:
+        """Rebuild `memory` from disk. Returns what was read, for logging and benchmarks."""
+        started = time.perf_counter()
+        os.makedirs(self.directory, exist_ok=True)
+        snapshots, logs = self._list_files()
+
+        generation = snapshots[-1] if snapshots else 0
+        conversations = 0
+        records = 0
+        replay = [g for g in logs if g >= generation]
+        with _gc_paused():
+            if snapshots:
+                conversations, _, _ = _scan(self._path("snapshot", generation), self._loader(memory))
+            for g in replay:
+                applied, good_end, size = _scan(self._path("log", g), self._replayer(memory))
+                records += applied
+                if good_end < size:
+                    logger.warning("Truncating torn tail of %s", self._path("log", g))
+                    with open(self._path("log", g), "r+b") as f:
+                        f.truncate(good_end)
+
+        self._generation = max([generation, *replay])
+        if snapshots:
+            self._snapshot_size = os.path.getsize(self._path("snapshot", generation))
+        self._logged_since = sum(os.path.getsize(self._path("log", g)) for g in replay)
+        self._remove_older_than(generation)
+
+        stats = {
+            "conversations": float(conversations),
+            "records": float(records),
+            "seconds": time.perf_counter() - started,
+        }
+        logger.info(
+            "Recovered %d conversations and %d log records in %.3fs",
+            conversations, records, stats["seconds"],
+        )
+        return stats
+
+    def start(self, memory: ConversationMemory) -> None:
+        self._memory = memory
+        self._file = open(self._path("log", self._generation), "ab")
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="conversation-log", daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        """Write whatever is pending and stop the flusher."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        with self._io_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def append(self, record: Tuple[Any, ...]) -> None:
+        """Queue a record; called by ConversationMemory with its lock held."""
+        self._pending.append(record)
+
+    # ---- flusher thread ----
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+        self.flush()
+
+    def flush(self) -> None:
+        """Write the pending batch, and a snapshot when one is due."""
+        memory = self._memory
+        if memory is None:
+            return
+        with self._io_lock:
+            if self._file is None:
+                return
+            compact = self._logged_since >= max(
+                self.snapshot_min_bytes, self.snapshot_growth * self._snapshot_size
+            )
+            with memory._lock, _gc_paused():
+                batch, self._pending = self._pending, []
+                # a snapshot must match exactly the records written before it
+                state = self._export(memory) if compact else None
+
+            if batch and not self._write_batch(batch, memory):
+                return
+            if state is not None:
+                self._compact(state)
+
+    def _write_batch(self, batch: List[Tuple[Any, ...]], memory: ConversationMemory) -> bool:
+        started = time.perf_counter()
+        data = b"".join(_encode(record) for record in batch)
+        try:
+            self._file.write(data)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+        except OSError:
+            log_write_errors.inc()
+            logger.exception("Failed to write %d conversation log records", len(batch))
+            with memory._lock:
+                # retried with the next flush, still in order
+                self._pending[:0] = batch
+            return False
+        log_bytes.inc(len(data))
+        self._logged_since += len(data)
+        flush_ms.observe((time.perf_counter() - started) * 1000.0)
+        return True
+
+    # ---- snapshots ----
+
+    @staticmethod
+    def _export(memory: ConversationMemory) -> List[Tuple[Any, ...]]:
+        # references only, so the lock is held briefly: message and event
+        # lists are replaced on change, never changed in place
+        return [
+            (
+                user_id, conversation_id, c.summary, c.summarized, c.dropped,
+                c.messages, c.recent_events,
+            )
+            for user_id, conversation_id, c in memory._conversations()
+        ]
+
+    def _compact(self, state: List[Tuple[Any, ...]]) -> None:
+        started = time.perf_counter()
+        previous = self._generation
+        generation = previous + 1
+
+        # changes from now on go to the new generation's log
+        self._file.close()
+        self._file = open(self._path("log", generation), "ab")
+        self._generation = generation
+        self._logged_since = 0
+
+        path = self._path("snapshot", generation)
+        tmp_path = f"{path}.tmp"
+        written = 0
+        try:
+            with open(tmp_path, "wb") as f:
+                for user_id, conversation_id, summary, summarized, dropped, messages, events in state:
+                    line = _encode([
+                        user_id, conversation_id, summary, summarized, dropped,
+                        [[m.role, m.content, m.created_at.timestamp()] for m in messages],
+                        events,
+                    ])
+                    f.write(line)
+                    written += len(line)
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+            self._fsync_directory()
+        except OSError:
+            # the older snapshot and logs are still there and still complete
+            logger.exception("Failed to write conversation snapshot %s", path)
+            return
+
+        snapshot_bytes.inc(written)
+        self._snapshot_size = written
+        self._remove_older_than(generation)
+        snapshot_ms.observe((time.perf_counter() - started) * 1000.0)
+
+    # ---- recovery ----
+
+    @staticmethod
+    def _loader(memory: ConversationMemory) -> Callable[[Any], None]:
+        from app.modules.ai.memory import Conversation, Message
+
+        def load(row: Any) -> None:
+            user_id, conversation_id, summary, summarized, dropped, messages, events = row
+            memory._put(user_id, conversation_id, Conversation(
+                messages=[
+                    Message(role=role, content=content, created_at=datetime.fromtimestamp(ts, timezone.utc))
+                    for role, content, ts in messages
+                ],
+                summary=summary,
+                summarized=summarized,
+                dropped=dropped,
+                recent_events=events,
+            ))
+
+        return load
+
+    @staticmethod
+    def _replayer(memory: ConversationMemory) -> Callable[[Any], None]:
+        from app.modules.ai.memory import Conversation
+
+        def replay(record: Any) -> None:
+            op, user_id, conversation_id, *args = record
+            if op == "c":
+                memory._put(user_id, conversation_id, Conversation())
+            elif op == "m":
+                role, content, ts = args
+                memory.add_message(
+                    user_id, conversation_id, role, content,
+                    created_at=datetime.fromtimestamp(ts, timezone.utc),
+                )
+            elif op == "s":
+                memory.set_summary(user_id, conversation_id, *args)
+            elif op == "e":
+                memory.remember_events(user_id, conversation_id, *args)
+            elif op == "f":
+                memory.forget_event(user_id, conversation_id, *args)
+
+        return replay
+
+    # ---- files ----
+
+    def _path(self, kind: str, generation: int) -> str:
+        return os.path.join(self.directory, f"{kind}-{generation}.jsonl")
+
+    def _list_files(self) -> Tuple[List[int], List[int]]:
+        snapshots: List[int] = []
+        logs: List[int] = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".tmp"):
+                # a snapshot that was never completed
+                os.remove(os.path.join(self.directory, name))
+                continue
+            match = _FILE_RE.match(name)
+            if match:
+                (snapshots if match.group(1) == "snapshot" else logs).append(int(match.group(2)))
+        return sorted(snapshots), sorted(logs)
+
+    def _remove_older_than(self, generation: int) -> None:
+        snapshots, logs = self._list_files()
+        for kind, generations in (("snapshot", snapshots), ("log", logs)):
+            for g in generations:
+                if g < generation:
+                    os.remove(self._path(kind, g))
+
+    def _fsync_directory(self) -> None:
+        if not self.fsync or not hasattr(os, "O_DIRECTORY"):
+            return
+        fd = os.open(self.directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
@@ -0,0 +1,117 @@
+"""
+Model routing for agent completions.
+
+The tool-selection pass and plain replies go to the fast model. A turn is
+escalated to the strong model only when the fast one struggles:
+
+- "parse_failure": a tool call failed argument validation (see
+  tool_validation.py); the repair round runs on the strong model.
+- "ambiguous": a tool reported several candidate events; the strong model
+  writes the clarifying reply.
+
+With both models set to the same name routing is a no-op.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import time
+from typing import Any, Dict, Iterable, Optional
+
+from app.config import settings
+from app.shared.metrics import metrics
+
+
+TOOL_SELECTION = "tool_selection"
+REPLY = "reply"
+
+PARSE_FAILURE = "parse_failure"
+AMBIGUOUS = "ambiguous"
+
+
+def ambiguity_reason(results: Iterable[Any]) -> Optional[str]:
+    """Escalation reason for a set of tool results, or None."""
+    for result in results:
+        if isinstance(result, dict) and (result.get("data") or {}).get("candidates"):
+            return AMBIGUOUS
+    return None
+
+
+def is_async_callable(func: Any) -> bool:
+    """
+    True for coroutine functions, including ones behind sync decorators:
+    the OpenAI SDK wraps AsyncCompletions.create in one, which hides it from
+    inspect.iscoroutinefunction.
+    """
+    return inspect.iscoroutinefunction(func) or inspect.iscoroutinefunction(inspect.unwrap(func))
+
+
+class ModelRouter:
+    """Picks the model for each completion and records what it cost."""
+
+    def __init__(self, fast_model: str, strong_model: Optional[str] = None) -> None:
+        self.fast_model = fast_model
+        self.strong_model = strong_model or fast_model
+
+    @classmethod
+    def from_settings(cls) -> "ModelRouter":
+        return cls(
+            fast_model=settings.openai_fast_model or settings.openai_model,
+            strong_model=settings.openai_strong_model or settings.openai_model,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.fast_model != self.strong_model
+
+    def choose(self, stage: str, reason: Optional[str] = None) -> str:
+        model = self.strong_model if reason else self.fast_model
+        metrics.counter(
+            f'llm_route_total{{stage="{stage}",reason="{reason or "default"}"}}',
+            "Completions per agent stage and routing decision.",
+        ).inc()
+        return model
+
+    async def complete(
+        self,
+        client: Any,
+        stage: str,
+        reason: Optional[str] = None,
+        **kwargs: Any,
+    ) -> Any:
+        """
+        Run one chat completion on the routed model and record latency and tokens.
+        A sync client runs in a worker thread so the event loop stays free.
+        """
+        model = self.choose(stage, reason)
+        create = client.chat.completions.create
+        started = time.perf_counter()
+        if is_async_callable(create):
+            response = await create(model=model, **kwargs)
+        else:
+            response = await asyncio.to_thread(create, model=model, **kwargs)
+            if inspect.isawaitable(response):
+                # an async create we could not recognise up front
+                response = await response
+        self.record(model, (time.perf_counter() - started) * 1000.0, response)
+        return response
+
+    @staticmethod
+    def record(model: str, elapsed_ms: float, response: Any) -> None:
+        label = f'{{model="{model}"}}'
+        metrics.histogram(
+            f"llm_completion_ms{label}", "Chat completion latency per model."
+        ).observe(elapsed_ms)
+
+        usage = getattr(response, "usage", None)
+        if usage is None:
+            return
+        tokens: Dict[str, int] = {
+            "prompt": getattr(usage, "prompt_tokens", 0) or 0,
+            "completion": getattr(usage, "completion_tokens", 0) or 0,
+        }
+        for kind, count in tokens.items():
+            metrics.counter(
+                f"llm_{kind}_tokens_total{label}", f"{kind.capitalize()} tokens per model."
+            ).inc(count)
@@ -0,0 +1,534 @@
+"""
+Record/replay of complete agent turns.
+
+Recording wraps the OpenAI client and GoogleCalendarService that are passed
+to CalendarAgent and appends one JSON line per turn containing the history,
+the agent's settings, every completion request/response, every Google call
+and their timings, and what the agent's local stores (event cache, calendar
+list cache, create de-duplication) answered.
+
+Replaying feeds those lines back through a real CalendarAgent with the same
+settings, whose client, service and stores are stubs returning the recorded
+responses, so agent-side changes can be profiled on real traffic shapes
+without network access. Completions are returned in order; Google calls and
+store reads are matched by method and arguments, since concurrent fetches
+may be issued in a different order than they completed.
+
+Usage:
+    python -m app.modules.ai.recording replay turns.jsonl
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import inspect
+import json
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any, ContextManager, Dict, Iterator, List, Optional, Sequence
+
+from app.modules.ai.model_router import is_async_callable
+from app.modules.calendar.google_calendar_service import EventConflict, GoogleCalendarService
+
+if TYPE_CHECKING:
+    from app.modules.ai.calendar_agent import CalendarAgent
+
+
+_current_turn: contextvars.ContextVar[Optional[Dict[str, Any]]] = contextvars.ContextVar(
+    "recorded_turn", default=None
+)
+
+# arguments never written to disk
+_REDACTED_ARGS = {"self", "access_token"}
+
+
+def _to_jsonable(value: Any) -> Any:
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, dict):
+        return {k: _to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_jsonable(v) for v in value]
+    return value
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000.0, 3)
+
+
+def _call_args(func: Any, args: Sequence[Any], kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """Arguments of a call to the unbound method `func`, by name, defaults included."""
+    bound = inspect.signature(func).bind(None, *args, **kwargs)
+    bound.apply_defaults()
+    return {
+        k: v for k, v in bound.arguments.items()
+        if k not in _REDACTED_ARGS and not callable(v)
+    }
+
+
+def _call_key(method: str, args: Dict[str, Any]) -> str:
+    return json.dumps([method, _to_jsonable(args)], sort_keys=True, default=str)
+
+
+def agent_settings(agent: CalendarAgent) -> Dict[str, Any]:
+    """The agent settings that change which calls a turn makes."""
+    return {
+        "intent_fast_path": agent.intent_fast_path,
+        "speculative_prefetch": agent.speculative_prefetch,
+        "history_limit": agent.history_limit,
+        "use_google_free_busy": agent.use_google_free_busy,
+        "event_cache": agent.event_cache is not None,
+        "create_dedupe": agent.create_dedupe is not None,
+    }
+
+
+# ---------- recording ----------
+
+class TurnRecorder:
+    """Collects the calls made during a turn and appends them to a JSONL file."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def turn(
+        self,
+        user_id: str,
+        conversation_id: str,
+        user_message: str,
+        user_timezone: Optional[str],
+        history: List[Dict[str, Any]],
+        summary: str = "",
+        recent_events: Optional[List[Dict[str, Any]]] = None,
+        agent: Optional[Dict[str, Any]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Record everything the wrapped client/service do inside this block.
+        The caller may set `record["reply"]` before the block exits.
+        """
+        record: Dict[str, Any] = {
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+            "user_id": user_id,
+            "conversation_id": conversation_id,
+            "user_message": user_message,
+            "user_timezone": user_timezone,
+            "history": list(history),
+            "summary": summary,
+            "recent_events": list(recent_events or []),
+            "agent": dict(agent or {}),
+            "completions": [],
+            "google_calls": [],
+            "store_calls": [],
+            "reply": None,
+            "error": None,
+        }
+        token = _current_turn.set(record)
+        started = time.perf_counter()
+        try:
+            yield record
+        except BaseException as exc:
+            record["error"] = repr(exc)
+            raise
+        finally:
+            record["duration_ms"] = _elapsed_ms(started)
+            _current_turn.reset(token)
+            self._write(record)
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    @staticmethod
+    def record_completion(request: Dict[str, Any], response: Any, duration_ms: float) -> None:
+        record = _current_turn.get()
+        if record is None:
+            return
+        record["completions"].append(
+            {
+                "request": _to_jsonable(request),
+                "response": _to_jsonable(response),
+                "duration_ms": duration_ms,
+            }
+        )
+
+    @staticmethod
+    def record_google_call(
+        method: str,
+        args: Dict[str, Any],
+        result: Any,
+        duration_ms: float,
+        conflict: bool = False,
+    ) -> None:
+        """`conflict`: the call raised EventConflict and `result` is its latest event."""
+        record = _current_turn.get()
+        if record is None:
+            return
+        call = {
+            "method": method,
+            "args": _to_jsonable(args),
+            "result": _to_jsonable(result),
+            "duration_ms": duration_ms,
+        }
+        if conflict:
+            call["conflict"] = True
+        record["google_calls"].append(call)
+
+    @staticmethod
+    def record_store_call(method: str, args: Dict[str, Any], result: Any) -> None:
+        record = _current_turn.get()
+        if record is None:
+            return
+        record["store_calls"].append(
+            {"method": method, "args": _to_jsonable(args), "result": _to_jsonable(result)}
+        )
+
+
+def chat_turn(
+    recorder: Optional[TurnRecorder],
+    agent: CalendarAgent,
+    user_id: str,
+    conversation_id: str,
+    user_message: str,
+    user_timezone: Optional[str],
+) -> ContextManager[Dict[str, Any]]:
+    """recorder.turn() for a chat message, or a throwaway record when recording is off."""
+    if recorder is None:
+        return nullcontext({})
+    memory = agent.memory
+    return recorder.turn(
+        user_id=user_id,
+        conversation_id=conversation_id,
+        user_message=user_message,
+        user_timezone=user_timezone,
+        # what build_prompt_history sends: the window plus anything not yet summarized
+        history=memory.get_unsummarized_messages(
+            user_id, conversation_id, limit=agent.history_limit
+        ),
+        summary=memory.get_summary(user_id, conversation_id),
+        recent_events=memory.get_recent_events(user_id, conversation_id),
+        agent=agent_settings(agent),
+    )
+
+
+class _RecordingCompletions:
+    def __init__(self, completions: Any) -> None:
+        self._completions = completions
+        # keep the wrapped client's calling convention (see ModelRouter.complete)
+        if is_async_callable(completions.create):
+            self.create = self._create_async
+
+    def create(self, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        response = self._completions.create(**kwargs)
+        TurnRecorder.record_completion(kwargs, response, _elapsed_ms(started))
+        return response
+
+    async def _create_async(self, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        response = await self._completions.create(**kwargs)
+        TurnRecorder.record_completion(kwargs, response, _elapsed_ms(started))
+        return response
+
+
+class RecordingOpenAIClient:
+    """Drop-in for the OpenAI client passed to CalendarAgent."""
+
+    def __init__(self, client: Any) -> None:
+        self._client = client
+        self.chat = SimpleNamespace(completions=_RecordingCompletions(client.chat.completions))
+
+
+class RecordingCalendarService:
+    """Drop-in for GoogleCalendarService that records every async call."""
+
+    def __init__(self, service: Any) -> None:
+        self._service = service
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._service, name)
+        if not inspect.iscoroutinefunction(attr):
+            return attr
+
+        func = getattr(type(self._service), name)
+
+        async def recorded(*args: Any, **kwargs: Any) -> Any:
+            call_args = _call_args(func, args, kwargs)
+            started = time.perf_counter()
+            try:
+                result = await attr(*args, **kwargs)
+            except EventConflict as conflict:
+                TurnRecorder.record_google_call(
+                    name, call_args, conflict.latest, _elapsed_ms(started), conflict=True
+                )
+                raise
+            TurnRecorder.record_google_call(name, call_args, result, _elapsed_ms(started))
+            return result
+
+        return recorded
+
+
+class RecordingStore:
+    """
+    Drop-in for a local store the agent reads (EventCache, ProfileCache,
+    IdempotencyStore) that records what the `reads` methods answered.
+    """
+
+    def __init__(self, store: Any, name: str, reads: Sequence[str]) -> None:
+        self._store = store
+        self._name = name
+        self._reads = set(reads)
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._store, name)
+        if name not in self._reads:
+            return attr
+        func = getattr(type(self._store), name)
+        method = f"{self._name}.{name}"
+
+        if inspect.iscoroutinefunction(attr):
+            async def recorded_async(*args: Any, **kwargs: Any) -> Any:
+                result = await attr(*args, **kwargs)
+                TurnRecorder.record_store_call(method, _call_args(func, args, kwargs), result)
+                return result
+            return recorded_async
+
+        def recorded(*args: Any, **kwargs: Any) -> Any:
+            result = attr(*args, **kwargs)
+            TurnRecorder.record_store_call(method, _call_args(func, args, kwargs), result)
+            return result
+        return recorded
+
+
+# what RecordingStore records for each of the agent's stores
+STORE_READS = {
+    "event_cache": ("get",),
+    "profiles": ("calendars",),
+    "create_dedupe": ("run",),
+}
+
+
+# ---------- replay ----------
+
+class ReplayMismatch(RuntimeError):
+    """The agent made a call that the recording does not contain."""
+
+
+class _ReplayCompletions:
+    def __init__(self, completions: List[Dict[str, Any]]) -> None:
+        self._completions = list(completions)
+
+    def create(self, **kwargs: Any) -> Any:
+        from openai.types.chat import ChatCompletion
+
+        if not self._completions:
+            raise ReplayMismatch("Agent requested more completions than were recorded")
+        recorded = self._completions.pop(0)
+        return ChatCompletion.model_validate(recorded["response"])
+
+
+class ReplayOpenAIClient:
+    """Returns recorded completions in order."""
+
+    def __init__(self, completions: List[Dict[str, Any]]) -> None:
+        self.chat = SimpleNamespace(completions=_ReplayCompletions(completions))
+
+
+def _by_call(calls: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Recorded calls by (method, arguments); identical calls keep their order."""
+    by_call: Dict[str, List[Dict[str, Any]]] = {}
+    for call in calls:
+        by_call.setdefault(_call_key(call["method"], call["args"]), []).append(call)
+    return by_call
+
+
+class ReplayCalendarService:
+    """Returns the recorded result of each Google call, matched by method and arguments."""
+
+    def __init__(self, google_calls: List[Dict[str, Any]]) -> None:
+        self._calls = _by_call(google_calls)
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        func = getattr(GoogleCalendarService, name)
+
+        async def replayed(*args: Any, **kwargs: Any) -> Any:
+            key = _call_key(name, _call_args(func, args, kwargs))
+            recorded = self._calls.get(key)
+            if not recorded:
+                raise ReplayMismatch(f"Unexpected Google call: {key}")
+            call = recorded.pop(0)
+            if call.get("conflict"):
+                raise EventConflict(call["result"])
+            return call["result"]
+
+        return replayed
+
+
+class ReplayStore:
+    """
+    Answers the recorded reads of one of the agent's stores; everything else
+    (puts, invalidations) does nothing. A read that was not recorded is a miss.
+    """
+
+    def __init__(self, store_type: type, name: str, store_calls: List[Dict[str, Any]]) -> None:
+        self._type = store_type
+        self._name = name
+        self._calls = _by_call(c for c in store_calls if c["method"].startswith(f"{name}."))
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        func = getattr(self._type, name)
+        method = f"{self._name}.{name}"
+
+        def recorded(args: Sequence[Any], kwargs: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+            calls = self._calls.get(_call_key(method, _call_args(func, args, kwargs)))
+            return calls.pop(0) if calls else None
+
+        if name == "run":
+            # IdempotencyStore.run(key, operation): run it unless the recording was a replay
+            async def run(*args: Any, **kwargs: Any) -> Any:
+                call = recorded(args, kwargs)
+                if call is not None and call["result"][1]:
+                    return call["result"][0], True
+                operation = kwargs.get("operation", args[1] if len(args) > 1 else None)
+                return await operation(), False
+            return run
+
+        def replayed(*args: Any, **kwargs: Any) -> Any:
+            call = recorded(args, kwargs)
+            return call["result"] if call is not None else None
+        return replayed
+
+
+@dataclass
+class ReplayResult:
+    user_message: str
+    recorded_reply: Optional[str]
+    replayed_reply: str
+    recorded_ms: float
+    replayed_ms: float
+
+    @property
+    def reply_matches(self) -> bool:
+        return self.recorded_reply == self.replayed_reply
+
+
+def load_turns(path: str) -> List[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+async def replay_turn(record: Dict[str, Any], model: Optional[str] = None) -> ReplayResult:
+    """Run one recorded turn through a CalendarAgent backed by stubs."""
+    from app.modules.ai.calendar_agent import CalendarAgent
+    from app.modules.ai.memory import ConversationMemory
+    from app.modules.ai.model_router import ModelRouter
+    from app.modules.auth.profile_cache import ProfileCache
+    from app.modules.calendar.event_cache import EventCache
+    from app.shared.idempotency import IdempotencyStore
+
+    memory = ConversationMemory()
+    user_id = record["user_id"]
+    conversation_id = record["conversation_id"]
+    for msg in record.get("history", []):
+        memory.add_message(user_id, conversation_id, msg["role"], msg["content"])
+    if record.get("summary"):
+        memory.set_summary(user_id, conversation_id, record["summary"], 0)
+    memory.remember_events(user_id, conversation_id, record.get("recent_events", []))
+
+    completions = record.get("completions", [])
+    # rebuild the recorded routing so escalated turns replay the same sequence
+    recorded_models = [c["request"].get("model") for c in completions]
+    router = (
+        ModelRouter(
+            recorded_models[0],
+            next((m for m in recorded_models if m != recorded_models[0]), None),
+        )
+        if recorded_models and not model
+        else None
+    )
+
+    config = record.get("agent", {})
+    store_calls = record.get("store_calls", [])
+    agent = CalendarAgent(
+        client=ReplayOpenAIClient(completions),
+        service=ReplayCalendarService(record.get("google_calls", [])),
+        memory=memory,
+        model=model,
+        router=router,
+        intent_fast_path=config.get("intent_fast_path"),
+        event_cache=(
+            ReplayStore(EventCache, "event_cache", store_calls) if config.get("event_cache") else None
+        ),
+        create_dedupe=(
+            ReplayStore(IdempotencyStore, "create_dedupe", store_calls)
+            if config.get("create_dedupe") else None
+        ),
+        profiles=ReplayStore(ProfileCache, "profiles", store_calls),
+    )
+    # the turn ran with these, whatever this process is configured with
+    for name in ("speculative_prefetch", "use_google_free_busy"):
+        if name in config:
+            setattr(agent, name, config[name])
+    # the recorded history can be longer than the window; send all of it again
+    agent.history_limit = max(
+        config.get("history_limit", agent.history_limit), len(record.get("history", []))
+    )
+
+    started = time.perf_counter()
+    reply = await agent.handle_user_message(
+        user_id=user_id,
+        conversation_id=conversation_id,
+        user_message=record["user_message"],
+        user_timezone=record.get("user_timezone"),
+        access_token="replay",
+    )
+
+    return ReplayResult(
+        user_message=record["user_message"],
+        recorded_reply=record.get("reply"),
+        replayed_reply=reply,
+        recorded_ms=record.get("duration_ms", 0.0),
+        replayed_ms=_elapsed_ms(started),
+    )
+
+
+async def replay_file(path: str) -> List[ReplayResult]:
+    return [await replay_turn(record) for record in load_turns(path)]
+
+
+def main(argv: List[str]) -> int:
+    if len(argv) != 2 or argv[0] != "replay":
+        print("usage: python -m app.modules.ai.recording replay <turns.jsonl>")
+        return 2
+
+    results = asyncio.run(replay_file(argv[1]))
+    for i, r in enumerate(results):
+        status = "ok" if r.reply_matches else "DIFF"
+        print(
+            f"{i:4d} {status:4s} recorded={r.recorded_ms:9.1f}ms "
+            f"replayed={r.replayed_ms:9.1f}ms  {r.user_message[:50]!r}"
+        )
+
+    if results:
+        total = sum(r.replayed_ms for r in results)
+        print(f"{len(results)} turns, agent overhead {total:.1f}ms total, "
+              f"{total / len(results):.2f}ms/turn")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,157 @@
+"""
+Rolling conversation summaries.
+
+The last `window` messages are sent verbatim; everything older is folded
+into a short running summary that is injected as one system message. Older
+messages the summary does not cover yet are sent verbatim too. The
+summary is refreshed in a background task after a turn completes, so the
+request path never waits for it and prompt size stays roughly constant.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Set, Tuple
+
+from app.modules.ai.memory import ConversationMemory, MessageDict
+from app.modules.ai.model_router import ModelRouter
+from app.shared.metrics import metrics
+
+if TYPE_CHECKING:
+    from openai import OpenAI
+
+
+logger = logging.getLogger(__name__)
+
+summaries_written = metrics.counter(
+    "conversation_summaries_total", "Rolling conversation summaries refreshed."
+)
+summaries_failed = metrics.counter(
+    "conversation_summaries_failed_total", "Summary refreshes that failed."
+)
+summary_ms = metrics.histogram(
+    "conversation_summary_ms", "Latency of a background summary refresh."
+)
+
+
+SUMMARY_PROMPT = (
+    "You maintain a running summary of a conversation between a user and a "
+    "calendar assistant.\n"
+    "Update the summary with the new messages. Keep facts that later turns may "
+    "refer to: event titles, dates and times, calendars, people, decisions and "
+    "open requests. Drop greetings and small talk.\n"
+    "Write in the user's language, as short plain sentences, at most "
+    "{max_chars} characters. Reply with the summary only."
+)
+
+
+def summary_message(summary: str) -> Dict[str, Any]:
+    """The system message that carries the summary into the prompt."""
+    return {"role": "system", "content": f"Earlier in this conversation: {summary}"}
+
+
+class ConversationSummarizer:
+    """Folds messages that left the recent window into the stored summary."""
+
+    def __init__(
+        self,
+        client: OpenAI,
+        memory: ConversationMemory,
+        model: str,
+        window: int = 10,
+        min_batch: int = 6,
+        max_chars: int = 800,
+    ) -> None:
+        self.client = client
+        self.memory = memory
+        self.model = model
+        self.window = window
+        self.min_batch = min_batch
+        self.max_chars = max_chars
+
+        self._running: Set[Tuple[str, str]] = set()
+        self._tasks: Set[asyncio.Task] = set()
+
+    def schedule(self, user_id: str, conversation_id: str) -> None:
+        """
+        Refresh the summary in the background once enough messages are
+        waiting to be folded in. At most one refresh per conversation runs.
+        """
+        key = (user_id, conversation_id)
+        if key in self._running:
+            return
+
+        pending, _ = self.memory.pending_summary_messages(user_id, conversation_id, self.window)
+        if len(pending) < self.min_batch:
+            return
+
+        self._running.add(key)
+        task = asyncio.get_running_loop().create_task(self._refresh(user_id, conversation_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _refresh(self, user_id: str, conversation_id: str) -> None:
+        started = time.perf_counter()
+        try:
+            pending, fold_until = self.memory.pending_summary_messages(
+                user_id, conversation_id, self.window
+            )
+            if not pending:
+                return
+
+            previous = self.memory.get_summary(user_id, conversation_id)
+            summary = await asyncio.to_thread(self._summarize, previous, pending)
+            if summary:
+                self.memory.set_summary(user_id, conversation_id, summary, fold_until)
+                summaries_written.inc()
+                summary_ms.observe((time.perf_counter() - started) * 1000.0)
+        except Exception:
+            summaries_failed.inc()
+            logger.exception("Summary refresh failed for conversation %s", conversation_id)
+        finally:
+            self._running.discard((user_id, conversation_id))
+
+    def _summarize(self, previous: str, messages: List[MessageDict]) -> str:
+        transcript = "\n".join(f"{m['role']}: {m['content']}" for m in messages)
+        content = (
+            f"Current summary:\n{previous or '(empty)'}\n\nNew messages:\n{transcript}"
+        )
+
+        started = time.perf_counter()
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": SUMMARY_PROMPT.format(max_chars=self.max_chars)},
+                {"role": "user", "content": content},
+            ],
+        )
+        ModelRouter.record(self.model, (time.perf_counter() - started) * 1000.0, response)
+        summary = (response.choices[0].message.content or "").strip()
+        return summary[: self.max_chars]
+
+
+def build_prompt_history(
+    memory: ConversationMemory,
+    user_id: str,
+    conversation_id: str,
+    window: int,
+    summarizing: bool = True,
+) -> List[Dict[str, Any]]:
+    """
+    Summary message (if any) followed by every message it does not cover, at
+    least the last `window`. Messages that left the window before the next
+    refresh folded them in are still sent verbatim, so none go missing.
+    Without a summarizer (`summarizing=False`) only the last `window` are sent.
+    """
+    history: List[Dict[str, Any]] = []
+    summary = memory.get_summary(user_id, conversation_id)
+    if summary:
+        history.append(summary_message(summary))
+    if summarizing:
+        history.extend(memory.get_unsummarized_messages(user_id, conversation_id, limit=window))
+    else:
+        history.extend(memory.get_recent_messages(user_id, conversation_id, limit=window))
+    return history
+
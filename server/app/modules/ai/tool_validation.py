@@ -0,0 +1,133 @@
+"""
+Validation of tool-call arguments against the TOOLS JSON schemas.
+
+Each tool's schema is compiled once at import into a Pydantic model, with
+extra checks the schema can only describe in prose (RFC3339 datetimes,
+HH:MM times) and the numeric bounds it gives as minimum / maximum. Invalid calls become a structured error the model can fix in
+the same turn instead of an exception that ends it.
+"""
+
+from __future__ import annotations
+
+import json
+from datetime import time
+from typing import Annotated, Any, Dict, List, Optional, Tuple, Type
+
+from pydantic import AfterValidator, BaseModel, ConfigDict, Field, ValidationError, create_model
+
+from app.shared.datetime_utils import parse_rfc3339
+
+
+# argument names whose values must be RFC3339 datetimes / HH:MM times
+DATETIME_FIELDS = {"start", "end", "new_start", "new_end"}
+TIME_OF_DAY_FIELDS = {"working_hours_start", "working_hours_end"}
+
+
+def _check_datetime(value: str) -> str:
+    try:
+        parse_rfc3339(value)
+    except ValueError:
+        raise ValueError("must be an RFC3339 datetime, e.g. 2025-12-05T10:00:00+02:00")
+    return value
+
+
+def _check_time_of_day(value: str) -> str:
+    try:
+        time.fromisoformat(value)
+    except ValueError:
+        raise ValueError("must be a time of day as HH:MM, e.g. 09:00")
+    return value
+
+
+_SCALARS: Dict[str, Any] = {
+    "string": str,
+    "integer": int,
+    "number": float,
+    "boolean": bool,
+}
+
+
+def _field_type(name: str, schema: Dict[str, Any]) -> Any:
+    if schema.get("type") == "array":
+        return List[_field_type(name, schema.get("items") or {})]
+    if name in DATETIME_FIELDS:
+        return Annotated[str, AfterValidator(_check_datetime)]
+    if name in TIME_OF_DAY_FIELDS:
+        return Annotated[str, AfterValidator(_check_time_of_day)]
+    scalar = _SCALARS.get(schema.get("type"), Any)
+    if "minimum" in schema or "maximum" in schema:
+        return Annotated[scalar, Field(ge=schema.get("minimum"), le=schema.get("maximum"))]
+    return scalar
+
+
+def compile_tool_model(tool: Dict[str, Any]) -> Type[BaseModel]:
+    """Pydantic model for one entry of TOOLS."""
+    function = tool["function"]
+    parameters = function.get("parameters") or {}
+    required = set(parameters.get("required") or [])
+    extra = "forbid" if parameters.get("additionalProperties") is False else "ignore"
+
+    fields: Dict[str, Any] = {}
+    for name, schema in (parameters.get("properties") or {}).items():
+        annotation = _field_type(name, schema)
+        if name in required:
+            fields[name] = (annotation, ...)
+        else:
+            fields[name] = (Optional[annotation], None)
+
+    return create_model(
+        f"{function['name']}_args",
+        __config__=ConfigDict(extra=extra),
+        **fields,
+    )
+
+
+class ToolValidator:
+    """Precompiled argument models for a list of tools."""
+
+    def __init__(self, tools: List[Dict[str, Any]]) -> None:
+        self.models: Dict[str, Type[BaseModel]] = {
+            tool["function"]["name"]: compile_tool_model(tool) for tool in tools
+        }
+
+    def validate(
+        self,
+        name: str,
+        raw_arguments: Optional[str],
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        Returns (args, None) for a valid call, where args only holds the keys
+        the model actually sent, or (None, error) with an error payload meant
+        to be sent back to the model as the tool result.
+        """
+        model = self.models.get(name)
+        if model is None:
+            return None, _error(name, [{"field": None, "message": f"unknown tool '{name}'"}])
+
+        try:
+            data = json.loads(raw_arguments or "{}")
+        except ValueError as exc:
+            return None, _error(name, [{"field": None, "message": f"arguments are not valid JSON: {exc}"}])
+        if not isinstance(data, dict):
+            return None, _error(name, [{"field": None, "message": "arguments must be a JSON object"}])
+
+        try:
+            parsed = model.model_validate(data)
+        except ValidationError as exc:
+            return None, _error(name, [
+                {
+                    "field": ".".join(str(part) for part in err["loc"]) or None,
+                    "message": err["msg"],
+                }
+                for err in exc.errors()
+            ])
+        return parsed.model_dump(exclude_unset=True, exclude_none=True), None
+
+
+def _error(name: str, details: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        "error": "invalid_arguments",
+        "tool": name,
+        "details": details,
+        "message": "Fix the arguments and call the tool again.",
+    }
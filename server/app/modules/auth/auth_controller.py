@@ -5,7 +5,7 @@ Authentication controller for handling auth-related HTTP requests.
 from fastapi import APIRouter, Depends, HTTPException, status, Response, Request, Cookie
 from typing import Optional
 from app.config import settings
-from app.dependencies import get_current_user
+from app.dependencies import get_current_user, get_services
 from app.modules.auth.models.auth_requests import (
     GoogleLoginRequest,
     GoogleLoginResponse,
@@ -14,16 +14,17 @@ from app.modules.auth.models.auth_requests import (
     UserInfoResponse,
     GetGoogleLoginUrlResponse
 )
-from app.modules.auth.google_oauth_service import GoogleOAuthService
-from app.modules.auth.auth_service import AuthService
+from app.services import Services
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
-auth_service = AuthService()
-google_auth_service = GoogleOAuthService()
 
 
 @router.post("/google", response_model=GoogleLoginResponse)
-async def google_login(request: GoogleLoginRequest, response: Response):
+async def google_login(
+    request: GoogleLoginRequest,
+    response: Response,
+    services: Services = Depends(get_services),
+):
     """
     Handle Google OAuth login.
     
@@ -33,8 +34,11 @@ async def google_login(request: GoogleLoginRequest, response: Response):
     Returns:
         GoogleLoginResponse: JWT token and user info
     """
+    auth_service = services.auth
     try:
-        tokens, userinfo = await auth_service.login_with_google(request.code, google_auth_service)
+        tokens, userinfo = await auth_service.login_with_google(
+            request.code, services.google_oauth, services.profiles
+        )
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e))
 
@@ -71,14 +75,15 @@ async def google_login(request: GoogleLoginRequest, response: Response):
         picture=picture,  # ← חדש
     )
 @router.get("/google/login-url", response_model=GetGoogleLoginUrlResponse)
-def get_login_url():
-    url = google_auth_service.get_authorization_url()
+def get_login_url(services: Services = Depends(get_services)):
+    url = services.google_oauth.get_authorization_url()
     return GetGoogleLoginUrlResponse(login_url=url)
 
 
 @router.post("/refresh", response_model=RefreshTokenResponse)
 async def refresh_token(
     google_refresh_token: Optional[str] = Cookie(None),
+    services: Services = Depends(get_services),
 ):
     """
     Refresh access token.
@@ -92,7 +97,14 @@ async def refresh_token(
     if not google_refresh_token:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing refresh cookie")
 
-    tokens, userinfo = await auth_service.refresh_with_google(google_refresh_token, google_auth_service)
+    auth_service = services.auth
+    try:
+        # userinfo comes from the profile cache when this refresh token was seen recently
+        tokens, userinfo = await auth_service.refresh_with_google(
+            google_refresh_token, services.google_oauth, services.profiles
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e))
 
     uid = userinfo.get("sub") or userinfo.get("id")
     name = userinfo.get("name") or userinfo.get("given_name")
@@ -7,6 +7,7 @@ from jose import jwt
 from datetime import datetime, timedelta
 from app.config import settings
 from app.modules.auth.google_oauth_service import GoogleOAuthService
+from app.modules.auth.profile_cache import ProfileCache
 
 class AuthService:
     """Service for handling authentication business logic."""
@@ -67,21 +68,39 @@ class AuthService:
             "email": user_data.get("email")
         }
 
-    async def login_with_google(self, code: str, google: GoogleOAuthService) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    async def login_with_google(
+        self,
+        code: str,
+        google: GoogleOAuthService,
+        profiles: Optional[ProfileCache] = None,
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
         tokens = await google.exchange_code_for_tokens(code)
         if not tokens or "access_token" not in tokens:
             raise ValueError("Token exchange failed")
         userinfo = await google.get_user_info(tokens["access_token"])
         if not userinfo or "sub" not in userinfo or "email" not in userinfo:
             raise ValueError("Userinfo fetch failed")
+        if profiles is not None:
+            # a fresh login may come with changed details or newly granted calendars
+            profiles.invalidate(userinfo["sub"])
+            profiles.put_userinfo(userinfo["sub"], userinfo, refresh_token=tokens.get("refresh_token"))
         return tokens, userinfo
 
-    async def refresh_with_google(self, refresh_token: str, google: GoogleOAuthService) -> Tuple[
-        Dict[str, Any], Dict[str, Any]]:
+    async def refresh_with_google(
+        self,
+        refresh_token: str,
+        google: GoogleOAuthService,
+        profiles: Optional[ProfileCache] = None,
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
         tokens = await google.refresh_access_token(refresh_token)
         if not tokens or "access_token" not in tokens:
             raise ValueError("Google refresh failed")
+        userinfo = profiles.userinfo_for_refresh_token(refresh_token) if profiles is not None else None
+        if userinfo is not None:
+            return tokens, userinfo
         userinfo = await google.get_user_info(tokens["access_token"])
         if not userinfo or "sub" not in userinfo or "email" not in userinfo:
             raise ValueError("Userinfo fetch failed")
-        return tokens, userinfo
\ No newline at end of file
+        if profiles is not None:
+            profiles.put_userinfo(userinfo["sub"], userinfo, refresh_token=refresh_token)
+        return tokens, userinfo
@@ -0,0 +1,147 @@
+"""
+Per-user cache of Google profile data that rarely changes: the userinfo
+document and the calendar list.
+
+Userinfo is also reachable by refresh token, so /auth/refresh can mint a new
+session from the token refresh alone. Refresh tokens are stored only as
+SHA-256 digests. A login drops everything cached for the user, since it is
+the point where the user may have changed account details or granted scopes.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set
+
+from app.shared.metrics import metrics
+
+
+_hits = metrics.counter("profile_cache_hits_total", "Userinfo / calendar list lookups served from the cache")
+_misses = metrics.counter("profile_cache_misses_total", "Userinfo / calendar list lookups that had to go to Google")
+
+
+def _digest(refresh_token: str) -> str:
+    return hashlib.sha256(refresh_token.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class _Profile:
+    userinfo: Optional[Dict[str, Any]] = None
+    userinfo_at: float = 0.0
+    calendars: Optional[List[Dict[str, Any]]] = None
+    calendars_at: float = 0.0
+    refresh_digests: Set[str] = field(default_factory=set)
+
+
+class ProfileCache:
+    """LRU of profiles by user id, with separate TTLs for userinfo and calendars."""
+
+    def __init__(
+        self,
+        userinfo_ttl_seconds: float = 3600.0,
+        calendar_list_ttl_seconds: float = 600.0,
+        max_users: int = 10000,
+    ) -> None:
+        self.userinfo_ttl_seconds = userinfo_ttl_seconds
+        self.calendar_list_ttl_seconds = calendar_list_ttl_seconds
+        self.max_users = max_users
+        self._profiles: "OrderedDict[str, _Profile]" = OrderedDict()
+        # refresh token digest -> user id
+        self._by_refresh: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    # ---- userinfo ----
+
+    def userinfo(self, user_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            profile = self._touch(user_id)
+            if profile is None or not self._fresh(profile.userinfo_at, self.userinfo_ttl_seconds):
+                _misses.inc()
+                return None
+            _hits.inc()
+            return dict(profile.userinfo)
+
+    def userinfo_for_refresh_token(self, refresh_token: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            user_id = self._by_refresh.get(_digest(refresh_token))
+        if user_id is None:
+            _misses.inc()
+            return None
+        return self.userinfo(user_id)
+
+    def put_userinfo(
+        self,
+        user_id: str,
+        userinfo: Dict[str, Any],
+        refresh_token: Optional[str] = None,
+    ) -> None:
+        with self._lock:
+            profile = self._profile(user_id)
+            profile.userinfo = dict(userinfo)
+            profile.userinfo_at = time.monotonic()
+            if refresh_token:
+                digest = _digest(refresh_token)
+                profile.refresh_digests.add(digest)
+                self._by_refresh[digest] = user_id
+
+    # ---- calendar list ----
+
+    def calendars(self, user_id: str) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            profile = self._touch(user_id)
+            if profile is None or not self._fresh(profile.calendars_at, self.calendar_list_ttl_seconds):
+                _misses.inc()
+                return None
+            _hits.inc()
+            return list(profile.calendars)
+
+    def put_calendars(self, user_id: str, calendars: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            profile = self._profile(user_id)
+            profile.calendars = list(calendars)
+            profile.calendars_at = time.monotonic()
+
+    # ---- invalidation ----
+
+    def invalidate(self, user_id: str) -> None:
+        """Forget everything cached for a user, including refresh token mappings."""
+        with self._lock:
+            profile = self._profiles.pop(user_id, None)
+            if profile is not None:
+                self._drop_digests(profile)
+
+    def invalidate_calendars(self, user_id: str) -> None:
+        with self._lock:
+            profile = self._profiles.get(user_id)
+            if profile is not None:
+                profile.calendars = None
+                profile.calendars_at = 0.0
+
+    # ---- internals (lock held) ----
+
+    @staticmethod
+    def _fresh(stored_at: float, ttl: float) -> bool:
+        return stored_at > 0 and time.monotonic() - stored_at < ttl
+
+    def _touch(self, user_id: str) -> Optional[_Profile]:
+        profile = self._profiles.get(user_id)
+        if profile is not None:
+            self._profiles.move_to_end(user_id)
+        return profile
+
+    def _profile(self, user_id: str) -> _Profile:
+        profile = self._touch(user_id)
+        if profile is None:
+            profile = self._profiles[user_id] = _Profile()
+            while len(self._profiles) > self.max_users:
+                _, evicted = self._profiles.popitem(last=False)
+                self._drop_digests(evicted)
+        return profile
+
+    def _drop_digests(self, profile: _Profile) -> None:
+        for digest in profile.refresh_digests:
+            self._by_refresh.pop(digest, None)
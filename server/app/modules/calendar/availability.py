@@ -0,0 +1,167 @@
+"""
+Local free/busy engine.
+
+Busy intervals from any number of calendars are merged with one sort + sweep,
+then subtracted from the allowed windows (working hours on allowed weekdays,
+in the user's time zone) with a two-pointer walk. Everything is O(n log n)
+in the number of busy intervals plus O(days) for the windows, so multi-month
+ranges stay cheap.
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta, tzinfo
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.shared.datetime_utils import parse_event_time, parse_rfc3339
+
+
+Interval = Tuple[datetime, datetime]
+
+DEFAULT_WORKING_HOURS = (time(9, 0), time(18, 0))
+
+
+def merge_intervals(intervals: Iterable[Interval]) -> List[Interval]:
+    """Sort and merge overlapping or touching intervals."""
+    merged: List[Interval] = []
+    for start, end in sorted(intervals):
+        if end <= start:
+            continue
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def allowed_windows(
+    range_start: datetime,
+    range_end: datetime,
+    zone: tzinfo,
+    working_hours: Optional[Tuple[time, time]] = DEFAULT_WORKING_HOURS,
+    weekdays: Optional[Sequence[int]] = None,
+) -> List[Interval]:
+    """
+    Windows inside [range_start, range_end) where a slot may be placed.
+    `weekdays` uses datetime.weekday() numbering (Monday=0); None allows all.
+    `working_hours=None` allows the whole day.
+    """
+    if working_hours is None and weekdays is None:
+        return [(range_start, range_end)] if range_end > range_start else []
+
+    allowed_days = set(weekdays) if weekdays is not None else None
+    day_start, day_end = working_hours or (time(0, 0), time(0, 0))
+
+    windows: List[Interval] = []
+    day: date = range_start.astimezone(zone).date()
+    last_day: date = range_end.astimezone(zone).date()
+    while day <= last_day:
+        if allowed_days is None or day.weekday() in allowed_days:
+            start = datetime.combine(day, day_start, tzinfo=zone)
+            if day_end > day_start:
+                end = datetime.combine(day, day_end, tzinfo=zone)
+            else:
+                # whole day, or hours that wrap past midnight
+                end = datetime.combine(day + timedelta(days=1), day_end, tzinfo=zone)
+            start, end = max(start, range_start), min(end, range_end)
+            if end > start:
+                windows.append((start, end))
+        day += timedelta(days=1)
+    return windows
+
+
+def find_free_slots(
+    busy: Iterable[Interval],
+    range_start: datetime,
+    range_end: datetime,
+    min_duration: timedelta,
+    zone: tzinfo,
+    working_hours: Optional[Tuple[time, time]] = DEFAULT_WORKING_HOURS,
+    weekdays: Optional[Sequence[int]] = None,
+    max_results: Optional[int] = None,
+) -> List[Interval]:
+    """Free gaps of at least `min_duration`, in chronological order."""
+    merged = merge_intervals(busy)
+    windows = allowed_windows(range_start, range_end, zone, working_hours, weekdays)
+
+    free: List[Interval] = []
+    i = 0
+    for window_start, window_end in windows:
+        # skip busy intervals that end before this window
+        while i < len(merged) and merged[i][1] <= window_start:
+            i += 1
+
+        cursor = window_start
+        j = i
+        while j < len(merged) and merged[j][0] < window_end:
+            busy_start, busy_end = merged[j]
+            if busy_start - cursor >= min_duration:
+                free.append((cursor, busy_start))
+            cursor = max(cursor, busy_end)
+            j += 1
+
+        if window_end - cursor >= min_duration:
+            free.append((cursor, window_end))
+
+        if max_results is not None and len(free) >= max_results:
+            return free[:max_results]
+
+    return free
+
+
+def busy_from_events(
+    events: Iterable[Dict[str, Any]],
+    zone: tzinfo,
+) -> List[Interval]:
+    """Busy intervals for events that block time (not transparent, cancelled or declined)."""
+    intervals: List[Interval] = []
+    for event in events:
+        if event.get("status") == "cancelled" or event.get("transparency") == "transparent":
+            continue
+        if any(
+            a.get("self") and a.get("responseStatus") == "declined"
+            for a in event.get("attendees") or []
+        ):
+            continue
+
+        start = parse_event_time(event.get("start") or {}, zone)
+        end = parse_event_time(event.get("end") or {}, zone)
+        if start is not None and end is not None:
+            intervals.append((start, end))
+    return intervals
+
+
+def busy_from_freebusy(
+    response: Dict[str, Any],
+    calendar_ids: Iterable[str],
+) -> List[Interval]:
+    """
+    Busy intervals from a freeBusy.query response, for the calendars it
+    answered; see freebusy_failures for the rest.
+    """
+    intervals: List[Interval] = []
+    calendars = response.get("calendars") or {}
+    for calendar_id in calendar_ids:
+        calendar = calendars.get(calendar_id) or {}
+        if calendar.get("errors"):
+            continue
+        for block in calendar.get("busy") or []:
+            intervals.append((parse_rfc3339(block["start"]), parse_rfc3339(block["end"])))
+    return intervals
+
+
+def freebusy_failures(
+    response: Dict[str, Any],
+    calendar_ids: Iterable[str],
+) -> List[str]:
+    """
+    Calendars a freeBusy.query response has no busy times for: Google reports
+    per-calendar errors (notFound, internalError, ...) next to an empty
+    "busy" list, which would otherwise read as a free calendar.
+    """
+    calendars = response.get("calendars") or {}
+    return [
+        calendar_id for calendar_id in calendar_ids
+        if calendar_id not in calendars or (calendars[calendar_id] or {}).get("errors")
+    ]
@@ -0,0 +1,30 @@
+"""
+Calendar module routes.
+"""
+
+from fastapi import APIRouter, Depends, Request, Response, status
+
+from app.dependencies import get_services
+from app.services import Services
+
+
+router = APIRouter(prefix="/calendar", tags=["Calendar"])
+
+
+# ---- endpoints ----
+
+@router.post("/notifications", status_code=status.HTTP_204_NO_CONTENT)
+async def calendar_notification(
+    request: Request,
+    services: Services = Depends(get_services),
+) -> Response:
+    """
+    Webhook for Google Calendar push notifications.
+    Google only sends headers; the body is empty. Anything but a 2xx makes
+    Google retry, so channels we don't know are acknowledged too; only a bad
+    token on a live channel is refused.
+    """
+    watch_manager = services.watch_manager
+    if watch_manager is not None and not watch_manager.handle_notification(request.headers):
+        return Response(status_code=status.HTTP_403_FORBIDDEN)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,49 @@
+"""
+Local store of ETags and bodies of Google Calendar resources.
+
+GETs send the stored ETag as If-None-Match and reuse the stored body on a
+304; writes send it as If-Match so an edit based on a stale copy fails with
+412 instead of overwriting someone else's change.
+
+Entries are scoped by user_id: the middleware mints a fresh access token per
+request, and a body must never be served to a different user.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+
+class ETagStore:
+    """Bounded LRU of (user_id, url) -> (etag, body)."""
+
+    def __init__(self, max_entries: int = 2000) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: str, url: str) -> Optional[Tuple[str, Any]]:
+        with self._lock:
+            entry = self._entries.get((user_id, url))
+            if entry is not None:
+                self._entries.move_to_end((user_id, url))
+            return entry
+
+    def etag(self, user_id: str, url: str) -> Optional[str]:
+        entry = self.get(user_id, url)
+        return entry[0] if entry else None
+
+    def put(self, user_id: str, url: str, etag: Optional[str], body: Any) -> None:
+        if not etag:
+            return
+        with self._lock:
+            self._entries[(user_id, url)] = (etag, body)
+            self._entries.move_to_end((user_id, url))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: str, url: str) -> None:
+        with self._lock:
+            self._entries.pop((user_id, url), None)
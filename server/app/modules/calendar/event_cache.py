@@ -0,0 +1,160 @@
+"""
+Short-lived local cache of fetched event windows.
+
+Entries are keyed by (user_id, calendar_id) rather than by access token,
+because the middleware mints a fresh Google token on every request.
+A lookup hits only if fresh windows fully cover the requested range (adjacent
+windows are chained); the cached events overlapping the range are returned.
+
+Calendars with an active push channel (see watch_manager.py) are invalidated
+on every change notification, so their windows may live much longer.
+
+Every invalidation bumps a per-calendar sequence number. A fetch reads it
+before going to Google and passes it to put(), which drops the result if an
+invalidation happened in between: it may predate the change.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from app.shared.datetime_utils import is_all_day, parse_event_time
+
+
+# all-day events carry a bare date; allow for any UTC offset when comparing
+_ALL_DAY_SLACK = timedelta(hours=14)
+
+
+@dataclass
+class _Window:
+    start: datetime
+    end: datetime
+    events: List[Dict[str, Any]]
+    fetched_at: float
+
+
+def _parse_bound(value: Dict[str, Any], slack: timedelta) -> Optional[datetime]:
+    dt = parse_event_time(value, timezone.utc)
+    if dt is not None and is_all_day(value):
+        dt += slack
+    return dt
+
+
+def event_overlaps(event: Dict[str, Any], start: datetime, end: datetime) -> bool:
+    """True if the event may intersect [start, end)."""
+    if event.get("recurrence"):
+        # series masters were returned by Google because the series overlaps
+        return True
+    event_start = _parse_bound(event.get("start") or {}, -_ALL_DAY_SLACK)
+    event_end = _parse_bound(event.get("end") or {}, _ALL_DAY_SLACK)
+    if event_start is None or event_end is None:
+        return True
+    return event_start < end and event_end > start
+
+
+class EventCache:
+    """In-memory cache of event windows per user and calendar."""
+
+    def __init__(
+        self,
+        ttl_seconds: float = 30.0,
+        watched_ttl_seconds: float = 900.0,
+        max_windows_per_calendar: int = 16,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.watched_ttl_seconds = watched_ttl_seconds
+        self.max_windows_per_calendar = max_windows_per_calendar
+        self._windows: Dict[Tuple[str, str], List[_Window]] = {}
+        self._watched: Set[Tuple[str, str]] = set()
+        # invalidations per (user, calendar); calendar None counts the user-wide ones
+        self._versions: Dict[Tuple[str, Optional[str]], int] = {}
+        self._lock = threading.Lock()
+
+    def set_watched(self, user_id: str, calendar_id: str, watched: bool) -> None:
+        """Mark whether change notifications are being received for a calendar."""
+        with self._lock:
+            if watched:
+                self._watched.add((user_id, calendar_id))
+            else:
+                self._watched.discard((user_id, calendar_id))
+
+    def get(
+        self,
+        user_id: str,
+        calendar_id: str,
+        start: datetime,
+        end: datetime,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Return cached events for [start, end) or None on a miss."""
+        now = time.monotonic()
+        key = (user_id, calendar_id)
+        with self._lock:
+            ttl = self.watched_ttl_seconds if key in self._watched else self.ttl_seconds
+            windows = self._windows.get(key, [])
+            windows[:] = [w for w in windows if now - w.fetched_at < ttl]
+
+            covered_until = start
+            used: List[_Window] = []
+            for window in sorted(windows, key=lambda w: w.start):
+                if window.start > covered_until:
+                    break
+                if window.end > covered_until:
+                    used.append(window)
+                    covered_until = window.end
+                if covered_until >= end:
+                    break
+            if covered_until < end:
+                return None
+
+        events: Dict[Any, Dict[str, Any]] = {}
+        for window in used:
+            for e in window.events:
+                if e.get("id") not in events and event_overlaps(e, start, end):
+                    events[e.get("id")] = e
+        return list(events.values())
+
+    def put(
+        self,
+        user_id: str,
+        calendar_id: str,
+        start: datetime,
+        end: datetime,
+        events: List[Dict[str, Any]],
+        version: Optional[int] = None,
+    ) -> None:
+        """
+        Store a complete result for [start, end). Callers must not store
+        results that were truncated by maxResults. `version` is what
+        version() returned before the fetch; if the calendar was invalidated
+        since, the result is not stored.
+        """
+        with self._lock:
+            if version is not None and version != self._version(user_id, calendar_id):
+                return
+            windows = self._windows.setdefault((user_id, calendar_id), [])
+            windows.append(_Window(start, end, list(events), time.monotonic()))
+            if len(windows) > self.max_windows_per_calendar:
+                del windows[: len(windows) - self.max_windows_per_calendar]
+
+    def invalidate(self, user_id: str, calendar_id: Optional[str] = None) -> None:
+        """Drop cached windows for one calendar, or all calendars of the user."""
+        with self._lock:
+            key = (user_id, calendar_id)
+            self._versions[key] = self._versions.get(key, 0) + 1
+            if calendar_id is not None:
+                self._windows.pop((user_id, calendar_id), None)
+                return
+            for window_key in [k for k in self._windows if k[0] == user_id]:
+                del self._windows[window_key]
+
+    def version(self, user_id: str, calendar_id: str) -> int:
+        """Invalidation sequence number of a calendar; read it before fetching."""
+        with self._lock:
+            return self._version(user_id, calendar_id)
+
+    def _version(self, user_id: str, calendar_id: str) -> int:
+        return self._versions.get((user_id, calendar_id), 0) + self._versions.get((user_id, None), 0)
@@ -0,0 +1,47 @@
+"""
+Helpers for querying several calendars at once.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, TypeVar
+
+from app.shared.datetime_utils import parse_event_time
+
+
+T = TypeVar("T")
+K = TypeVar("K")
+
+_FAR_FUTURE = datetime.max.replace(tzinfo=timezone.utc)
+
+
+async def gather_bounded(
+    func: Callable[[K], Awaitable[T]],
+    items: Iterable[K],
+    limit: int,
+) -> List[T]:
+    """Run func(item) for every item with at most `limit` in flight; keeps input order."""
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def run(item: K) -> T:
+        async with semaphore:
+            return await func(item)
+
+    return await asyncio.gather(*(run(item) for item in items))
+
+
+def event_start_key(event: Dict[str, Any]) -> datetime:
+    """Sort key: event start as an aware datetime (all-day events at UTC midnight)."""
+    return parse_event_time(event.get("start") or {}, timezone.utc) or _FAR_FUTURE
+
+
+def merge_by_start(batches: Iterable[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """k-way merge of per-calendar event lists into one start-ordered list."""
+    decorated = [
+        sorted(((event_start_key(e), n, e) for n, e in enumerate(batch)), key=lambda x: x[:2])
+        for batch in batches
+    ]
+    return [e for _, _, e in heapq.merge(*decorated, key=lambda x: x[:2])]
@@ -6,28 +6,110 @@ from typing import List, Optional, Dict, Any
 from datetime import datetime
 import httpx
 from app.config import settings
-from datetime import timezone
+from app.modules.calendar.etag_store import ETagStore
+from app.modules.calendar.hedging import HedgePolicy
+from app.shared.datetime_utils import format_rfc3339
+from app.shared.metrics import metrics
+from app.shared.single_flight import SingleFlight
 
 
-def _rfc3339(dt: datetime) -> str:
-    if dt.tzinfo is None:
-        dt = dt.replace(tzinfo=timezone.utc)
-    return dt.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
+conditional_gets = metrics.counter(
+    "google_conditional_get_total", "GETs sent with If-None-Match."
+)
+not_modified = metrics.counter(
+    "google_not_modified_total", "Conditional GETs answered with 304 Not Modified."
+)
+event_reads = metrics.counter(
+    "google_get_events_total", "get_events calls, including coalesced ones."
+)
+event_reads_coalesced = metrics.counter(
+    "google_get_events_coalesced_total", "get_events calls that shared an identical request in flight."
+)
+update_conflicts = metrics.counter(
+    "google_update_conflicts_total", "Event updates rejected with 412 Precondition Failed."
+)
+
+
+class EventConflict(Exception):
+    """
+    Raised by update_event when the event changed since the version the
+    update was based on (412 Precondition Failed). `latest` is the current
+    event, or None if it could not be fetched.
+    """
+
+    def __init__(self, latest: Optional[Dict[str, Any]] = None) -> None:
+        super().__init__("Event was changed since it was read")
+        self.latest = latest
 
 
 class GoogleCalendarService:
     """Service for handling Google Calendar API integration."""
     
-    def __init__(self):
+    def __init__(
+        self,
+        etag_store: Optional[ETagStore] = None,
+        hedging: Optional[HedgePolicy] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
         self.base_url = "https://www.googleapis.com/calendar/v3"
         self.scopes = settings.google_calendar_scopes
+        if etag_store is None and settings.etag_store_max_entries > 0:
+            etag_store = ETagStore(settings.etag_store_max_entries)
+        self.etags = etag_store
+        if hedging is None and settings.google_hedge_enabled:
+            hedging = HedgePolicy(
+                percentile=settings.google_hedge_percentile,
+                budget=settings.google_hedge_budget,
+                min_delay_ms=settings.google_hedge_min_delay_ms,
+            )
+        # applied to idempotent reads only (get_events)
+        self.hedging = hedging
+        # None means httpx's default network transport; benchmarks inject a stub
+        self.transport = transport
+        # identical concurrent reads share one request
+        self._reads = SingleFlight()
+
+    def _client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=self.transport)
+
+    async def _conditional_get(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        headers: Dict[str, str],
+        user_id: Optional[str],
+    ) -> Any:
+        """
+        GET a JSON resource, revalidating the stored copy with If-None-Match.
+        Raises httpx.HTTPError like response.raise_for_status().
+        """
+        stored = self.etags.get(user_id, url) if self.etags and user_id else None
+        if stored is not None:
+            conditional_gets.inc()
+            headers = {**headers, "If-None-Match": stored[0]}
+
+        response = await client.get(url, headers=headers)
+        if stored is not None and response.status_code == 304:
+            not_modified.inc()
+            return stored[1]
+        response.raise_for_status()
+
+        body = response.json()
+        if self.etags and user_id:
+            self.etags.put(user_id, url, response.headers.get("ETag") or body.get("etag"), body)
+        return body
     
-    async def get_calendars(self, access_token: str) -> List[Dict[str, Any]]:
+    async def get_calendars(
+        self,
+        access_token: str,
+        user_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
         """
         Get user's calendars from Google Calendar API.
         
         Args:
             access_token: Google access token
+            user_id: Owner of the token; enables conditional requests
             
         Returns:
             List[Dict[str, Any]]: List of calendars
@@ -35,11 +117,9 @@ class GoogleCalendarService:
         url = f"{self.base_url}/users/me/calendarList"
         headers = {"Authorization": f"Bearer {access_token}"}
         
-        async with httpx.AsyncClient() as client:
+        async with self._client() as client:
             try:
-                response = await client.get(url, headers=headers)
-                response.raise_for_status()
-                data = response.json()
+                data = await self._conditional_get(client, url, headers, user_id)
                 return data.get("items", [])
             except httpx.HTTPError:
                 return []
@@ -54,6 +134,9 @@ class GoogleCalendarService:
     ) -> List[Dict[str, Any]]:
         """
         Get events from Google Calendar API.
+
+        Concurrent calls with the same token, calendar and window share one
+        HTTP request.
         
         Args:
             access_token: Google access token
@@ -65,17 +148,39 @@ class GoogleCalendarService:
         Returns:
             List[Dict[str, Any]]: List of events
         """
-        url = f"{self.base_url}/calendars/{calendar_id}/events"
-        headers = {"Authorization": f"Bearer {access_token}"}
-
         params = {"maxResults": max_results}
         if start_date:
-            params["timeMin"] = _rfc3339(start_date)
+            params["timeMin"] = format_rfc3339(start_date)
         if end_date:
-            params["timeMax"] = _rfc3339(end_date)
-        async with httpx.AsyncClient() as client:
+            params["timeMax"] = format_rfc3339(end_date)
+
+        key = (access_token, calendar_id, params.get("timeMin"), params.get("timeMax"), max_results)
+        event_reads.inc()
+        if self._reads.in_flight(key):
+            event_reads_coalesced.inc()
+        events = await self._reads.do(
+            key, lambda: self._fetch_events(access_token, calendar_id, params)
+        )
+        # callers own their list; the event dicts are shared
+        return list(events)
+
+    async def _fetch_events(
+        self,
+        access_token: str,
+        calendar_id: str,
+        params: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        url = f"{self.base_url}/calendars/{calendar_id}/events"
+        headers = {"Authorization": f"Bearer {access_token}"}
+
+        async with self._client() as client:
             try:
-                response = await client.get(url, headers=headers, params=params)
+                if self.hedging is not None:
+                    response = await self.hedging.run(
+                        lambda: client.get(url, headers=headers, params=params)
+                    )
+                else:
+                    response = await client.get(url, headers=headers, params=params)
 
                 response.raise_for_status()
                 data = response.json()
@@ -83,6 +188,44 @@ class GoogleCalendarService:
             except httpx.HTTPError:
                 return []
     
+    async def query_free_busy(
+        self,
+        access_token: str,
+        calendar_ids: List[str],
+        start_date: datetime,
+        end_date: datetime
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get busy intervals for several calendars in one request.
+        
+        Args:
+            access_token: Google access token
+            calendar_ids: Calendar IDs to query
+            start_date: Start of the interval
+            end_date: End of the interval
+            
+        Returns:
+            Optional[Dict[str, Any]]: freeBusy response ({"calendars": {id: {"busy": [...]}}}) if successful, None otherwise
+        """
+        url = f"{self.base_url}/freeBusy"
+        headers = {
+            "Authorization": f"Bearer {access_token}",
+            "Content-Type": "application/json"
+        }
+        body = {
+            "timeMin": format_rfc3339(start_date),
+            "timeMax": format_rfc3339(end_date),
+            "items": [{"id": calendar_id} for calendar_id in calendar_ids],
+        }
+        
+        async with self._client() as client:
+            try:
+                response = await client.post(url, headers=headers, json=body)
+                response.raise_for_status()
+                return response.json()
+            except httpx.HTTPError:
+                return None
+    
     async def create_event(
         self,
         access_token: str,
@@ -106,7 +249,7 @@ class GoogleCalendarService:
             "Content-Type": "application/json"
         }
         
-        async with httpx.AsyncClient() as client:
+        async with self._client() as client:
             try:
                 response = await client.post(url, headers=headers, json=event_data)
                 response.raise_for_status()
@@ -118,7 +261,8 @@ class GoogleCalendarService:
         self,
         access_token: str,
         calendar_id: str,
-        event_id: str
+        event_id: str,
+        user_id: Optional[str] = None
     ) -> Optional[Dict[str, Any]]:
         """
         Get a specific event from Google Calendar.
@@ -127,6 +271,7 @@ class GoogleCalendarService:
             access_token: Google access token
             calendar_id: Calendar ID
             event_id: Event ID
+            user_id: Owner of the token; enables conditional requests
             
         Returns:
             Optional[Dict[str, Any]]: Event if found, None otherwise
@@ -134,44 +279,110 @@ class GoogleCalendarService:
         url = f"{self.base_url}/calendars/{calendar_id}/events/{event_id}"
         headers = {"Authorization": f"Bearer {access_token}"}
         
-        async with httpx.AsyncClient() as client:
+        async with self._client() as client:
             try:
-                response = await client.get(url, headers=headers)
-                response.raise_for_status()
-                return response.json()
+                return await self._conditional_get(client, url, headers, user_id)
             except httpx.HTTPError:
                 return None
-    
+
+    async def get_event_instances(
+        self,
+        access_token: str,
+        calendar_id: str,
+        event_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        max_results: int = 250
+    ) -> List[Dict[str, Any]]:
+        """
+        Get the instances of a recurring event within a time range.
+
+        Args:
+            access_token: Google access token
+            calendar_id: Calendar ID
+            event_id: Recurring event (series master) ID
+            start_date: Range start
+            end_date: Range end
+            max_results: Maximum number of instances to return
+
+        Returns:
+            List[Dict[str, Any]]: List of instances
+        """
+        url = f"{self.base_url}/calendars/{calendar_id}/events/{event_id}/instances"
+        headers = {"Authorization": f"Bearer {access_token}"}
+        params = {
+            "maxResults": max_results,
+            "timeMin": format_rfc3339(start_date),
+            "timeMax": format_rfc3339(end_date),
+        }
+
+        async with self._client() as client:
+            try:
+                response = await client.get(url, headers=headers, params=params)
+                response.raise_for_status()
+                return response.json().get("items", [])
+            except httpx.HTTPError:
+                return []
+
     async def update_event(
         self,
         access_token: str,
         calendar_id: str,
         event_id: str,
-        event_data: Dict[str, Any]
+        event_data: Dict[str, Any],
+        etag: Optional[str] = None,
+        user_id: Optional[str] = None
     ) -> Optional[Dict[str, Any]]:
         """
-        Update an event in Google Calendar.
+        Partially update an event in Google Calendar (PATCH: fields missing
+        from event_data are left as they are).
+
+        The write is conditional on `etag`, or on the last ETag stored for
+        the event. If the event changed in the meantime (412), nothing is
+        written: the caller gets EventConflict with the current version, so
+        the change can be confirmed again instead of overwriting the other edit.
         
         Args:
             access_token: Google access token
             calendar_id: Calendar ID
             event_id: Event ID
-            event_data: Updated event data
+            event_data: Fields to change
+            etag: ETag of the version the change is based on
+            user_id: Owner of the token; enables the ETag store
             
         Returns:
             Optional[Dict[str, Any]]: Updated event if successful, None otherwise
+
+        Raises:
+            EventConflict: the event no longer matches the ETag
         """
         url = f"{self.base_url}/calendars/{calendar_id}/events/{event_id}"
         headers = {
             "Authorization": f"Bearer {access_token}",
             "Content-Type": "application/json"
         }
+        if etag is None and self.etags and user_id:
+            etag = self.etags.etag(user_id, url)
         
-        async with httpx.AsyncClient() as client:
+        async with self._client() as client:
             try:
-                response = await client.put(url, headers=headers, json=event_data)
+                request_headers = {**headers, "If-Match": etag} if etag else headers
+                response = await client.patch(url, headers=request_headers, json=event_data)
+                if response.status_code == 412:
+                    update_conflicts.inc()
+                    latest: Optional[Dict[str, Any]] = None
+                    try:
+                        latest = await self._conditional_get(
+                            client, url, {"Authorization": headers["Authorization"]}, user_id
+                        )
+                    except httpx.HTTPError:
+                        pass
+                    raise EventConflict(latest)
                 response.raise_for_status()
-                return response.json()
+                updated = response.json()
+                if self.etags and user_id:
+                    self.etags.put(user_id, url, updated.get("etag"), updated)
+                return updated
             except httpx.HTTPError:
                 return None
     
@@ -179,7 +390,8 @@ class GoogleCalendarService:
         self,
         access_token: str,
         calendar_id: str,
-        event_id: str
+        event_id: str,
+        user_id: Optional[str] = None
     ) -> bool:
         """
         Delete an event from Google Calendar.
@@ -188,17 +400,96 @@ class GoogleCalendarService:
             access_token: Google access token
             calendar_id: Calendar ID
             event_id: Event ID
+            user_id: Owner of the token; drops the event from the ETag store
             
         Returns:
             bool: True if deleted successfully, False otherwise
         """
         url = f"{self.base_url}/calendars/{calendar_id}/events/{event_id}"
         headers = {"Authorization": f"Bearer {access_token}"}
+        if self.etags and user_id:
+            self.etags.invalidate(user_id, url)
         
-        async with httpx.AsyncClient() as client:
+        async with self._client() as client:
             try:
                 response = await client.delete(url, headers=headers)
-                print(response)
+                response.raise_for_status()
+                return True
+            except httpx.HTTPError:
+                return False
+
+    async def watch_events(
+        self,
+        access_token: str,
+        calendar_id: str,
+        channel_id: str,
+        address: str,
+        token: str,
+        ttl_seconds: int,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Open a push notification channel for changes to a calendar's events.
+        
+        Args:
+            access_token: Google access token
+            calendar_id: Calendar ID
+            channel_id: Unique ID for the new channel
+            address: HTTPS URL Google will POST notifications to
+            token: Opaque value echoed back in X-Goog-Channel-Token
+            ttl_seconds: Requested channel lifetime
+            
+        Returns:
+            Optional[Dict[str, Any]]: Channel (with resourceId and expiration) if successful, None otherwise
+        """
+        url = f"{self.base_url}/calendars/{calendar_id}/events/watch"
+        headers = {
+            "Authorization": f"Bearer {access_token}",
+            "Content-Type": "application/json"
+        }
+        body = {
+            "id": channel_id,
+            "type": "web_hook",
+            "address": address,
+            "token": token,
+            "params": {"ttl": str(ttl_seconds)},
+        }
+        
+        async with self._client() as client:
+            try:
+                response = await client.post(url, headers=headers, json=body)
+                response.raise_for_status()
+                return response.json()
+            except httpx.HTTPError:
+                return None
+    
+    async def stop_channel(
+        self,
+        access_token: str,
+        channel_id: str,
+        resource_id: str
+    ) -> bool:
+        """
+        Stop a push notification channel.
+        
+        Args:
+            access_token: Google access token
+            channel_id: Channel ID
+            resource_id: Resource ID returned when the channel was opened
+            
+        Returns:
+            bool: True if stopped successfully, False otherwise
+        """
+        url = f"{self.base_url}/channels/stop"
+        headers = {
+            "Authorization": f"Bearer {access_token}",
+            "Content-Type": "application/json"
+        }
+        
+        async with self._client() as client:
+            try:
+                response = await client.post(
+                    url, headers=headers, json={"id": channel_id, "resourceId": resource_id}
+                )
                 response.raise_for_status()
                 return True
             except httpx.HTTPError:
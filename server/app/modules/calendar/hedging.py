@@ -0,0 +1,127 @@
+"""
+Hedged requests for idempotent Google reads.
+
+If a request has not answered after the p-th percentile of recent latencies,
+a second identical request is sent and whichever answers first wins; the
+other is cancelled. A budget caps hedges to a share of all requests, so a
+Google-wide slowdown can't double our traffic.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Optional, TypeVar
+
+from app.shared.metrics import metrics
+
+
+T = TypeVar("T")
+
+hedges_sent = metrics.counter(
+    "google_hedged_requests_total", "Second requests sent because the first was slow."
+)
+hedge_wins = metrics.counter(
+    "google_hedge_wins_total", "Hedged requests that answered before the original."
+)
+hedges_over_budget = metrics.counter(
+    "google_hedge_budget_exhausted_total", "Slow requests not hedged because the budget was used up."
+)
+
+
+class HedgePolicy:
+    """Delay and budget for hedging, learned from recent request latencies."""
+
+    def __init__(
+        self,
+        percentile: float = 95.0,
+        budget: float = 0.05,
+        min_delay_ms: float = 50.0,
+        min_samples: int = 20,
+        window: int = 500,
+    ) -> None:
+        self.percentile = percentile
+        self.budget = budget
+        self.min_delay_ms = min_delay_ms
+        self.min_samples = min_samples
+        self._latencies_ms: Deque[float] = deque(maxlen=window)
+        self._requests = 0
+        self._hedges = 0
+        self._lock = threading.Lock()
+
+    def delay(self) -> Optional[float]:
+        """Seconds to wait before hedging, or None until enough latencies were seen."""
+        with self._lock:
+            if len(self._latencies_ms) < self.min_samples:
+                return None
+            ordered = sorted(self._latencies_ms)
+        index = min(len(ordered) - 1, int(len(ordered) * self.percentile / 100.0))
+        return max(ordered[index], self.min_delay_ms) / 1000.0
+
+    def observe(self, elapsed_ms: float) -> None:
+        with self._lock:
+            self._latencies_ms.append(elapsed_ms)
+
+    def _count_request(self) -> None:
+        with self._lock:
+            self._requests += 1
+            if self._requests >= 10_000:
+                # keep the ratio but let old traffic fade out
+                self._requests //= 2
+                self._hedges //= 2
+
+    def _take_budget(self) -> bool:
+        with self._lock:
+            if self._hedges + 1 > self.budget * self._requests:
+                return False
+            self._hedges += 1
+            return True
+
+    async def run(self, send: Callable[[], Awaitable[T]]) -> T:
+        """
+        Result of send(), hedged with a second send() when the first is slow.
+        `send` must be safe to call twice (idempotent read).
+        """
+        self._count_request()
+        delay = self.delay()
+        primary = asyncio.ensure_future(self._timed(send))
+        hedge: Optional["asyncio.Future[T]"] = None
+        try:
+            if delay is None:
+                return await primary
+
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if done:
+                return primary.result()
+            if not self._take_budget():
+                hedges_over_budget.inc()
+                return await primary
+
+            hedges_sent.inc()
+            hedge = asyncio.ensure_future(self._timed(send))
+            pending = {primary, hedge}
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winner = next((task for task in done if task.exception() is None), None)
+                if winner is None and pending:
+                    # a failed attempt doesn't win while the other can still answer
+                    continue
+                winner = winner or done.pop()
+                if winner is hedge:
+                    hedge_wins.inc()
+                return winner.result()
+        finally:
+            # the loser, or both if the caller was cancelled
+            for task in (primary, hedge):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    async def _timed(self, send: Callable[[], Awaitable[T]]) -> T:
+        started = time.perf_counter()
+        result = await send()
+        # only answers count: a cancelled loser's time so far would pull the
+        # percentile, and with it the hedge delay, down
+        self.observe((time.perf_counter() - started) * 1000.0)
+        return result
@@ -0,0 +1,430 @@
+"""
+Local expansion of recurring events (RRULE / EXDATE / RDATE).
+
+Without `singleEvents=true` Google returns a recurring series as one master
+event plus its exceptions: modified instances (with `recurringEventId` and
+`originalStartTime`) and cancelled instances. Expanding masters here keeps the
+payloads small for long windows, and the expansion of a series over a window
+is memoized.
+
+Supported: the subset of RFC 5545 Google Calendar produces, i.e. FREQ
+DAILY/WEEKLY/MONTHLY/YEARLY with INTERVAL, COUNT, UNTIL, BYDAY (with ordinals
+for MONTHLY/YEARLY+BYMONTH), BYMONTHDAY, BYMONTH and WKST. Anything else raises
+UnsupportedRecurrence so the caller can ask Google for the instances instead.
+
+Known gap: an instance moved *out of* the fetched window is not returned by
+Google, so its original slot is still generated here.
+"""
+
+from __future__ import annotations
+
+import calendar
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone, tzinfo
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from app.shared.datetime_utils import get_zone, parse_event_time
+
+
+DateOrDateTime = Union[date, datetime]
+
+# guards against rules that never (or very rarely) match, e.g. BYMONTHDAY=31;BYMONTH=2
+MAX_PERIODS = 20_000
+MAX_INSTANCES = 5_000
+
+_WEEKDAYS = {"MO": 0, "TU": 1, "WE": 2, "TH": 3, "FR": 4, "SA": 5, "SU": 6}
+_FREQS = ("DAILY", "WEEKLY", "MONTHLY", "YEARLY")
+_SUPPORTED_PARTS = {"FREQ", "INTERVAL", "COUNT", "UNTIL", "BYDAY", "BYMONTHDAY", "BYMONTH", "WKST"}
+
+
+class UnsupportedRecurrence(ValueError):
+    """The recurrence uses a part this engine does not implement."""
+
+
+@dataclass(frozen=True)
+class RRule:
+    freq: str
+    interval: int = 1
+    count: Optional[int] = None
+    until: Optional[DateOrDateTime] = None
+    byday: Tuple[Tuple[int, int], ...] = ()  # (ordinal or 0, weekday)
+    bymonthday: Tuple[int, ...] = ()
+    bymonth: Tuple[int, ...] = ()
+    wkst: int = 0
+
+
+# ---- parsing ----
+
+def _parse_value(value: str, zone: tzinfo) -> DateOrDateTime:
+    """iCalendar DATE or DATE-TIME; floating times are local to `zone`."""
+    if "T" not in value:
+        return datetime.strptime(value, "%Y%m%d").date()
+    if value.endswith("Z"):
+        return datetime.strptime(value, "%Y%m%dT%H%M%SZ").replace(tzinfo=timezone.utc)
+    return datetime.strptime(value, "%Y%m%dT%H%M%S").replace(tzinfo=zone)
+
+
+def parse_rrule(value: str, zone: tzinfo) -> RRule:
+    parts: Dict[str, str] = {}
+    for item in value.split(";"):
+        if not item:
+            continue
+        key, _, val = item.partition("=")
+        parts[key.upper()] = val
+    unknown = set(parts) - _SUPPORTED_PARTS
+    if unknown:
+        raise UnsupportedRecurrence(f"Unsupported RRULE parts: {sorted(unknown)}")
+
+    freq = parts.get("FREQ", "")
+    if freq not in _FREQS:
+        raise UnsupportedRecurrence(f"Unsupported FREQ: {freq!r}")
+
+    byday: List[Tuple[int, int]] = []
+    for token in filter(None, parts.get("BYDAY", "").split(",")):
+        ordinal, weekday = token[:-2], token[-2:]
+        if weekday not in _WEEKDAYS:
+            raise UnsupportedRecurrence(f"Bad BYDAY value: {token!r}")
+        byday.append((int(ordinal) if ordinal else 0, _WEEKDAYS[weekday]))
+    if any(n for n, _ in byday) and (
+        freq in ("DAILY", "WEEKLY") or (freq == "YEARLY" and "BYMONTH" not in parts)
+    ):
+        raise UnsupportedRecurrence("Ordinal BYDAY is only supported within a month")
+
+    try:
+        return RRule(
+            freq=freq,
+            interval=max(1, int(parts.get("INTERVAL", "1"))),
+            count=int(parts["COUNT"]) if "COUNT" in parts else None,
+            until=_parse_value(parts["UNTIL"], zone) if "UNTIL" in parts else None,
+            byday=tuple(byday),
+            bymonthday=tuple(int(d) for d in filter(None, parts.get("BYMONTHDAY", "").split(","))),
+            bymonth=tuple(int(m) for m in filter(None, parts.get("BYMONTH", "").split(","))),
+            wkst=_WEEKDAYS.get(parts.get("WKST", "MO"), 0),
+        )
+    except ValueError as exc:
+        raise UnsupportedRecurrence(str(exc)) from exc
+
+
+def _parse_dates(line: str, zone: tzinfo) -> List[DateOrDateTime]:
+    # EXDATE;TZID=Asia/Jerusalem:20260105T090000,20260112T090000
+    head, _, values = line.partition(":")
+    params = dict(p.split("=", 1) for p in head.split(";")[1:] if "=" in p)
+    if params.get("VALUE") == "PERIOD":
+        raise UnsupportedRecurrence("RDATE periods are not supported")
+    value_zone = get_zone(params["TZID"], zone) if "TZID" in params else zone
+    return [_parse_value(v, value_zone) for v in values.split(",") if v]
+
+
+# ---- rule evaluation ----
+
+def _month_days(year: int, month: int) -> int:
+    return calendar.monthrange(year, month)[1]
+
+
+def _add_months(year: int, month: int, months: int) -> Tuple[int, int]:
+    index = year * 12 + (month - 1) + months
+    return index // 12, index % 12 + 1
+
+
+def _days_in_month_matching(rule: RRule, year: int, month: int, default_day: int) -> List[int]:
+    n_days = _month_days(year, month)
+
+    by_monthday = None
+    if rule.bymonthday:
+        by_monthday = {d if d > 0 else n_days + d + 1 for d in rule.bymonthday}
+
+    by_weekday = None
+    if rule.byday:
+        by_weekday = set()
+        first_weekday = date(year, month, 1).weekday()
+        for ordinal, weekday in rule.byday:
+            days = [d for d in range(1, n_days + 1) if (first_weekday + d - 1) % 7 == weekday]
+            if ordinal == 0:
+                by_weekday.update(days)
+            elif -len(days) <= ordinal <= len(days):
+                by_weekday.add(days[ordinal - 1] if ordinal > 0 else days[ordinal])
+
+    if by_monthday is None and by_weekday is None:
+        candidates = {default_day}
+    elif by_monthday is None:
+        candidates = by_weekday
+    elif by_weekday is None:
+        candidates = by_monthday
+    else:
+        candidates = by_monthday & by_weekday
+    return sorted(d for d in candidates if 1 <= d <= n_days)
+
+
+def _period_days(rule: RRule, start: date, period: int) -> List[date]:
+    """Candidate days in the `period`-th period (0 = the one containing start)."""
+    step = rule.interval * period
+    if rule.freq == "DAILY":
+        day = start + timedelta(days=step)
+        weekdays = {w for _, w in rule.byday}
+        if rule.bymonth and day.month not in rule.bymonth:
+            return []
+        if rule.bymonthday and day.day not in {
+            d if d > 0 else _month_days(day.year, day.month) + d + 1 for d in rule.bymonthday
+        }:
+            return []
+        if weekdays and day.weekday() not in weekdays:
+            return []
+        return [day]
+
+    if rule.freq == "WEEKLY":
+        week_start = start - timedelta(days=(start.weekday() - rule.wkst) % 7)
+        week_start += timedelta(weeks=step)
+        weekdays = {w for _, w in rule.byday} or {start.weekday()}
+        days = [week_start + timedelta(days=i) for i in range(7)]
+        return [
+            d for d in days
+            if d.weekday() in weekdays and (not rule.bymonth or d.month in rule.bymonth)
+        ]
+
+    if rule.freq == "MONTHLY":
+        year, month = _add_months(start.year, start.month, step)
+        if rule.bymonth and month not in rule.bymonth:
+            return []
+        return [date(year, month, d) for d in _days_in_month_matching(rule, year, month, start.day)]
+
+    # YEARLY
+    year = start.year + step
+    days: List[date] = []
+    for month in rule.bymonth or (start.month,):
+        days.extend(
+            date(year, month, d) for d in _days_in_month_matching(rule, year, month, start.day)
+        )
+    return sorted(days)
+
+
+def _period_days_start(rule: RRule, start: date, period: int) -> date:
+    step = rule.interval * period
+    if rule.freq == "DAILY":
+        return start + timedelta(days=step)
+    if rule.freq == "WEEKLY":
+        return start + timedelta(weeks=step)
+    if rule.freq == "MONTHLY":
+        year, month = _add_months(start.year, start.month, step)
+        return date(year, month, 1)
+    return date(start.year + step, 1, 1)
+
+
+def _first_useful_period(rule: RRule, start: date, window_start: date) -> int:
+    """Periods that end before the window can be skipped when there is no COUNT."""
+    if rule.count is not None or window_start <= start:
+        return 0
+    if rule.freq == "DAILY":
+        elapsed = (window_start - start).days
+        return max(0, elapsed // rule.interval - 1)
+    if rule.freq == "WEEKLY":
+        elapsed = (window_start - start).days // 7
+        return max(0, elapsed // rule.interval - 1)
+    if rule.freq == "MONTHLY":
+        elapsed = (window_start.year - start.year) * 12 + window_start.month - start.month
+        return max(0, elapsed // rule.interval - 1)
+    elapsed = window_start.year - start.year
+    return max(0, elapsed // rule.interval - 1)
+
+
+def _past_until(rule: RRule, local_start: datetime, zone: tzinfo) -> bool:
+    if rule.until is None:
+        return False
+    if isinstance(rule.until, datetime):
+        return local_start.replace(tzinfo=zone) > rule.until
+    return local_start.date() > rule.until
+
+
+def _rule_starts(
+    rule: RRule,
+    dtstart: datetime,
+    zone: tzinfo,
+    window_start: datetime,
+    window_end: datetime,
+) -> Iterator[datetime]:
+    """Naive local start times produced by one rule, in order."""
+    start_day = dtstart.date()
+    start_time = dtstart.time()
+    emitted = 0
+    first = _first_useful_period(rule, start_day, window_start.astimezone(zone).date())
+    last_day = window_end.astimezone(zone).date()
+
+    for period in range(first, first + MAX_PERIODS):
+        days = _period_days(rule, start_day, period)
+        if not days and period > first and _period_days_start(rule, start_day, period) > last_day:
+            return
+        for day in days:
+            local = datetime.combine(day, start_time)
+            if local < dtstart:
+                continue
+            if _past_until(rule, local, zone):
+                return
+            if day > last_day:
+                return
+            emitted += 1
+            if rule.count is not None and emitted > rule.count:
+                return
+            yield local
+
+
+@lru_cache(maxsize=2048)
+def occurrences(
+    recurrence: Tuple[str, ...],
+    dtstart: datetime,
+    tz_name: str,
+    window_start: datetime,
+    window_end: datetime,
+    duration: timedelta,
+) -> Tuple[datetime, ...]:
+    """
+    Aware start times of the series instances that overlap [window_start, window_end).
+    `dtstart` is the naive local start of the series in zone `tz_name`.
+
+    Raises:
+        UnsupportedRecurrence: the recurrence uses parts this engine lacks.
+    """
+    zone = get_zone(tz_name)
+    rules: List[RRule] = []
+    rdates: List[datetime] = []
+    exdates = set()
+
+    for line in recurrence:
+        name = line.split(":", 1)[0].split(";", 1)[0].upper()
+        if name == "RRULE":
+            rules.append(parse_rrule(line.split(":", 1)[1], zone))
+        elif name == "EXDATE":
+            exdates.update(_instant(v, dtstart.time(), zone) for v in _parse_dates(line, zone))
+        elif name == "RDATE":
+            rdates.extend(_instant(v, dtstart.time(), zone) for v in _parse_dates(line, zone))
+        else:
+            raise UnsupportedRecurrence(f"Unsupported recurrence line: {name}")
+
+    starts = set(rdates)
+    starts.add(dtstart.replace(tzinfo=zone))
+    for rule in rules:
+        for local in _rule_starts(rule, dtstart, zone, window_start - duration, window_end):
+            starts.add(local.replace(tzinfo=zone))
+            if len(starts) > MAX_INSTANCES:
+                break
+
+    return tuple(sorted(
+        s for s in starts
+        if s not in exdates and s < window_end and s + duration > window_start
+    ))
+
+
+def _instant(value: DateOrDateTime, start_time: time, zone: tzinfo) -> datetime:
+    if isinstance(value, datetime):
+        return value.astimezone(zone)
+    return datetime.combine(value, start_time, tzinfo=zone)
+
+
+# ---- event expansion ----
+
+def _instance_id(master_id: str, start: datetime, all_day: bool) -> str:
+    # same format Google uses for instance ids, so writes can target them directly
+    if all_day:
+        return f"{master_id}_{start:%Y%m%d}"
+    return f"{master_id}_{start.astimezone(timezone.utc):%Y%m%dT%H%M%SZ}"
+
+
+def _master_times(
+    master: Dict[str, Any],
+    default_zone: str,
+) -> Optional[Tuple[datetime, timedelta, str, bool]]:
+    start = master.get("start") or {}
+    end = master.get("end") or {}
+    tz_name = start.get("timeZone") or default_zone
+    zone = get_zone(tz_name)
+    begin = parse_event_time(start, zone)
+    finish = parse_event_time(end, zone)
+    if begin is None or finish is None:
+        return None
+    all_day = "date" in start and "dateTime" not in start
+    return begin.astimezone(zone).replace(tzinfo=None), finish - begin, tz_name, all_day
+
+
+def expand_series(
+    master: Dict[str, Any],
+    window_start: datetime,
+    window_end: datetime,
+    default_zone: str = "UTC",
+) -> List[Dict[str, Any]]:
+    """
+    Instances of one series master overlapping the window, shaped like the
+    events Google returns with singleEvents=true.
+
+    Raises:
+        UnsupportedRecurrence: see module docstring.
+    """
+    times = _master_times(master, default_zone)
+    if times is None:
+        return []
+    dtstart, duration, tz_name, all_day = times
+
+    starts = occurrences(
+        tuple(master.get("recurrence") or ()),
+        dtstart,
+        tz_name,
+        window_start,
+        window_end,
+        duration,
+    )
+
+    base = {k: v for k, v in master.items() if k not in ("recurrence", "id", "etag", "start", "end")}
+    instances = []
+    for start in starts:
+        end = start + duration
+        if all_day:
+            start_obj: Dict[str, Any] = {"date": start.date().isoformat()}
+            end_obj: Dict[str, Any] = {"date": end.date().isoformat()}
+        else:
+            start_obj = {"dateTime": start.isoformat(), "timeZone": tz_name}
+            end_obj = {"dateTime": end.isoformat(), "timeZone": tz_name}
+        instances.append({
+            **base,
+            "id": _instance_id(master["id"], start, all_day),
+            "recurringEventId": master["id"],
+            "originalStartTime": dict(start_obj),
+            "start": start_obj,
+            "end": end_obj,
+        })
+    return instances
+
+
+def expand_events(
+    events: Sequence[Dict[str, Any]],
+    window_start: datetime,
+    window_end: datetime,
+    default_zone: str = "UTC",
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Replace series masters by their instances in the window, applying modified
+    and cancelled exceptions. Returns (events, unsupported masters); the caller
+    should fetch instances for the latter from Google.
+    """
+    exceptions = set()
+    for event in events:
+        if event.get("recurringEventId") and event.get("originalStartTime"):
+            original = parse_event_time(event["originalStartTime"], timezone.utc)
+            if original is not None:
+                exceptions.add((event["recurringEventId"], original))
+
+    expanded: List[Dict[str, Any]] = []
+    unsupported: List[Dict[str, Any]] = []
+    for event in events:
+        if event.get("status") == "cancelled":
+            continue
+        if not event.get("recurrence"):
+            expanded.append(event)
+            continue
+        try:
+            instances = expand_series(event, window_start, window_end, default_zone)
+        except UnsupportedRecurrence:
+            unsupported.append(event)
+            continue
+        expanded.extend(
+            inst for inst in instances
+            if (event["id"], parse_event_time(inst["start"], timezone.utc)) not in exceptions
+        )
+    return expanded, unsupported
@@ -0,0 +1,82 @@
+"""
+Local fakes for exercising push notifications without Google.
+
+FakeWatchCalendarService accepts watch/stop requests without calling Google.
+FakePushNotifier posts notifications shaped like Google's to the webhook,
+either over the network or straight into the ASGI app:
+
+    notifier = FakePushNotifier(watch_manager, httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"))
+    await notifier.notify(user_id, "primary")
+"""
+
+from __future__ import annotations
+
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+import httpx
+
+from app.modules.calendar.google_calendar_service import GoogleCalendarService
+from app.modules.calendar.watch_manager import CalendarWatchManager
+
+
+class FakeWatchCalendarService(GoogleCalendarService):
+    """GoogleCalendarService whose watch/stop calls succeed locally."""
+
+    async def watch_events(
+        self,
+        access_token: str,
+        calendar_id: str,
+        channel_id: str,
+        address: str,
+        token: str,
+        ttl_seconds: int,
+    ) -> Optional[Dict[str, Any]]:
+        return {
+            "kind": "api#channel",
+            "id": channel_id,
+            "resourceId": f"fake-{uuid.uuid4().hex}",
+            "resourceUri": f"{self.base_url}/calendars/{calendar_id}/events",
+            "token": token,
+            "expiration": str(int((time.time() + ttl_seconds) * 1000)),
+        }
+
+    async def stop_channel(self, access_token: str, channel_id: str, resource_id: str) -> bool:
+        return True
+
+
+class FakePushNotifier:
+    """Posts Google-style notifications for channels known to a watch manager."""
+
+    def __init__(
+        self,
+        watch_manager: CalendarWatchManager,
+        client: httpx.AsyncClient,
+        path: str = "/calendar/notifications",
+    ) -> None:
+        self.watch_manager = watch_manager
+        self.client = client
+        self.path = path
+        self._message_number = 0
+
+    async def notify(
+        self,
+        user_id: str,
+        calendar_id: str,
+        state: str = "exists",
+    ) -> httpx.Response:
+        channel = self.watch_manager.channel_for(user_id, calendar_id)
+        if channel is None:
+            raise LookupError(f"No watch channel for {user_id}/{calendar_id}")
+
+        self._message_number += 1
+        headers = {
+            "X-Goog-Channel-ID": channel.channel_id,
+            "X-Goog-Channel-Token": channel.token,
+            "X-Goog-Resource-ID": channel.resource_id or "",
+            "X-Goog-Resource-State": state,
+            "X-Goog-Message-Number": str(self._message_number),
+        }
+        return await self.client.post(self.path, headers=headers)
@@ -0,0 +1,237 @@
+"""
+Google Calendar push notification channels (events.watch).
+
+A channel is opened per (user, calendar) the first time the agent reads that
+calendar, and re-opened when it is close to expiring. We hold no refresh
+tokens server-side, so renewal happens on the user's next request rather than
+on a timer; a channel that lapses simply stops marking the cache as watched.
+
+Notifications only say "something changed"; we drop the cached windows for
+that calendar and the next read goes to Google.
+
+Channel tokens are "<user id>.<HMAC of channel and user id>", so a channel we
+no longer track (lost on restart, or replaced) is still recognisably ours.
+Notifications for such channels are acknowledged, since Google retries
+anything else, and the channel is stopped with that user's next token.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import hmac
+import logging
+import secrets
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Coroutine, Dict, Mapping, Optional, Set, Tuple
+
+from app.modules.calendar.event_cache import EventCache
+from app.modules.calendar.google_calendar_service import GoogleCalendarService
+from app.shared.metrics import metrics
+
+
+logger = logging.getLogger(__name__)
+
+notifications_received = metrics.counter(
+    "calendar_watch_notifications_total", "Push notifications accepted from Google."
+)
+notifications_rejected = metrics.counter(
+    "calendar_watch_notifications_rejected_total",
+    "Push notifications with an unknown channel or bad token.",
+)
+channels_opened = metrics.counter(
+    "calendar_watch_channels_opened_total", "Push channels opened or renewed."
+)
+channels_orphaned = metrics.counter(
+    "calendar_watch_channels_orphaned_total",
+    "Channels of ours that notified after we stopped tracking them; stopped on the user's next request.",
+)
+
+
+@dataclass
+class WatchChannel:
+    channel_id: str
+    user_id: str
+    calendar_id: str
+    token: str
+    resource_id: Optional[str] = None
+    expires_at: float = 0.0  # unix seconds
+
+    def expires_within(self, seconds: float) -> bool:
+        return self.expires_at - time.time() < seconds
+
+
+class CalendarWatchManager:
+    """Opens, renews and routes notifications for push channels."""
+
+    def __init__(
+        self,
+        service: GoogleCalendarService,
+        event_cache: EventCache,
+        webhook_url: str,
+        channel_ttl_seconds: int = 7 * 24 * 3600,
+        renew_before_seconds: int = 3600,
+        signing_key: Optional[str] = None,
+    ) -> None:
+        self.service = service
+        self.event_cache = event_cache
+        self.webhook_url = webhook_url
+        self.channel_ttl_seconds = channel_ttl_seconds
+        self.renew_before_seconds = renew_before_seconds
+        # without a stable key, channels from before a restart can't be recognised
+        self._signing_key = (signing_key or secrets.token_hex(32)).encode("utf-8")
+
+        self._channels: Dict[str, WatchChannel] = {}
+        self._by_calendar: Dict[Tuple[str, str], str] = {}
+        # user id -> {channel id: resource id} of untracked channels to stop
+        self._orphans: Dict[str, Dict[str, str]] = {}
+        self._pending: Set[Tuple[str, str]] = set()
+        self._tasks: Set[asyncio.Task] = set()
+
+    # ---- registration ----
+
+    def channel_for(self, user_id: str, calendar_id: str) -> Optional[WatchChannel]:
+        channel_id = self._by_calendar.get((user_id, calendar_id))
+        return self._channels.get(channel_id) if channel_id else None
+
+    def ensure_watch(self, user_id: str, access_token: str, calendar_id: str) -> None:
+        """
+        Make sure a live channel exists for this calendar. Never blocks the
+        caller: registration/renewal runs as a background task.
+        """
+        if user_id in self._orphans:
+            self._spawn(self._stop_orphans(user_id, access_token))
+
+        key = (user_id, calendar_id)
+        channel = self.channel_for(user_id, calendar_id)
+        if channel is not None and not channel.expires_within(self.renew_before_seconds):
+            return
+        if channel is not None and channel.expires_within(0):
+            # lapsed: fall back to the short cache TTL until a new channel is open
+            self._forget(channel)
+            channel = None
+        if key in self._pending:
+            return
+
+        self._pending.add(key)
+        self._spawn(self._open_channel(user_id, access_token, calendar_id, previous=channel))
+
+    def _spawn(self, coro: Coroutine[Any, Any, None]) -> None:
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _open_channel(
+        self,
+        user_id: str,
+        access_token: str,
+        calendar_id: str,
+        previous: Optional[WatchChannel],
+    ) -> None:
+        key = (user_id, calendar_id)
+        try:
+            channel_id = str(uuid.uuid4())
+            channel = WatchChannel(
+                channel_id=channel_id,
+                user_id=user_id,
+                calendar_id=calendar_id,
+                token=f"{user_id}.{self._sign(channel_id, user_id)}",
+            )
+            # register before the request: Google sends a "sync" message right away
+            self._channels[channel.channel_id] = channel
+
+            opened = await self.service.watch_events(
+                access_token=access_token,
+                calendar_id=calendar_id,
+                channel_id=channel.channel_id,
+                address=self.webhook_url,
+                token=channel.token,
+                ttl_seconds=self.channel_ttl_seconds,
+            )
+            if not opened:
+                self._channels.pop(channel.channel_id, None)
+                logger.warning("Failed to open watch channel for %s/%s", user_id, calendar_id)
+                return
+
+            channel.resource_id = opened.get("resourceId")
+            expiration_ms = opened.get("expiration")
+            channel.expires_at = (
+                int(expiration_ms) / 1000.0
+                if expiration_ms
+                else time.time() + self.channel_ttl_seconds
+            )
+
+            self._by_calendar[key] = channel.channel_id
+            # anything cached before the channel existed may already be stale
+            self.event_cache.invalidate(user_id, calendar_id)
+            self.event_cache.set_watched(user_id, calendar_id, True)
+            channels_opened.inc()
+
+            if previous is not None:
+                self._channels.pop(previous.channel_id, None)
+                if previous.resource_id:
+                    await self.service.stop_channel(
+                        access_token, previous.channel_id, previous.resource_id
+                    )
+        finally:
+            self._pending.discard(key)
+
+    async def _stop_orphans(self, user_id: str, access_token: str) -> None:
+        for channel_id, resource_id in self._orphans.pop(user_id, {}).items():
+            if channel_id not in self._channels:
+                await self.service.stop_channel(access_token, channel_id, resource_id)
+
+    def _forget(self, channel: WatchChannel) -> None:
+        self._channels.pop(channel.channel_id, None)
+        key = (channel.user_id, channel.calendar_id)
+        if self._by_calendar.get(key) == channel.channel_id:
+            del self._by_calendar[key]
+            self.event_cache.set_watched(channel.user_id, channel.calendar_id, False)
+
+    # ---- notifications ----
+
+    def handle_notification(self, headers: Mapping[str, str]) -> bool:
+        """
+        Process one notification from its X-Goog-* headers.
+        Returns False only if the channel is one we track and the token
+        doesn't match; unknown channels are acknowledged and ignored.
+        """
+        channel_id = headers.get("x-goog-channel-id", "")
+        channel = self._channels.get(channel_id)
+        token = headers.get("x-goog-channel-token", "")
+
+        if channel is None:
+            notifications_rejected.inc()
+            user_id = self._owner(channel_id, token)
+            resource_id = headers.get("x-goog-resource-id", "")
+            if user_id is not None and resource_id:
+                channels_orphaned.inc()
+                self._orphans.setdefault(user_id, {})[channel_id] = resource_id
+            return True
+        if not secrets.compare_digest(token, channel.token):
+            notifications_rejected.inc()
+            return False
+
+        notifications_received.inc()
+        state = headers.get("x-goog-resource-state", "")
+        if state == "sync":
+            return True
+
+        # "exists" / "not_exists": the event list changed
+        self.event_cache.invalidate(channel.user_id, channel.calendar_id)
+        return True
+
+    # ---- channel tokens ----
+
+    def _sign(self, channel_id: str, user_id: str) -> str:
+        message = f"{channel_id}:{user_id}".encode("utf-8")
+        return hmac.new(self._signing_key, message, hashlib.sha256).hexdigest()
+
+    def _owner(self, channel_id: str, token: str) -> Optional[str]:
+        """The user a channel token was issued to, if we issued it."""
+        user_id, _, signature = token.rpartition(".")
+        if not user_id or not secrets.compare_digest(signature, self._sign(channel_id, user_id)):
+            return None
+        return user_id
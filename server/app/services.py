@@ -0,0 +1,244 @@
+"""
+Application services, built on first use and shared through app.state.
+
+create_app() (app/main.py) puts one Services instance on app.state; routes
+and middleware reach it through app.dependencies.get_services. Each service
+is created the first time something asks for it, and modules that are slow to
+import (openai, the agent) are only imported then, so a cold start pays just
+for what its first request uses.
+"""
+
+from __future__ import annotations
+
+from functools import cached_property
+from typing import TYPE_CHECKING, Optional
+
+from app.config import settings
+
+if TYPE_CHECKING:
+    from app.modules.ai.calendar_agent import CalendarAgent
+    from app.modules.ai.chat_socket import ConnectionLimiter
+    from app.modules.ai.memory import ConversationMemory
+    from app.modules.ai.recording import TurnRecorder
+    from app.modules.ai.summarizer import ConversationSummarizer
+    from app.modules.auth.auth_service import AuthService
+    from app.modules.auth.google_oauth_service import GoogleOAuthService
+    from app.modules.auth.profile_cache import ProfileCache
+    from app.modules.calendar.event_cache import EventCache
+    from app.modules.calendar.google_calendar_service import GoogleCalendarService
+    from app.modules.calendar.watch_manager import CalendarWatchManager
+    from app.shared.idempotency import IdempotencyStore
+    from app.shared.jobs import JobQueue
+    from app.shared.loop_watchdog import EventLoopWatchdog
+
+
+class Services:
+    """One lazily built instance of every service the app shares."""
+
+    # ---- auth ----
+
+    @cached_property
+    def auth(self) -> AuthService:
+        from app.modules.auth.auth_service import AuthService
+
+        return AuthService()
+
+    @cached_property
+    def google_oauth(self) -> GoogleOAuthService:
+        from app.modules.auth.google_oauth_service import GoogleOAuthService
+
+        return GoogleOAuthService()
+
+    @cached_property
+    def profiles(self) -> ProfileCache:
+        from app.modules.auth.profile_cache import ProfileCache
+
+        return ProfileCache(
+            userinfo_ttl_seconds=settings.profile_cache_userinfo_ttl_seconds,
+            calendar_list_ttl_seconds=settings.calendar_list_ttl_seconds,
+            max_users=settings.profile_cache_max_users,
+        )
+
+    # ---- calendar ----
+
+    @cached_property
+    def calendar_service(self) -> GoogleCalendarService:
+        from app.modules.calendar.google_calendar_service import GoogleCalendarService
+
+        return GoogleCalendarService()
+
+    @cached_property
+    def event_cache(self) -> Optional[EventCache]:
+        if settings.event_cache_ttl_seconds <= 0:
+            return None
+        from app.modules.calendar.event_cache import EventCache
+
+        return EventCache(
+            ttl_seconds=settings.event_cache_ttl_seconds,
+            watched_ttl_seconds=settings.event_cache_watched_ttl_seconds,
+        )
+
+    @cached_property
+    def watch_manager(self) -> Optional[CalendarWatchManager]:
+        if not settings.calendar_webhook_url or self.event_cache is None:
+            return None
+        from app.modules.calendar.watch_manager import CalendarWatchManager
+
+        return CalendarWatchManager(
+            service=self.calendar_service,
+            event_cache=self.event_cache,
+            webhook_url=settings.calendar_webhook_url,
+            channel_ttl_seconds=settings.calendar_watch_ttl_seconds,
+            renew_before_seconds=settings.calendar_watch_renew_before_seconds,
+            signing_key=settings.secret_key,
+        )
+
+    # ---- agent ----
+
+    @cached_property
+    def memory(self) -> ConversationMemory:
+        from app.modules.ai.memory import ConversationMemory
+
+        if not settings.conversation_store_path:
+            return ConversationMemory()
+        from app.modules.ai.memory_store import ConversationLog
+
+        return ConversationMemory(log=ConversationLog(
+            settings.conversation_store_path,
+            flush_interval_ms=settings.conversation_flush_interval_ms,
+            snapshot_growth=settings.conversation_snapshot_growth,
+            snapshot_min_bytes=settings.conversation_snapshot_min_bytes,
+            fsync=settings.conversation_fsync,
+        ))
+
+    @cached_property
+    def summarizer(self) -> Optional[ConversationSummarizer]:
+        if not settings.conversation_summary_enabled:
+            return None
+        from openai import OpenAI
+
+        from app.modules.ai.summarizer import ConversationSummarizer
+
+        # runs in the background outside any turn, so it uses its own plain client
+        return ConversationSummarizer(
+            client=OpenAI(api_key=settings.openai_api_key),
+            memory=self.memory,
+            model=settings.openai_fast_model or settings.openai_model,
+            window=settings.conversation_history_limit,
+            min_batch=settings.conversation_summary_min_batch,
+            max_chars=settings.conversation_summary_max_chars,
+        )
+
+    @cached_property
+    def job_queue(self) -> JobQueue:
+        from app.shared.jobs import JobQueue, JobStore, JsonFileJobStore
+
+        retention = settings.job_retention_seconds
+        return JobQueue(
+            store=(
+                JsonFileJobStore(settings.job_store_path, retention)
+                if settings.job_store_path else JobStore(retention)
+            ),
+            max_size=settings.job_queue_max_size,
+            workers=settings.job_workers,
+            progress_save_interval=settings.job_progress_save_interval_seconds,
+        )
+
+    @cached_property
+    def create_dedupe(self) -> Optional[IdempotencyStore]:
+        if settings.create_dedupe_ttl_seconds <= 0:
+            return None
+        from app.shared.idempotency import IdempotencyStore
+
+        return IdempotencyStore(ttl_seconds=settings.create_dedupe_ttl_seconds)
+
+    @cached_property
+    def recorder(self) -> Optional[TurnRecorder]:
+        if not settings.agent_record_path:
+            return None
+        from app.modules.ai.recording import TurnRecorder
+
+        return TurnRecorder(settings.agent_record_path)
+
+    @cached_property
+    def agent(self) -> CalendarAgent:
+        from openai import AsyncOpenAI
+
+        from app.modules.ai.calendar_agent import CalendarAgent
+
+        # async, so a turn cancelled by a client disconnect also aborts its completion
+        client = AsyncOpenAI(api_key=settings.openai_api_key)
+        service = self.calendar_service
+        stores = {
+            "event_cache": self.event_cache,
+            "create_dedupe": self.create_dedupe,
+            "profiles": self.profiles,
+        }
+        if self.recorder is not None:
+            from app.modules.ai.recording import (
+                STORE_READS,
+                RecordingCalendarService,
+                RecordingOpenAIClient,
+                RecordingStore,
+            )
+
+            client = RecordingOpenAIClient(client)
+            service = RecordingCalendarService(service)
+            stores = {
+                name: RecordingStore(store, name, STORE_READS[name]) if store is not None else None
+                for name, store in stores.items()
+            }
+
+        return CalendarAgent(
+            client=client,
+            service=service,
+            memory=self.memory,
+            watch_manager=self.watch_manager,
+            summarizer=self.summarizer,
+            job_queue=self.job_queue,
+            **stores,
+        )
+
+    @cached_property
+    def chat_sockets(self) -> ConnectionLimiter:
+        from app.modules.ai.chat_socket import ConnectionLimiter
+
+        return ConnectionLimiter(
+            max_total=settings.ws_max_connections,
+            max_per_user=settings.ws_max_connections_per_user,
+        )
+
+    # ---- process ----
+
+    @cached_property
+    def loop_watchdog(self) -> EventLoopWatchdog:
+        from app.shared.loop_watchdog import EventLoopWatchdog
+
+        return EventLoopWatchdog(
+            interval_ms=settings.loop_watchdog_interval_ms,
+            threshold_ms=settings.loop_watchdog_threshold_ms,
+        )
+
+    def _built(self, name: str) -> bool:
+        return name in self.__dict__
+
+    async def start(self) -> None:
+        """Lifespan startup: only what has to run before the first request."""
+        if settings.loop_watchdog_enabled:
+            self.loop_watchdog.start()
+        if settings.conversation_store_path:
+            # recover stored conversations now rather than on the first message
+            self.memory
+        if settings.job_store_path:
+            # recovered jobs need their handlers, which the agent registers
+            self.agent
+        await self.job_queue.start()
+
+    async def stop(self) -> None:
+        """Lifespan shutdown, for whatever was built."""
+        if self._built("job_queue"):
+            await self.job_queue.stop()
+        if self._built("memory"):
+            self.memory.close()
+        if self._built("loop_watchdog"):
+            await self.loop_watchdog.stop()
@@ -0,0 +1,109 @@
+"""
+RFC3339 parsing/formatting and time zone helpers shared by the agent and
+the calendar modules.
+
+- Zone lookups are cached; unknown names fall back instead of raising.
+- Naive timestamps are localized to the zone the caller knows applies
+  (usually the user's), not silently treated as UTC.
+- Google's all-day values ({"date": "2025-12-04"}) become midnight in the
+  given zone.
+
+Parsed strings are memoized: the same event timestamps are parsed again on
+every cache lookup, merge and ranking pass, and datetimes are immutable.
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime, time, timezone, tzinfo
+from functools import lru_cache
+from typing import Any, Dict, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+
+UTC = timezone.utc
+
+
+@lru_cache(maxsize=512)
+def _load_zone(name: str) -> Optional[tzinfo]:
+    if name.upper() in ("UTC", "Z", "ETC/UTC"):
+        return UTC
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return None
+
+
+def is_valid_zone(name: Optional[str]) -> bool:
+    """True if `name` is a known IANA time zone."""
+    return bool(name) and _load_zone(name) is not None
+
+
+def get_zone(name: Optional[str], default: tzinfo = UTC) -> tzinfo:
+    """Cached zone lookup; returns `default` for empty or unknown names."""
+    if not name:
+        return default
+    return _load_zone(name) or default
+
+
+@lru_cache(maxsize=8192)
+def _parse(value: str) -> datetime:
+    if value.endswith(("Z", "z")):
+        value = value[:-1] + "+00:00"
+    return datetime.fromisoformat(value)
+
+
+def parse_rfc3339(value: str, zone: Optional[tzinfo] = None) -> datetime:
+    """
+    Parse an RFC3339 / ISO-8601 timestamp into an aware datetime.
+    A value without an offset is taken to be local time in `zone` (UTC if None).
+
+    Raises:
+        ValueError: the value is not a valid timestamp.
+    """
+    dt = _parse(value)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=zone or UTC)
+    return dt
+
+
+@lru_cache(maxsize=4096)
+def _parse_date(value: str) -> date:
+    return date.fromisoformat(value)
+
+
+def parse_event_time(value: Dict[str, Any], zone: Optional[tzinfo] = None) -> Optional[datetime]:
+    """
+    Aware datetime for a Google event "start"/"end" object.
+
+    Timed values without an offset use the event's own "timeZone" when it has
+    one, otherwise `zone`. All-day values become midnight in `zone`.
+    Returns None when the object has neither "dateTime" nor "date".
+    """
+    if not value:
+        return None
+    if "dateTime" in value:
+        dt = _parse(value["dateTime"])
+        if dt.tzinfo is None:
+            event_zone = value.get("timeZone")
+            dt = dt.replace(tzinfo=get_zone(event_zone, zone or UTC) if event_zone else zone or UTC)
+        return dt
+    if "date" in value:
+        return datetime.combine(_parse_date(value["date"]), time(0, 0), tzinfo=zone or UTC)
+    return None
+
+
+def is_all_day(value: Dict[str, Any]) -> bool:
+    return bool(value) and "date" in value and "dateTime" not in value
+
+
+def format_rfc3339(dt: datetime, zone: Optional[tzinfo] = None) -> str:
+    """
+    UTC RFC3339 string ("...Z") as Google expects in query parameters.
+    A naive `dt` is taken to be local time in `zone` (UTC if None).
+    """
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=zone or UTC)
+    if dt.tzinfo is not UTC:
+        dt = dt.astimezone(UTC)
+    # isoformat() of a UTC datetime always ends in "+00:00"
+    return dt.isoformat()[:-6] + "Z"
@@ -0,0 +1,51 @@
+"""
+Cancel request work when the HTTP client goes away.
+
+Starlette keeps running a handler after the browser closes the connection.
+run_until_disconnected runs the work as a task and polls for the disconnect
+message, cancelling the task (and with it any awaited OpenAI/Google call) as
+soon as it arrives.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Awaitable, Optional, TypeVar
+
+from starlette.requests import Request
+
+from app.shared.metrics import metrics
+
+
+T = TypeVar("T")
+
+DISCONNECT_POLL_SECONDS = 0.25
+
+client_disconnects = metrics.counter(
+    "http_client_disconnects_total", "Requests whose work was cancelled because the client left."
+)
+
+
+async def run_until_disconnected(request: Request, work: Awaitable[T]) -> Optional[T]:
+    """
+    Result of `work`, or None if the client disconnected first (the work is
+    cancelled and awaited before returning).
+    """
+    task = asyncio.ensure_future(work)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_SECONDS)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                client_disconnects.inc()
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+                return None
+    finally:
+        # the handler itself was cancelled (server shutdown)
+        if not task.done():
+            task.cancel()
@@ -0,0 +1,70 @@
+"""
+Idempotent execution of side-effecting operations, keyed by the caller.
+
+A second call with the same key while the first is still running waits for
+it; a call within `ttl_seconds` after it succeeded gets the stored result.
+Either way the operation runs once. Operations run as their own task, so a
+caller that is cancelled (client timeout) doesn't abort the write, and the
+retry that follows picks up its result.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple, TypeVar
+
+
+T = TypeVar("T")
+
+
+class IdempotencyStore:
+    """In-memory results of recent operations, by key."""
+
+    def __init__(self, ttl_seconds: float = 600.0, max_entries: int = 10_000) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._done: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._running: Dict[Hashable, "asyncio.Task[Any]"] = {}
+
+    async def run(
+        self,
+        key: Hashable,
+        operation: Callable[[], Awaitable[T]],
+        keep: Callable[[T], bool] = bool,
+    ) -> Tuple[T, bool]:
+        """
+        Run `operation` once per key. Returns (result, replayed), where
+        replayed is True if the result came from an earlier call. Only
+        results for which `keep(result)` is true are remembered.
+        """
+        entry = self._done.get(key)
+        if entry is not None:
+            if time.monotonic() - entry[0] < self.ttl_seconds:
+                return entry[1], True
+            del self._done[key]
+
+        task = self._running.get(key)
+        if task is not None:
+            return await asyncio.shield(task), True
+
+        task = asyncio.ensure_future(operation())
+        self._running[key] = task
+        task.add_done_callback(lambda t: self._finish(key, t, keep))
+        return await asyncio.shield(task), False
+
+    def _finish(self, key: Hashable, task: "asyncio.Task[Any]", keep: Callable[[Any], bool]) -> None:
+        self._running.pop(key, None)
+        if task.cancelled() or task.exception() is not None or not keep(task.result()):
+            return
+        self._done[key] = (time.monotonic(), task.result())
+        while len(self._done) > self.max_entries:
+            self._done.popitem(last=False)
+
+    def forget(self, match: Callable[[Any], bool]) -> int:
+        """Drop stored results for which match(result) is true; returns how many."""
+        keys = [key for key, (_, result) in self._done.items() if match(result)]
+        for key in keys:
+            del self._done[key]
+        return len(keys)
@@ -0,0 +1,326 @@
+"""
+In-process background jobs for slow or bulk operations.
+
+A bounded asyncio.Queue feeds a small pool of worker tasks. Every state change
+goes through a JobStore; with JsonFileJobStore configured, jobs that were
+queued or running when the process stopped are loaded again on start.
+
+Google access tokens are never persisted. A recovered job waits ("parked")
+until its user makes another authenticated request, which hands the queue a
+fresh token via `resume(user_id, access_token)`. Handlers keep their own
+checkpoint in `job.result`, so a resumed job skips the work it already did.
+Progress reports reach watchers at once but are written to the store at most
+once per `progress_save_interval`, so a restart may redo that much work.
+Finished jobs are dropped from the store `retention_seconds` after they end.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from app.shared.metrics import metrics
+
+
+logger = logging.getLogger(__name__)
+
+jobs_submitted = metrics.counter("jobs_submitted_total", "Background jobs accepted.")
+jobs_rejected = metrics.counter(
+    "jobs_rejected_total", "Background jobs refused because the queue was full."
+)
+jobs_succeeded = metrics.counter("jobs_succeeded_total", "Background jobs that finished.")
+jobs_failed = metrics.counter("jobs_failed_total", "Background jobs that raised.")
+job_duration_ms = metrics.histogram(
+    "job_duration_ms",
+    "Run time of background jobs.",
+    buckets=(100, 500, 1000, 5000, 15000, 60000, 300000),
+)
+
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+FINISHED = (SUCCEEDED, FAILED)
+
+
+class JobQueueFull(Exception):
+    """Raised by JobQueue.submit when no more jobs can be accepted."""
+
+
+@dataclass
+class Job:
+    id: str
+    user_id: str
+    kind: str
+    payload: Dict[str, Any]
+    status: str = QUEUED
+    done: int = 0
+    total: int = 0
+    result: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+# ---- persistence ----
+
+class JobStore:
+    """Keeps jobs in memory only; nothing survives a restart."""
+
+    def __init__(self, retention_seconds: float = 24 * 3600.0) -> None:
+        self.retention_seconds = retention_seconds
+        self._jobs: Dict[str, Job] = {}
+
+    def save(self, job: Job) -> None:
+        self._jobs[job.id] = job
+        self._prune()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def unfinished(self) -> List[Job]:
+        return [job for job in self._jobs.values() if not job.finished]
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.retention_seconds
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished and job.updated_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+class JsonFileJobStore(JobStore):
+    """
+    Writes every job to one JSON file (temp file + rename on each save).
+    Meant for the small number of jobs a single instance runs.
+
+    Saves run in worker threads; the lock keeps them from interleaving, so the
+    file never goes back to an older set of jobs.
+    """
+
+    def __init__(self, path: str, retention_seconds: float = 24 * 3600.0) -> None:
+        super().__init__(retention_seconds)
+        self.path = path
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for raw in json.load(f):
+                    job = Job(**raw)
+                    self._jobs[job.id] = job
+            self._prune()
+
+    def save(self, job: Job) -> None:
+        with self._lock:
+            super().save(job)
+            jobs = [j.to_dict() for j in list(self._jobs.values())]
+            tmp_path = f"{self.path}.{uuid.uuid4().hex}.tmp"
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(jobs, f, ensure_ascii=False)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+
+# ---- queue ----
+
+class JobContext:
+    """What a handler gets: the job, a token for Google, and progress reporting."""
+
+    def __init__(self, queue: "JobQueue", job: Job, access_token: str) -> None:
+        self._queue = queue
+        self.job = job
+        self.access_token = access_token
+        self._saved_at = time.monotonic()
+
+    async def report(self, done: int, total: Optional[int] = None) -> None:
+        self.job.done = done
+        if total is not None:
+            self.job.total = total
+        if time.monotonic() - self._saved_at < self._queue.progress_save_interval:
+            # watchers see every step; the store only every interval
+            self.job.updated_at = time.time()
+            await self._queue._notify(self.job)
+            return
+        self._saved_at = time.monotonic()
+        await self._queue._save(self.job)
+
+
+JobHandler = Callable[[JobContext], Awaitable[None]]
+
+
+class JobQueue:
+    """Bounded queue of background jobs with a fixed worker pool."""
+
+    def __init__(
+        self,
+        store: Optional[JobStore] = None,
+        max_size: int = 100,
+        workers: int = 2,
+        progress_save_interval: float = 1.0,
+    ) -> None:
+        self.store = store or JobStore()
+        self.max_size = max_size
+        self.workers = workers
+        self.progress_save_interval = progress_save_interval
+
+        self._handlers: Dict[str, JobHandler] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tokens: Dict[str, str] = {}  # job_id -> access token, memory only
+        self._parked: Dict[str, List[str]] = {}  # user_id -> job ids waiting for a token
+        self._workers: List[asyncio.Task] = []
+        self._changed: Dict[str, asyncio.Condition] = {}
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        self._handlers[kind] = handler
+
+    # ---- lifecycle ----
+
+    async def start(self) -> None:
+        if self._workers:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        for job in self.store.unfinished():
+            # no token survived the restart: wait for the user's next request
+            job.status = QUEUED
+            self._parked.setdefault(job.user_id, []).append(job.id)
+        self._workers = [
+            asyncio.get_running_loop().create_task(self._work())
+            for _ in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    # ---- submission ----
+
+    async def submit(
+        self,
+        user_id: str,
+        kind: str,
+        payload: Dict[str, Any],
+        access_token: str,
+    ) -> Job:
+        """
+        Queue a job and return it immediately.
+
+        Raises:
+            JobQueueFull: the queue is at capacity (or not started).
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        if self._queue is None or self._queue.full():
+            jobs_rejected.inc()
+            raise JobQueueFull(f"Job queue is full ({self.max_size} jobs)")
+
+        job = Job(id=str(uuid.uuid4()), user_id=user_id, kind=kind, payload=payload)
+        await self._save(job)
+        self._tokens[job.id] = access_token
+        self._queue.put_nowait(job.id)
+        jobs_submitted.inc()
+        return job
+
+    def resume(self, user_id: str, access_token: str) -> None:
+        """Re-queue this user's recovered jobs now that a fresh token is available."""
+        parked = self._parked.get(user_id)
+        if not parked or self._queue is None:
+            return
+        while parked and not self._queue.full():
+            job_id = parked.pop(0)
+            self._tokens[job_id] = access_token
+            self._queue.put_nowait(job_id)
+        if not parked:
+            del self._parked[user_id]
+
+    # ---- status ----
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.store.get(job_id)
+
+    async def watch(self, job_id: str) -> AsyncIterator[Job]:
+        """Yield the job after every change until it finishes."""
+        condition = self._changed.setdefault(job_id, asyncio.Condition())
+        while True:
+            job = self.store.get(job_id)
+            if job is None:
+                return
+            seen = (job.status, job.done, job.updated_at)
+            yield job
+            if job.finished:
+                return
+            async with condition:
+                # the job may have changed while the consumer handled the last yield
+                await condition.wait_for(
+                    lambda: (job.status, job.done, job.updated_at) != seen
+                )
+
+    # ---- internals ----
+
+    async def _save(self, job: Job) -> None:
+        job.updated_at = time.time()
+        await asyncio.to_thread(self.store.save, job)
+        await self._notify(job)
+
+    async def _notify(self, job: Job) -> None:
+        condition = self._changed.get(job.id)
+        if condition is not None:
+            async with condition:
+                condition.notify_all()
+            if job.finished:
+                self._changed.pop(job.id, None)
+
+    async def _work(self) -> None:
+        assert self._queue is not None
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str) -> None:
+        job = self.store.get(job_id)
+        access_token = self._tokens.pop(job_id, None)
+        if job is None or job.finished or access_token is None:
+            return
+
+        started = time.perf_counter()
+        job.status = RUNNING
+        await self._save(job)
+        try:
+            await self._handlers[job.kind](JobContext(self, job, access_token))
+        except asyncio.CancelledError:
+            # shutting down: leave it "running" so the next start picks it up
+            raise
+        except Exception as exc:
+            logger.exception("Job %s (%s) failed", job.id, job.kind)
+            job.status = FAILED
+            job.error = str(exc) or type(exc).__name__
+            jobs_failed.inc()
+        else:
+            job.status = SUCCEEDED
+            jobs_succeeded.inc()
+        job_duration_ms.observe((time.perf_counter() - started) * 1000.0)
+        await self._save(job)
@@ -0,0 +1,143 @@
+"""
+Event-loop lag watchdog.
+
+A tiny asyncio task sleeps for a fixed interval and records how late it was
+woken up (scheduling lag) into a histogram. A daemon thread watches the
+task's heartbeat: when the loop has not ticked for longer than the threshold,
+something is blocking it, so the thread samples the loop thread's stack and
+logs it together with the task that is currently running.
+
+Cost is one wake-up per interval on the loop plus one on the thread.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from typing import Optional
+
+from app.shared.metrics import metrics
+
+
+logger = logging.getLogger(__name__)
+
+LAG_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class EventLoopWatchdog:
+    """Measures event-loop lag and reports blocking calls."""
+
+    def __init__(
+        self,
+        interval_ms: float = 100.0,
+        threshold_ms: float = 250.0,
+        max_stack_depth: int = 30,
+    ) -> None:
+        self.interval = interval_ms / 1000.0
+        self.threshold = threshold_ms / 1000.0
+        self.max_stack_depth = max_stack_depth
+
+        self.lag_histogram = metrics.histogram(
+            "event_loop_lag_ms",
+            "Delay between scheduled and actual wake-up of the watchdog task.",
+            buckets=LAG_BUCKETS_MS,
+        )
+        self.stall_counter = metrics.counter(
+            "event_loop_stalls_total",
+            "Times the loop was blocked for longer than the threshold.",
+        )
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+        self._last_tick = time.monotonic()
+        self._tick_seq = 0
+        self._reported_seq = -1
+
+    # ---- lifecycle ----
+
+    def start(self) -> None:
+        """Start watching the running loop. Must be called from the loop thread."""
+        if self._task is not None:
+            return
+
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_tick = time.monotonic()
+        self._stop.clear()
+
+        self._task = self._loop.create_task(self._tick_loop())
+        self._thread = threading.Thread(
+            target=self._monitor, name="event-loop-watchdog", daemon=True
+        )
+        self._thread.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval * 2)
+            self._thread = None
+
+    # ---- loop side ----
+
+    async def _tick_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            scheduled = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - scheduled)
+
+            self.lag_histogram.observe(lag * 1000.0)
+            if lag > self.threshold:
+                self.stall_counter.inc()
+                logger.warning("Event loop lagged %.1f ms", lag * 1000.0)
+
+            self._last_tick = time.monotonic()
+            self._tick_seq += 1
+
+    # ---- monitor thread ----
+
+    def _monitor(self) -> None:
+        while not self._stop.wait(self.interval):
+            seq = self._tick_seq
+            blocked_for = time.monotonic() - self._last_tick - self.interval
+            if blocked_for > self.threshold and seq != self._reported_seq:
+                # report each stall once, while it is still happening
+                self._reported_seq = seq
+                self._report_stall(blocked_for)
+
+    def _report_stall(self, blocked_for: float) -> None:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return
+
+        stack = "".join(traceback.format_stack(frame, limit=self.max_stack_depth))
+
+        task_desc = "<unknown>"
+        try:
+            task = asyncio.current_task(self._loop)
+            if task is not None:
+                task_desc = f"{task.get_name()} {task.get_coro()!r}"
+        except RuntimeError:
+            pass
+
+        logger.warning(
+            "Event loop blocked for %.1f ms (task: %s)\n%s",
+            blocked_for * 1000.0,
+            task_desc,
+            stack,
+        )
@@ -2,13 +2,11 @@ from typing import Optional
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
 from starlette.responses import JSONResponse
-from app.modules.auth.auth_service import AuthService
 
 class AppAuthMiddleware(BaseHTTPMiddleware):
     def __init__(self, app, protected_prefixes=("/calendar",)):
         super().__init__(app)
         self.protected_prefixes = protected_prefixes
-        self.auth = AuthService()
 
     async def dispatch(self, request: Request, call_next):
         if request.method == "OPTIONS":
@@ -21,7 +19,7 @@ class AppAuthMiddleware(BaseHTTPMiddleware):
                 return JSONResponse({"detail": "Missing Authorization header"}, status_code=401)
 
             token = auth_header.split(" ", 1)[1].strip()
-            payload = self.auth.verify_token(token)
+            payload = request.app.state.services.auth.verify_token(token)
             if not payload:
                 return JSONResponse({"detail": "Invalid or expired token"}, status_code=401)
 
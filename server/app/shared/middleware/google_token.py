@@ -2,12 +2,10 @@ from typing import Optional
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
 from starlette.responses import JSONResponse
-from app.modules.auth.google_oauth_service import GoogleOAuthService
 
 class GoogleAccessTokenMiddleware(BaseHTTPMiddleware):
     def __init__(self, app, protected_prefixes=("/calendar",)):
         super().__init__(app)
-        self.oauth = GoogleOAuthService()
         self.protected_prefixes = protected_prefixes
 
     async def dispatch(self, request: Request, call_next):
@@ -20,7 +18,7 @@ class GoogleAccessTokenMiddleware(BaseHTTPMiddleware):
             if not rt:
                 return JSONResponse({"detail": "Missing refresh cookie"}, status_code=401)
 
-            tokens = await self.oauth.refresh_access_token(rt)
+            tokens = await request.app.state.services.google_oauth.refresh_access_token(rt)
             if not tokens or "access_token" not in tokens:
                 return JSONResponse({"detail": "Failed to refresh Google access token"}, status_code=401)
 
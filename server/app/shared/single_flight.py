@@ -0,0 +1,52 @@
+"""
+Coalescing of identical concurrent calls ("single flight").
+
+While a call for a key is in flight, further calls with the same key wait
+for it and get its result instead of starting their own. Nothing is kept
+after it finishes; longer-lived caching is left to the callers.
+
+The shared call runs as a task that is cancelled only when every caller
+waiting on it has been cancelled.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, TypeVar
+
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Per-key deduplication of in-flight coroutine calls."""
+
+    def __init__(self) -> None:
+        # key -> [task, number of callers waiting on it]
+        self._calls: Dict[Hashable, List[Any]] = {}
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """Result of func(), shared with concurrent calls for the same key."""
+        call = self._calls.get(key)
+        if call is None:
+            task = asyncio.ensure_future(func())
+            call = self._calls[key] = [task, 0]
+            task.add_done_callback(lambda _: self._forget(key, call))
+
+        call[1] += 1
+        try:
+            return await asyncio.shield(call[0])
+        except asyncio.CancelledError:
+            call[1] -= 1
+            if call[1] == 0:
+                # nobody wants the result any more; later callers start afresh
+                self._forget(key, call)
+                call[0].cancel()
+            raise
+
+    def _forget(self, key: Hashable, call: List[Any]) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._calls
@@ -0,0 +1,54 @@
+"""
+Benchmark for app.modules.calendar.availability on multi-month ranges.
+
+Run from the server directory:
+    python -m benchmarks.bench_availability
+"""
+
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from app.modules.calendar.availability import find_free_slots
+
+
+ZONE = ZoneInfo("Asia/Jerusalem")
+
+
+def synthetic_busy(days: int, per_day: int, calendars: int, rng: random.Random) -> list:
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    busy = []
+    for _ in range(calendars):
+        for _ in range(days * per_day):
+            start = base + timedelta(minutes=15 * rng.randint(0, days * 96))
+            busy.append((start, start + timedelta(minutes=rng.choice([30, 45, 60, 90, 120]))))
+    return busy
+
+
+def bench(days: int, per_day: int, calendars: int, repeats: int = 20) -> None:
+    rng = random.Random(days * per_day * calendars)
+    busy = synthetic_busy(days, per_day, calendars, rng)
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    end = start + timedelta(days=days)
+
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        find_free_slots(busy, start, end, timedelta(hours=1), ZONE, weekdays=[6, 0, 1, 2, 3])
+        timings.append((time.perf_counter() - started) * 1000)
+
+    print(
+        f"{days:4d} days x {calendars} calendars, {len(busy):6d} busy intervals: "
+        f"p50 {statistics.median(timings):7.2f} ms  max {max(timings):7.2f} ms"
+    )
+
+
+def main() -> None:
+    for days, per_day, calendars in ((7, 6, 1), (30, 6, 3), (90, 6, 3), (180, 8, 5)):
+        bench(days, per_day, calendars)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Cold-start cost of the server: import time, app startup and the first
+request that builds the agent. Each sample runs in a fresh interpreter.
+
+Run from the server directory (with the usual environment / .env):
+    python -m benchmarks.bench_cold_start
+"""
+
+import json
+import statistics
+import subprocess
+import sys
+
+
+SAMPLES = 5
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+
+from fastapi.testclient import TestClient
+application = app.main.create_app()
+with TestClient(application) as client:
+    ready = time.perf_counter()
+    openai_loaded = "openai" in sys.modules
+    client.get("/health")
+    first = time.perf_counter()
+    application.state.services.agent
+    agent = time.perf_counter()
+
+print(json.dumps({
+    "import app.main": (imported - started) * 1000,
+    "create_app + lifespan": (ready - imported) * 1000,
+    "first request": (first - ready) * 1000,
+    "build agent (lazy)": (agent - first) * 1000,
+    "openai imported before the agent": openai_loaded,
+}))
+"""
+
+
+def sample() -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE], capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main() -> None:
+    runs = [sample() for _ in range(SAMPLES)]
+    print(f"median of {SAMPLES} fresh interpreters")
+    for phase, value in runs[0].items():
+        if isinstance(value, bool):
+            print(f"  {phase}: {value}")
+            continue
+        values = [run[phase] for run in runs]
+        print(f"  {phase:24s} {statistics.median(values):8.1f} ms  (min {min(values):.1f})")
+
+
+if __name__ == "__main__":
+    main()
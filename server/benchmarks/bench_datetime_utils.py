@@ -0,0 +1,115 @@
+"""
+Benchmark for app.shared.datetime_utils against the helpers it replaced.
+
+The corpus mimics what the agent handles: a few thousand distinct event
+timestamps, each parsed many times (cache lookups, merges, ranking).
+
+Run from the server directory:
+    python -m benchmarks.bench_datetime_utils
+"""
+
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from app.shared.datetime_utils import format_rfc3339, get_zone, parse_event_time, parse_rfc3339
+
+
+ZONES = ["Asia/Jerusalem", "Europe/London", "America/New_York", "UTC"]
+
+
+# ---- previous implementations ----
+
+def legacy_parse_rfc3339(value: str) -> datetime:
+    if value.endswith("Z"):
+        value = value.replace("Z", "+00:00")
+    dt = datetime.fromisoformat(value)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
+def legacy_rfc3339(dt: datetime) -> str:
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def legacy_zone(name: str):
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return timezone.utc
+
+
+def legacy_event_time(value: dict, zone):
+    if "dateTime" in value:
+        dt = datetime.fromisoformat(value["dateTime"].replace("Z", "+00:00"))
+        return dt if dt.tzinfo else dt.replace(tzinfo=zone)
+    if "date" in value:
+        return datetime.fromisoformat(value["date"]).replace(tzinfo=zone)
+    return None
+
+
+# ---- corpus ----
+
+def corpus(distinct: int, total: int, rng: random.Random) -> tuple:
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    stamps = []
+    for i in range(distinct):
+        dt = base + timedelta(minutes=15 * rng.randint(0, 365 * 96))
+        kind = i % 3
+        if kind == 0:
+            stamps.append(dt.isoformat().replace("+00:00", "Z"))
+        elif kind == 1:
+            stamps.append(dt.astimezone(ZoneInfo("Asia/Jerusalem")).isoformat())
+        else:
+            stamps.append(dt.replace(tzinfo=None).isoformat())
+    values = [rng.choice(stamps) for _ in range(total)]
+    event_values = [
+        {"date": v[:10]} if i % 10 == 0 else {"dateTime": v}
+        for i, v in enumerate(values)
+    ]
+    datetimes = [legacy_parse_rfc3339(v) for v in values[: total // 4]]
+    zone_names = [rng.choice(ZONES) for _ in range(total)]
+    return values, event_values, datetimes, zone_names
+
+
+def timed(label: str, func, items) -> float:
+    started = time.perf_counter()
+    for item in items:
+        func(item)
+    elapsed = time.perf_counter() - started
+    print(f"  {label:28s} {elapsed * 1e3:8.1f} ms  ({elapsed / len(items) * 1e9:6.0f} ns/op)")
+    return elapsed
+
+
+def main() -> None:
+    rng = random.Random(7)
+    values, event_values, datetimes, zone_names = corpus(5_000, 200_000, rng)
+    zone = ZoneInfo("Asia/Jerusalem")
+
+    print(f"parse ({len(values)} timestamps, 5000 distinct)")
+    old = timed("legacy _parse_rfc3339", legacy_parse_rfc3339, values)
+    new = timed("parse_rfc3339", lambda v: parse_rfc3339(v, zone), values)
+    print(f"  speedup x{old / new:.1f}")
+
+    print(f"event start/end objects ({len(event_values)})")
+    old = timed("legacy per-module parsing", lambda v: legacy_event_time(v, zone), event_values)
+    new = timed("parse_event_time", lambda v: parse_event_time(v, zone), event_values)
+    print(f"  speedup x{old / new:.1f}")
+
+    print(f"format ({len(datetimes)} datetimes)")
+    old = timed("legacy _rfc3339", legacy_rfc3339, datetimes)
+    new = timed("format_rfc3339", format_rfc3339, datetimes)
+    print(f"  speedup x{old / new:.1f}")
+
+    print(f"zone lookup ({len(zone_names)} names)")
+    old = timed("ZoneInfo() + except", legacy_zone, zone_names)
+    new = timed("get_zone", get_zone, zone_names)
+    print(f"  speedup x{old / new:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark for app.modules.ai.event_matcher on synthetic calendars.
+
+Run from the server directory:
+    python -m benchmarks.bench_event_matcher
+"""
+
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+from app.modules.ai.event_matcher import select_events, tokenize
+
+
+WORDS_EN = [
+    "meeting", "sync", "standup", "review", "lunch", "call", "interview",
+    "planning", "retro", "demo", "dentist", "gym", "John", "Sarah", "Dana",
+    "budget", "design", "1:1", "project", "client",
+]
+WORDS_HE = [
+    "פגישה", "הפגישה", "ישיבת", "צוות", "ארוחת", "צהריים", "רופא", "שיניים",
+    "דני", "מיכל", "תכנון", "סקירה", "לקוח", "שיחה", "חדר", "כושר",
+]
+QUERIES = [
+    "meeting with John",
+    "design review",
+    "הפגישה עם דני",
+    "ארוחת צהריים",
+    "dentist",
+]
+
+
+def synthetic_calendar(n: int, rng: random.Random) -> list:
+    base = datetime(2026, 1, 1, 8, tzinfo=timezone.utc)
+    events = []
+    for i in range(n):
+        words = WORDS_HE if rng.random() < 0.4 else WORDS_EN
+        summary = " ".join(rng.sample(words, rng.randint(1, 4)))
+        start = base + timedelta(minutes=30 * rng.randint(0, 7 * 24))
+        events.append({
+            "id": f"evt{i}",
+            "summary": summary,
+            "start": {"dateTime": start.isoformat()},
+            "end": {"dateTime": (start + timedelta(hours=1)).isoformat()},
+        })
+    return events
+
+
+def bench(n_events: int, repeats: int = 200) -> None:
+    rng = random.Random(n_events)
+    calendars = [synthetic_calendar(n_events, rng) for _ in range(10)]
+    hint = datetime(2026, 1, 3, 10, tzinfo=timezone.utc)
+
+    timings = []
+    for r in range(repeats):
+        events = calendars[r % len(calendars)]
+        query = QUERIES[r % len(QUERIES)]
+        started = time.perf_counter()
+        select_events(events, query, hint if r % 2 else None)
+        timings.append((time.perf_counter() - started) * 1e6)
+
+    timings.sort()
+    p50 = statistics.median(timings)
+    p99 = timings[int(len(timings) * 0.99) - 1]
+    print(
+        f"{n_events:6d} events/set: p50 {p50:9.1f} us  p99 {p99:9.1f} us  "
+        f"({p50 / n_events:6.2f} us/event)"
+    )
+
+
+def main() -> None:
+    # cold caches first, then steady state
+    tokenize.cache_clear()
+    for n in (10, 50, 200, 1000, 5000):
+        bench(n)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Tail latency of get_events with and without hedged requests.
+
+Google is replaced by a local stub transport: most responses take ~30-60 ms,
+a few percent stall for 800 ms (the slow-replica case hedging targets).
+
+Run from the server directory:
+    python -m benchmarks.bench_hedging
+"""
+
+import asyncio
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+import httpx
+
+from app.modules.calendar.google_calendar_service import GoogleCalendarService
+from app.modules.calendar.hedging import HedgePolicy
+
+
+REQUESTS = 1_000
+CONCURRENCY = 20
+SLOW_SHARE = 0.03
+SLOW_MS = 800
+
+
+class StubTransport(httpx.AsyncBaseTransport):
+    """Answers every request with an empty event list after a random delay."""
+
+    def __init__(self, seed: int) -> None:
+        self.rng = random.Random(seed)
+        self.requests = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        if self.rng.random() < SLOW_SHARE:
+            latency_ms = SLOW_MS
+        else:
+            latency_ms = self.rng.uniform(30, 60)
+        await asyncio.sleep(latency_ms / 1000.0)
+        return httpx.Response(200, json={"items": []}, request=request)
+
+
+async def run(label: str, hedging) -> None:
+    transport = StubTransport(seed=7)
+    service = GoogleCalendarService(hedging=hedging, transport=transport)
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    timings = []
+
+    async def one(i: int) -> None:
+        # distinct windows, so single-flight coalescing doesn't kick in
+        start = base + timedelta(minutes=i)
+        async with semaphore:
+            started = time.perf_counter()
+            await service.get_events("token", "primary", start, start + timedelta(days=1))
+            timings.append((time.perf_counter() - started) * 1000.0)
+
+    await asyncio.gather(*(one(i) for i in range(REQUESTS)))
+    timings.sort()
+    p50 = statistics.median(timings)
+    p99 = timings[int(len(timings) * 0.99) - 1]
+    extra = transport.requests - REQUESTS
+    print(
+        f"  {label:18s} p50 {p50:6.1f} ms  p99 {p99:6.1f} ms  max {timings[-1]:6.1f} ms  "
+        f"extra requests {extra} ({extra / REQUESTS:.1%})"
+    )
+
+
+async def main() -> None:
+    print(f"{REQUESTS} get_events, {SLOW_SHARE:.0%} stall for {SLOW_MS} ms, concurrency {CONCURRENCY}")
+    await run("no hedging", None)
+    await run("hedged p95 / 5%", HedgePolicy(percentile=95.0, budget=0.05))
+    await run("hedged p90 / 10%", HedgePolicy(percentile=90.0, budget=0.10))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,129 @@
+"""
+ConversationMemory with the on-disk log (memory_store.py) at 100k
+conversations: cost on the write path, recovery time from logs alone and from
+a snapshot, and write amplification for a few snapshot growth ratios once
+the store has stopped growing.
+
+Each conversation has three turns (six messages), one event reference and,
+for every tenth one, a summary. That is about 810k log records.
+
+Run from the server directory:
+    python -m benchmarks.bench_memory_store
+"""
+
+import shutil
+import tempfile
+import time
+
+from app.modules.ai.memory import ConversationMemory
+from app.modules.ai.memory_store import ConversationLog, _gc_paused, log_bytes, snapshot_bytes, snapshot_ms
+
+
+CONVERSATIONS = 100_000
+USERS = 20_000
+TURNS = 3
+SNAPSHOT_GROWTHS = (0.5, 1.0, 2.0)
+CHURN_MESSAGES = 2_000_000
+# the write-amplification runs flush inline; this loop writes far faster than
+# a server does and would otherwise starve the flusher thread into huge batches
+FLUSH_EVERY = 1_000
+NEVER = 10**12
+
+
+def populate(memory: ConversationMemory) -> float:
+    """Fill the memory; returns microseconds per write call."""
+    calls = 0
+    started = time.perf_counter()
+    for i in range(CONVERSATIONS):
+        user_id = f"user-{i % USERS}"
+        conversation_id = memory.start_conversation(user_id)
+        for turn in range(TURNS):
+            memory.add_message(user_id, conversation_id, "user", f"what do I have on day {turn} of week {i}?")
+            memory.add_message(user_id, conversation_id, "assistant", f"You have 2 events on day {turn}: standup and review.")
+        memory.remember_events(user_id, conversation_id, [{
+            "event_id": f"evt{i}", "calendar_id": "primary", "summary": "Standup",
+            "start": "2026-01-05T09:00:00+02:00", "end": "2026-01-05T09:15:00+02:00",
+        }])
+        calls += 2 + 2 * TURNS
+        if i % 10 == 0:
+            memory.set_summary(user_id, conversation_id, "User asked about their week.", 2)
+            calls += 1
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+def populate_existing(memory: ConversationMemory, conversations: list, messages: int) -> None:
+    for n in range(messages):
+        user_id, conversation_id = conversations[n % len(conversations)]
+        memory.add_message(user_id, conversation_id, "user", f"message {n} about next week's planning")
+        if n % FLUSH_EVERY == 0:
+            memory._log.flush()
+
+
+def recover(directory: str) -> tuple:
+    memory = ConversationMemory()
+    stats = ConversationLog(directory).recover(memory)
+    return stats, memory
+
+
+def main() -> None:
+    baseline = populate(ConversationMemory())
+    print(f"{CONVERSATIONS:,} conversations, {USERS:,} users")
+    print(f"  dict only            {baseline:6.2f} us/write")
+
+    directory = tempfile.mkdtemp(prefix="bench-memory-")
+    try:
+        # ---- logs only ----
+        before = log_bytes.value
+        memory = ConversationMemory(log=ConversationLog(directory, snapshot_min_bytes=NEVER))
+        logged = populate(memory)
+        memory.close()
+        appended = log_bytes.value - before
+        print(f"  with log             {logged:6.2f} us/write  ({appended / 1e6:.1f} MB appended)")
+
+        stats, recovered = recover(directory)
+        print(f"  recover from log     {stats['seconds']:6.2f} s  "
+              f"({int(stats['records']):,} records)")
+
+        # what a compaction does while holding the memory lock
+        export_started = time.perf_counter()
+        with recovered._lock, _gc_paused():
+            ConversationLog._export(recovered)
+        pause_ms = (time.perf_counter() - export_started) * 1000.0
+        print(f"  snapshot copy pause  {pause_ms:6.1f} ms  (memory lock held)")
+        del recovered
+
+        # ---- compact (a snapshot is due on every flush), then recover from the snapshot ----
+        ConversationMemory(log=ConversationLog(directory, snapshot_growth=0, snapshot_min_bytes=0)).close()
+        stats, _ = recover(directory)
+        print(f"  recover from snapshot {stats['seconds']:5.2f} s  "
+              f"({int(stats['conversations']):,} conversations)")
+    finally:
+        shutil.rmtree(directory)
+
+    # ---- write amplification, once the store has stopped growing ----
+    print(f"write amplification over {CHURN_MESSAGES:,} more messages (all bytes written / log bytes)")
+    for growth in SNAPSHOT_GROWTHS:
+        directory = tempfile.mkdtemp(prefix="bench-memory-")
+        try:
+            # six messages per conversation are already the cap, so each new one replaces one
+            memory = ConversationMemory(max_messages_per_conversation=2 * TURNS, log=ConversationLog(
+                directory, flush_interval_ms=3_600_000, snapshot_growth=growth,
+                snapshot_min_bytes=1024 * 1024,
+            ))
+            conversations = [(f"user-{i % USERS}", memory.start_conversation(f"user-{i % USERS}"))
+                             for i in range(CONVERSATIONS)]
+            populate_existing(memory, conversations, 2 * TURNS * CONVERSATIONS)
+
+            logged_before, snap_before = log_bytes.value, snapshot_bytes.value
+            snapshots_before = snapshot_ms.count
+            populate_existing(memory, conversations, CHURN_MESSAGES)
+            memory.close()
+            logged = log_bytes.value - logged_before
+            snapshotted = snapshot_bytes.value - snap_before
+            print(f"  snapshot at log = {growth:.1f}x snapshot   {(logged + snapshotted) / logged:5.2f}x"
+                  f"  ({snapshot_ms.count - snapshots_before} snapshots, steady state {1 + 1 / growth:.2f}x)")
+        finally:
+            shutil.rmtree(directory)
+
+if __name__ == "__main__":
+    main()
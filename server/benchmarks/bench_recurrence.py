@@ -0,0 +1,69 @@
+"""
+Local expansion of recurring series (app.modules.calendar.recurrence).
+
+A calendar with a few dozen weekly/monthly series is expanded over a
+six-month window: first cold, then again with the memoized occurrences,
+which is what repeated list/search/free-busy reads of a cached window hit.
+
+Run from the server directory:
+    python -m benchmarks.bench_recurrence
+"""
+
+import random
+import time
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from app.modules.calendar.recurrence import expand_events, occurrences
+
+
+ZONE = ZoneInfo("Asia/Jerusalem")
+RULES = [
+    "RRULE:FREQ=WEEKLY;BYDAY=MO,WE,FR",
+    "RRULE:FREQ=WEEKLY;INTERVAL=2;BYDAY=TU",
+    "RRULE:FREQ=DAILY;BYDAY=SU,MO,TU,WE,TH",
+    "RRULE:FREQ=MONTHLY;BYDAY=-1FR",
+    "RRULE:FREQ=MONTHLY;BYMONTHDAY=1,15",
+    "RRULE:FREQ=YEARLY;BYMONTH=3;BYDAY=2TH",
+]
+
+
+def masters(count: int, rng: random.Random) -> list:
+    events = []
+    for i in range(count):
+        start = datetime(2025, 1, 1, 8, tzinfo=ZONE) + timedelta(
+            days=rng.randint(0, 300), minutes=30 * rng.randint(0, 18)
+        )
+        events.append({
+            "id": f"series{i}",
+            "summary": f"Series {i}",
+            "recurrence": [RULES[i % len(RULES)]],
+            "start": {"dateTime": start.isoformat(), "timeZone": "Asia/Jerusalem"},
+            "end": {"dateTime": (start + timedelta(minutes=45)).isoformat(), "timeZone": "Asia/Jerusalem"},
+        })
+    return events
+
+
+def bench(label: str, events: list, start: datetime, end: datetime, repeats: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeats):
+        instances, _ = expand_events(events, start, end)
+    elapsed = (time.perf_counter() - started) / repeats
+    print(f"  {label:28s} {elapsed * 1e3:8.2f} ms  ({len(instances)} instances)")
+    return elapsed
+
+
+def main() -> None:
+    events = masters(40, random.Random(7))
+    start = datetime(2026, 1, 1, tzinfo=ZONE)
+    end = start + timedelta(days=182)
+
+    print(f"{len(events)} series masters, 6 month window")
+    occurrences.cache_clear()
+    cold = bench("cold expansion", events, start, end, 1)
+    warm = bench("memoized expansion", events, start, end, 200)
+    print(f"  speedup x{cold / warm:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Per-call overhead of app.modules.ai.tool_validation versus a bare json.loads.
+
+Run from the server directory:
+    python -m benchmarks.bench_tool_validation
+"""
+
+import json
+import statistics
+import time
+
+from app.modules.ai.calendar_agent import TOOL_VALIDATOR
+
+
+CALLS = [
+    ("list_events", {"start": "2026-01-05T00:00:00+02:00", "end": "2026-01-05T23:59:59+02:00"}),
+    ("create_event", {
+        "summary": "Design review",
+        "start": "2026-01-05T10:00:00+02:00",
+        "end": "2026-01-05T11:00:00+02:00",
+        "description": "Q1 roadmap",
+    }),
+    ("update_event", {
+        "title": "standup",
+        "start": "2026-01-05T00:00:00+02:00",
+        "new_start": "2026-01-05T09:30:00+02:00",
+        "new_end": "2026-01-05T09:45:00+02:00",
+    }),
+    ("delete_event", {"title": "dentist"}),
+    ("find_free_slots", {
+        "start": "2026-01-05T00:00:00+02:00",
+        "end": "2026-01-12T00:00:00+02:00",
+        "duration_minutes": 60,
+        "calendar_ids": ["all"],
+        "working_hours_start": "09:00",
+        "working_hours_end": "17:00",
+        "weekdays": [0, 1, 2, 3, 6],
+    }),
+    # invalid: bad datetime and an unknown field
+    ("list_events", {"start": "tomorrow", "end": "2026-01-05T23:59:59+02:00", "limit": 5}),
+]
+
+
+def bench(label: str, func, repeats: int = 20_000) -> float:
+    payloads = [(name, json.dumps(args)) for name, args in CALLS]
+    timings = []
+    for r in range(repeats):
+        name, raw = payloads[r % len(payloads)]
+        started = time.perf_counter()
+        func(name, raw)
+        timings.append((time.perf_counter() - started) * 1e6)
+    timings.sort()
+    p50 = statistics.median(timings)
+    p99 = timings[int(len(timings) * 0.99) - 1]
+    print(f"  {label:24s} p50 {p50:6.2f} us  p99 {p99:6.2f} us")
+    return p50
+
+
+def main() -> None:
+    print(f"{len(CALLS)} representative tool calls, round robin")
+    base = bench("json.loads only", lambda name, raw: json.loads(raw))
+    full = bench("ToolValidator.validate", TOOL_VALIDATOR.validate)
+    print(f"  validation overhead ~{full - base:.2f} us per call")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,5 +7,5 @@ PORT=${PORT:-8000}
 echo "Starting Chat2Calendar server on port $PORT..."
 
 # Run uvicorn with poetry
-exec poetry run uvicorn app.main:app --host 0.0.0.0 --port "$PORT"
+exec poetry run uvicorn --factory app.main:create_app --host 0.0.0.0 --port "$PORT"
 
@@ -0,0 +1,5 @@
+import os
+
+# Settings are read on first use; give the required ones dummy values.
+for name in ("SECRET_KEY", "GOOGLE_CLIENT_ID", "GOOGLE_CLIENT_SECRET", "OPENAI_API_KEY"):
+    os.environ.setdefault(name, "test")
@@ -0,0 +1,68 @@
+"""One agent turn against AsyncOpenAI with a mocked HTTP transport."""
+
+import asyncio
+import json
+
+import httpx
+from openai import AsyncOpenAI
+
+from app.modules.ai.calendar_agent import CalendarAgent
+from app.modules.ai.memory import ConversationMemory
+from app.modules.ai.recording import RecordingOpenAIClient, TurnRecorder
+
+
+REPLY = "I'm your calendar assistant."
+
+
+def _completion(request: httpx.Request) -> httpx.Response:
+    body = json.loads(request.content)
+    return httpx.Response(200, json={
+        "id": "chatcmpl-test",
+        "object": "chat.completion",
+        "created": 0,
+        "model": body["model"],
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": REPLY},
+            "finish_reason": "stop",
+        }],
+        "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+    })
+
+
+def _client() -> AsyncOpenAI:
+    return AsyncOpenAI(
+        api_key="test",
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(_completion)),
+    )
+
+
+def _run_turn(client) -> str:
+    memory = ConversationMemory()
+    agent = CalendarAgent(
+        client=client,
+        service=object(),
+        memory=memory,
+        model="gpt-test",
+        intent_fast_path=False,
+    )
+    conversation_id = memory.start_conversation("u1")
+    return asyncio.run(agent.handle_user_message(
+        user_id="u1",
+        conversation_id=conversation_id,
+        user_message="hi, who are you?",
+        user_timezone="UTC",
+        access_token="token",
+    ))
+
+
+def test_turn_with_async_client():
+    assert _run_turn(_client()) == REPLY
+
+
+def test_turn_with_recorded_async_client(tmp_path):
+    recorder = TurnRecorder(str(tmp_path / "turns.jsonl"))
+    with recorder.turn("u1", "c1", "hi, who are you?", "UTC", history=[]) as record:
+        reply = _run_turn(RecordingOpenAIClient(_client()))
+    assert reply == REPLY
+    assert len(record["completions"]) == 1
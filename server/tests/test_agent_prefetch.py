@@ -0,0 +1,55 @@
+"""A speculative prefetch must not answer reads made after a write in the same turn."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from app.modules.ai.calendar_agent import CalendarAgent, _active_prefetch, _Prefetch
+from app.modules.ai.memory import ConversationMemory
+
+
+START = datetime(2026, 3, 2, tzinfo=timezone.utc)
+END = START + timedelta(days=1)
+LUNCH = {
+    "id": "evt1", "summary": "Lunch",
+    "start": {"dateTime": "2026-03-02T12:00:00+00:00"}, "end": {"dateTime": "2026-03-02T13:00:00+00:00"},
+}
+
+
+class FakeCalendarService:
+    def __init__(self):
+        self.fetches = 0
+
+    async def get_events(self, *args, **kwargs):
+        self.fetches += 1
+        return [LUNCH]
+
+
+async def _read_around_write(calendar_written):
+    service = FakeCalendarService()
+    agent = CalendarAgent(client=None, service=service, memory=ConversationMemory())
+
+    async def prefetched():
+        return []
+
+    prefetch = _Prefetch("primary", START, END, 100, asyncio.ensure_future(prefetched()))
+    token = _active_prefetch.set(prefetch)
+    try:
+        before = await agent._get_events("token", "primary", START, END)
+        agent._invalidate_cached_events("u1", calendar_written)
+        after = await agent._get_events("token", "primary", START, END)
+    finally:
+        _active_prefetch.reset(token)
+    return before, after, service.fetches
+
+
+def test_write_makes_prefetch_stale():
+    before, after, fetches = asyncio.run(_read_around_write("primary"))
+    assert before == []
+    assert after == [LUNCH]
+    assert fetches == 1
+
+
+def test_write_to_other_calendar_keeps_prefetch():
+    before, after, fetches = asyncio.run(_read_around_write("team@example.com"))
+    assert before == after == []
+    assert fetches == 0
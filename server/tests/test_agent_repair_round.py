@@ -0,0 +1,81 @@
+"""A repair round that re-sends already executed calls must not run them again."""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+from app.modules.ai.calendar_agent import CalendarAgent
+from app.modules.ai.memory import ConversationMemory
+
+
+CREATE_ARGS = {
+    "summary": "Lunch",
+    "start": "2026-03-02T12:00:00+00:00",
+    "end": "2026-03-02T13:00:00+00:00",
+}
+LIST_ARGS = {"start": "2026-03-02T00:00:00+00:00", "end": "2026-03-03T00:00:00+00:00"}
+
+
+def _call(call_id, name, arguments):
+    return SimpleNamespace(id=call_id, function=SimpleNamespace(name=name, arguments=arguments))
+
+
+def _response(content=None, tool_calls=None):
+    message = SimpleNamespace(content=content, tool_calls=tool_calls)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+class ScriptedClient:
+    """Sync OpenAI stand-in that returns the scripted responses in order."""
+
+    def __init__(self, responses):
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+        self._responses = list(responses)
+
+    def create(self, **kwargs):
+        return self._responses.pop(0)
+
+
+class FakeCalendarService:
+    def __init__(self):
+        self.created = 0
+
+    async def create_event(self, access_token, calendar_id, event_data):
+        self.created += 1
+        return {"id": f"evt{self.created}", **event_data}
+
+    async def get_events(self, *args, **kwargs):
+        return []
+
+
+def test_repair_round_does_not_repeat_writes():
+    client = ScriptedClient([
+        # valid create + malformed list: the create runs, the list is sent back
+        _response(tool_calls=[
+            _call("c1", "create_event", json.dumps(CREATE_ARGS)),
+            _call("c2", "list_events", "{not json"),
+        ]),
+        # the model re-sends the whole batch with the list fixed
+        _response(tool_calls=[
+            _call("c3", "create_event", json.dumps(CREATE_ARGS)),
+            _call("c4", "list_events", json.dumps(LIST_ARGS)),
+        ]),
+        _response(content="Lunch is booked."),
+    ])
+    service = FakeCalendarService()
+    memory = ConversationMemory()
+    agent = CalendarAgent(
+        client=client, service=service, memory=memory, model="gpt-test", intent_fast_path=False,
+    )
+    conversation_id = memory.start_conversation("u1")
+
+    reply = asyncio.run(agent.handle_user_message(
+        user_id="u1",
+        conversation_id=conversation_id,
+        user_message="book lunch monday and show me the day",
+        user_timezone="UTC",
+        access_token="token",
+    ))
+
+    assert reply == "Lunch is booked."
+    assert service.created == 1
@@ -0,0 +1,100 @@
+"""Push notifications for channels we no longer track, and fetches racing an invalidation."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from app.modules.calendar.event_cache import EventCache
+from app.modules.calendar.watch_fake import FakeWatchCalendarService
+from app.modules.calendar.watch_manager import CalendarWatchManager
+
+
+START = datetime(2026, 3, 2, tzinfo=timezone.utc)
+END = START + timedelta(days=1)
+
+
+class StoppingService(FakeWatchCalendarService):
+    def __init__(self):
+        super().__init__()
+        self.stopped = []
+
+    async def stop_channel(self, access_token, channel_id, resource_id):
+        self.stopped.append((access_token, channel_id, resource_id))
+        return True
+
+
+def _manager(service):
+    return CalendarWatchManager(service, EventCache(), "https://example.com/hook", signing_key="secret")
+
+
+def _headers(channel, token=None):
+    return {
+        "x-goog-channel-id": channel.channel_id,
+        "x-goog-channel-token": channel.token if token is None else token,
+        "x-goog-resource-id": channel.resource_id,
+        "x-goog-resource-state": "exists",
+    }
+
+
+async def _open(manager, user_id="u1"):
+    manager.ensure_watch(user_id, "token", "primary")
+    await asyncio.gather(*manager._tasks)
+    return manager.channel_for(user_id, "primary")
+
+
+def test_channel_from_before_restart_is_acknowledged_and_stopped():
+    async def run():
+        channel = await _open(_manager(StoppingService()))
+
+        service = StoppingService()
+        restarted = _manager(service)
+        acknowledged = restarted.handle_notification(_headers(channel))
+        await _open(restarted)
+        return channel, acknowledged, service.stopped
+
+    channel, acknowledged, stopped = asyncio.run(run())
+
+    assert acknowledged
+    assert stopped == [("token", channel.channel_id, channel.resource_id)]
+
+
+def test_foreign_channel_is_acknowledged_but_not_stopped():
+    async def run():
+        channel = await _open(_manager(StoppingService()))
+
+        service = StoppingService()
+        other = CalendarWatchManager(service, EventCache(), "https://example.com/hook", signing_key="other")
+        acknowledged = other.handle_notification(_headers(channel))
+        await _open(other)
+        return acknowledged, service.stopped
+
+    acknowledged, stopped = asyncio.run(run())
+
+    assert acknowledged
+    assert stopped == []
+
+
+def test_bad_token_on_live_channel_is_refused():
+    async def run():
+        manager = _manager(StoppingService())
+        channel = await _open(manager)
+        return manager.handle_notification(_headers(channel, token="u1.forged"))
+
+    assert asyncio.run(run()) is False
+
+
+def test_fetch_that_raced_an_invalidation_is_not_cached():
+    cache = EventCache()
+    version = cache.version("u1", "primary")
+    cache.invalidate("u1", "primary")
+    cache.put("u1", "primary", START, END, [], version=version)
+    assert cache.get("u1", "primary", START, END) is None
+
+    version = cache.version("u1", "primary")
+    cache.invalidate("u1")
+    cache.put("u1", "primary", START, END, [], version=version)
+    assert cache.get("u1", "primary", START, END) is None
+
+    version = cache.version("u1", "primary")
+    cache.invalidate("u1", "team@example.com")
+    cache.put("u1", "primary", START, END, [], version=version)
+    assert cache.get("u1", "primary", START, END) == []
@@ -0,0 +1,48 @@
+"""A chat socket client that sends without reading is disconnected, not buffered for."""
+
+import asyncio
+import json
+
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+from app.modules.ai.chat_socket import MAX_QUEUED_FRAMES, POLICY_VIOLATION, ChatSocket
+
+
+class FloodingWebSocket:
+    """Sends message frames as fast as it can and never reads."""
+
+    def __init__(self):
+        self.received = 0
+        self.closed = None
+
+    async def receive(self):
+        self.received += 1
+        await asyncio.sleep(0)
+        return {"type": "websocket.receive", "text": json.dumps({"type": "message", "message": "hi"})}
+
+    async def send_text(self, text):
+        await asyncio.Event().wait()
+
+    async def close(self, code=1000, reason=""):
+        self.closed = (code, reason)
+
+
+def test_flooding_client_is_closed_while_a_turn_runs():
+    websocket = FloodingWebSocket()
+
+    async def run():
+        socket = ChatSocket(websocket, services=None, limiter=None)
+        socket._sender = asyncio.ensure_future(socket._send_loop())
+        turn = asyncio.ensure_future(asyncio.Event().wait())
+        with pytest.raises(WebSocketDisconnect):
+            await socket._await_turn(turn)
+        return socket, turn
+
+    socket, turn = asyncio.run(run())
+
+    assert websocket.closed[0] == POLICY_VIOLATION
+    assert turn.cancelled()
+    assert socket._outbox.qsize() <= MAX_QUEUED_FRAMES
+    # the first frame is taken by the stuck sender, the rest fill the queue
+    assert websocket.received <= MAX_QUEUED_FRAMES + 2
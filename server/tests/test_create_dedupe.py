@@ -0,0 +1,51 @@
+"""A de-duplicated create invalidates cached events even when its first caller was cancelled."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from app.modules.ai.calendar_agent import CalendarAgent
+from app.modules.ai.memory import ConversationMemory
+from app.modules.calendar.event_cache import EventCache
+from app.shared.idempotency import IdempotencyStore
+
+
+START = datetime(2026, 3, 2, tzinfo=timezone.utc)
+END = START + timedelta(days=1)
+ARGS = {"summary": "Lunch", "start": "2026-03-02T12:00:00+00:00", "end": "2026-03-02T13:00:00+00:00"}
+
+
+class SlowCalendarService:
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.created = 0
+
+    async def create_event(self, access_token, calendar_id, event_data):
+        await self.release.wait()
+        self.created += 1
+        return {"id": "evt1", **event_data}
+
+
+def test_cancelled_first_caller_still_invalidates():
+    async def run():
+        service = SlowCalendarService()
+        cache = EventCache()
+        agent = CalendarAgent(
+            client=None, service=service, memory=ConversationMemory(),
+            event_cache=cache, create_dedupe=IdempotencyStore(ttl_seconds=60),
+        )
+        cache.put("u1", "primary", START, END, [])
+
+        first = asyncio.ensure_future(agent._handle_create_event("token", ARGS, "UTC", user_id="u1"))
+        await asyncio.sleep(0)
+        first.cancel()
+        second = asyncio.ensure_future(agent._handle_create_event("token", ARGS, "UTC", user_id="u1"))
+        await asyncio.sleep(0)
+        service.release.set()
+        result = await second
+        return service.created, result, cache.get("u1", "primary", START, END)
+
+    created, result, cached = asyncio.run(run())
+
+    assert created == 1
+    assert result["event"]["id"] == "evt1" and "note" in result
+    assert cached is None
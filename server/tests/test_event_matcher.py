@@ -0,0 +1,58 @@
+"""Update/delete lookups only act without asking on a clear winner."""
+
+import asyncio
+
+from app.modules.ai.calendar_agent import CalendarAgent
+from app.modules.ai.event_matcher import select_events
+from app.modules.ai.memory import ConversationMemory
+
+
+def _event(event_id, summary, hour=10):
+    return {
+        "id": event_id, "summary": summary,
+        "start": {"dateTime": f"2026-03-02T{hour:02d}:00:00+00:00"},
+        "end": {"dateTime": f"2026-03-02T{hour + 1:02d}:00:00+00:00"},
+    }
+
+
+def test_clear_winner_is_auto_selected():
+    events = [_event("e1", "Meeting with John"), _event("e2", "Dentist")]
+    assert select_events(events, "meeting with John") == ([events[0]], True)
+
+
+def test_lone_weak_candidate_is_not_auto_selected():
+    # shares "meeting" with the description but not "John": score 0.5
+    events = [_event("e1", "Meeting with Sarah"), _event("e2", "Dentist")]
+    assert select_events(events, "meeting with John") == ([events[0]], False)
+
+
+def test_close_runner_up_is_not_auto_selected():
+    events = [_event("e1", "Team sync"), _event("e2", "Team sync", hour=14)]
+    matches, auto_selected = select_events(events, "team sync")
+    assert len(matches) == 2 and not auto_selected
+
+
+class FakeCalendarService:
+    def __init__(self, events):
+        self.events = events
+        self.deleted = []
+
+    async def get_events(self, *args, **kwargs):
+        return self.events
+
+    async def delete_event(self, access_token, calendar_id, event_id, user_id=None):
+        self.deleted.append(event_id)
+        return True
+
+
+def test_delete_asks_instead_of_deleting_weak_match():
+    service = FakeCalendarService([_event("e1", "Meeting with Sarah")])
+    agent = CalendarAgent(client=None, service=service, memory=ConversationMemory())
+
+    result = asyncio.run(agent._handle_delete_event(
+        "token", {"title": "meeting with John", "start": "2026-03-02T10:00:00+00:00"}, "UTC",
+    ))
+
+    assert service.deleted == []
+    assert result["ok"] is False
+    assert [c["id"] for c in result["data"]["candidates"]] == ["e1"]
@@ -0,0 +1,55 @@
+"""Calendars freeBusy reports errors for are read from their events, not treated as free."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from app.modules.ai.calendar_agent import CalendarAgent
+from app.modules.ai.memory import ConversationMemory
+from app.modules.calendar.availability import freebusy_failures
+
+
+START = datetime(2026, 3, 2, tzinfo=timezone.utc)
+END = START + timedelta(days=1)
+RESPONSE = {
+    "calendars": {
+        "primary": {"busy": [{"start": "2026-03-02T09:00:00Z", "end": "2026-03-02T10:00:00Z"}]},
+        "team@example.com": {"busy": [], "errors": [{"domain": "global", "reason": "internalError"}]},
+    }
+}
+
+
+class FakeCalendarService:
+    def __init__(self):
+        self.listed = []
+
+    async def query_free_busy(self, access_token, calendar_ids, start, end):
+        return RESPONSE
+
+    async def get_events(self, access_token, calendar_id, **kwargs):
+        self.listed.append(calendar_id)
+        return [{
+            "id": "evt1", "summary": "Planning",
+            "start": {"dateTime": "2026-03-02T14:00:00+00:00"}, "end": {"dateTime": "2026-03-02T15:00:00+00:00"},
+        }]
+
+
+def test_freebusy_failures_include_errors_and_missing_calendars():
+    assert freebusy_failures(RESPONSE, ["primary", "team@example.com", "gone@example.com"]) == [
+        "team@example.com", "gone@example.com",
+    ]
+
+
+def test_failed_calendar_falls_back_to_events():
+    service = FakeCalendarService()
+    agent = CalendarAgent(client=None, service=service, memory=ConversationMemory())
+    agent.use_google_free_busy = True
+
+    busy = asyncio.run(agent._get_busy_intervals(
+        "token", ["primary", "team@example.com"], START, END, timezone.utc,
+    ))
+
+    assert service.listed == ["team@example.com"]
+    assert sorted(busy) == [
+        (datetime(2026, 3, 2, 9, tzinfo=timezone.utc), datetime(2026, 3, 2, 10, tzinfo=timezone.utc)),
+        (datetime(2026, 3, 2, 14, tzinfo=timezone.utc), datetime(2026, 3, 2, 15, tzinfo=timezone.utc)),
+    ]
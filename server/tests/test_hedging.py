@@ -0,0 +1,54 @@
+"""Only requests that answered feed the latency percentile behind the hedge delay."""
+
+import asyncio
+
+from app.modules.calendar.hedging import HedgePolicy, hedge_wins
+
+
+def _policy():
+    policy = HedgePolicy(percentile=50.0, budget=1.0, min_delay_ms=1.0, min_samples=1)
+    policy.observe(20.0)
+    return policy
+
+
+def _slow_then_fast():
+    calls = []
+
+    async def send():
+        calls.append(None)
+        if len(calls) == 1:
+            await asyncio.sleep(10)
+            return "primary"
+        await asyncio.sleep(0.03)
+        return "hedge"
+
+    return send
+
+
+def test_cancelled_loser_is_not_recorded():
+    policy = _policy()
+    wins = hedge_wins.value
+
+    assert asyncio.run(policy.run(_slow_then_fast())) == "hedge"
+
+    assert hedge_wins.value == wins + 1
+    latencies = list(policy._latencies_ms)
+    # the seed and the hedge's own latency; not the primary cut off at ~50ms
+    assert len(latencies) == 2
+    assert 20.0 <= latencies[1] < 1000.0
+
+
+def test_caller_cancellation_records_nothing():
+    policy = _policy()
+
+    async def main():
+        task = asyncio.ensure_future(policy.run(_slow_then_fast()))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(main())
+    assert list(policy._latencies_ms) == [20.0]
@@ -0,0 +1,73 @@
+"""JsonFileJobStore under concurrent saves, retention, and throttled progress saves."""
+
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.shared.jobs import FAILED, SUCCEEDED, Job, JobQueue, JobStore, JsonFileJobStore
+
+
+def _job(n, **kwargs):
+    return Job(id=f"job{n}", user_id="u1", kind="bulk", payload={}, **kwargs)
+
+
+def test_concurrent_saves_keep_every_job(tmp_path):
+    path = str(tmp_path / "jobs.json")
+    store = JsonFileJobStore(path)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(store.save, [_job(n) for n in range(200)]))
+
+    with open(path, encoding="utf-8") as f:
+        assert len(json.load(f)) == 200
+    assert os.listdir(tmp_path) == ["jobs.json"]
+
+
+def test_finished_jobs_are_pruned_after_retention(tmp_path):
+    path = str(tmp_path / "jobs.json")
+    store = JsonFileJobStore(path, retention_seconds=60)
+    long_ago = time.time() - 120
+    store.save(_job(1, status=SUCCEEDED, updated_at=long_ago))
+    store.save(_job(2, status=FAILED, updated_at=time.time()))
+    store.save(_job(3, updated_at=long_ago))  # still queued: kept however old
+
+    assert store.get("job1") is None
+    assert store.get("job2") is not None
+    assert store.get("job3") is not None
+    assert {j.id for j in JsonFileJobStore(path, retention_seconds=60)._jobs.values()} == {"job2", "job3"}
+
+
+class CountingStore(JobStore):
+    def __init__(self):
+        super().__init__()
+        self.saves = 0
+
+    def save(self, job):
+        self.saves += 1
+        super().save(job)
+
+
+def test_progress_saves_are_throttled():
+    store = CountingStore()
+
+    async def handler(ctx):
+        for done in range(1, 101):
+            await ctx.report(done, 100)
+
+    async def run():
+        queue = JobQueue(store=store, workers=1, progress_save_interval=3600)
+        queue.register("bulk", handler)
+        await queue.start()
+        job = await queue.submit("u1", "bulk", {}, "token")
+        seen = [j.done async for j in queue.watch(job.id)]
+        await queue.stop()
+        return job, seen
+
+    job, seen = asyncio.run(run())
+
+    assert job.status == SUCCEEDED and job.done == 100
+    assert seen[-1] == 100
+    # submit, running and finished; none of the hundred reports
+    assert store.saves == 3
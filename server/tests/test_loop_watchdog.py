@@ -0,0 +1,48 @@
+"""Event-loop watchdog, metrics snapshot, and no stdout writes on the request path."""
+
+import asyncio
+import logging
+import time
+
+import httpx
+
+from app.modules.calendar.google_calendar_service import GoogleCalendarService
+from app.shared.loop_watchdog import EventLoopWatchdog
+from app.shared.metrics import Histogram
+
+
+def test_blocking_call_is_reported(caplog):
+    async def run():
+        watchdog = EventLoopWatchdog(interval_ms=10, threshold_ms=50)
+        stalls = watchdog.stall_counter.value
+        watchdog.start()
+        await asyncio.sleep(0.05)
+        time.sleep(0.3)  # blocks the loop
+        await asyncio.sleep(0.05)
+        await watchdog.stop()
+        return watchdog.stall_counter.value - stalls
+
+    with caplog.at_level(logging.WARNING, logger="app.shared.loop_watchdog"):
+        stalls = asyncio.run(run())
+
+    assert stalls >= 1
+    blocked = [r.getMessage() for r in caplog.records if "blocked for" in r.getMessage()]
+    assert blocked and "time.sleep(0.3)" in blocked[0]
+
+
+def test_histogram_snapshot_is_cumulative():
+    histogram = Histogram("test_ms", buckets=(1, 10))
+    for value in (0.5, 5, 5, 50):
+        histogram.observe(value)
+
+    snapshot = histogram.snapshot()
+
+    assert snapshot["count"] == 4 and snapshot["max"] == 50
+    assert snapshot["buckets"] == {"1": 1, "10": 3, "+Inf": 4}
+
+
+def test_delete_event_writes_nothing_to_stdout(capsys):
+    service = GoogleCalendarService(transport=httpx.MockTransport(lambda request: httpx.Response(204)))
+
+    assert asyncio.run(service.delete_event("token", "primary", "evt1"))
+    assert capsys.readouterr().out == ""
@@ -0,0 +1,43 @@
+"""A snapshot holds references taken under the memory lock; later writes must not show through."""
+
+from app.modules.ai.memory import ConversationMemory
+from app.modules.ai.memory_store import ConversationLog
+
+
+def test_export_is_not_changed_by_later_writes():
+    memory = ConversationMemory(max_messages_per_conversation=2)
+    conversation_id = memory.start_conversation("u1")
+    memory.add_message("u1", conversation_id, "user", "m0")
+    memory.add_message("u1", conversation_id, "user", "m1")
+
+    state = ConversationLog._export(memory)
+    memory.add_message("u1", conversation_id, "user", "m2")
+
+    (_, _, _, _, dropped, messages, _), = state
+    assert dropped == 0
+    assert [m.content for m in messages] == ["m0", "m1"]
+    assert [m["content"] for m in memory.get_recent_messages("u1", conversation_id)] == ["m1", "m2"]
+
+
+def test_write_during_snapshot_is_recovered_once(tmp_path):
+    log = ConversationLog(str(tmp_path), flush_interval_ms=60_000, snapshot_growth=0, snapshot_min_bytes=0, fsync=False)
+    memory = ConversationMemory(log=log)
+    conversation_id = memory.start_conversation("u1")
+    memory.add_message("u1", conversation_id, "user", "m0")
+
+    compact = log._compact
+
+    def write_then_compact(state):
+        # the event loop adding a message while the snapshot is serialized
+        assert not memory._lock.locked()
+        memory.add_message("u1", conversation_id, "user", "m1")
+        compact(state)
+
+    log._compact = write_then_compact
+    log.flush()
+    log._compact = compact
+    memory.close()
+
+    recovered = ConversationMemory()
+    ConversationLog(str(tmp_path)).recover(recovered)
+    assert [m["content"] for m in recovered.get_recent_messages("u1", conversation_id)] == ["m0", "m1"]
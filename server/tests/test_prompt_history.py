@@ -0,0 +1,45 @@
+"""Messages that left the recent window stay in the prompt until a summary covers them."""
+
+from app.modules.ai.memory import ConversationMemory
+from app.modules.ai.summarizer import build_prompt_history
+
+
+def _conversation(messages):
+    memory = ConversationMemory()
+    conversation_id = memory.start_conversation("u1")
+    for n in range(messages):
+        memory.add_message("u1", conversation_id, "user", f"m{n}")
+    return memory, conversation_id
+
+
+def _contents(history):
+    return [m["content"] for m in history]
+
+
+def test_unsummarized_messages_outside_window_are_kept():
+    memory, conversation_id = _conversation(8)
+    memory.set_summary("u1", conversation_id, "talked about m0 and m1", 2)
+
+    history = build_prompt_history(memory, "u1", conversation_id, window=4)
+
+    assert _contents(history) == [
+        "Earlier in this conversation: talked about m0 and m1",
+        "m2", "m3", "m4", "m5", "m6", "m7",
+    ]
+
+
+def test_window_is_sent_even_if_summary_covers_it():
+    memory, conversation_id = _conversation(8)
+    memory.set_summary("u1", conversation_id, "everything", 8)
+
+    history = build_prompt_history(memory, "u1", conversation_id, window=4)
+
+    assert _contents(history)[1:] == ["m4", "m5", "m6", "m7"]
+
+
+def test_without_summarizer_only_window_is_sent():
+    memory, conversation_id = _conversation(8)
+
+    history = build_prompt_history(memory, "u1", conversation_id, window=4, summarizing=False)
+
+    assert _contents(history) == ["m4", "m5", "m6", "m7"]
@@ -0,0 +1,123 @@
+"""A recorded turn replays faithfully: concurrent fetches, cache-served reads, pinned settings."""
+
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+
+from openai.types.chat import ChatCompletion
+
+from app.config import settings
+from app.modules.ai.calendar_agent import CalendarAgent
+from app.modules.ai.memory import ConversationMemory
+from app.modules.ai.recording import (
+    STORE_READS,
+    RecordingCalendarService,
+    RecordingOpenAIClient,
+    RecordingStore,
+    TurnRecorder,
+    chat_turn,
+    load_turns,
+    replay_turn,
+)
+from app.modules.auth.profile_cache import ProfileCache
+from app.modules.calendar.event_cache import EventCache
+from app.modules.calendar.google_calendar_service import GoogleCalendarService
+
+
+START = datetime(2026, 3, 2, tzinfo=timezone.utc)
+END = START + timedelta(days=1)
+RANGE = {"start": START.isoformat(), "end": END.isoformat()}
+
+
+def _completion(message):
+    return ChatCompletion.model_validate({
+        "id": "chatcmpl-test", "object": "chat.completion", "created": 0, "model": "gpt-test",
+        "choices": [{"index": 0, "finish_reason": "stop", "message": message}],
+    })
+
+
+def _tool_call(call_id, arguments):
+    return {
+        "id": call_id, "type": "function",
+        "function": {"name": "list_events", "arguments": json.dumps(arguments)},
+    }
+
+
+class ScriptedCompletions:
+    def __init__(self):
+        self.calls = 0
+
+    def create(self, **kwargs):
+        self.calls += 1
+        if self.calls == 1:
+            return _completion({"role": "assistant", "content": None, "tool_calls": [
+                _tool_call("c1", {**RANGE, "calendar_id": "all"}),
+                _tool_call("c2", {**RANGE, "calendar_id": "primary"}),
+            ]})
+        # the reply depends on which calendar each result came from
+        results = [m["content"] for m in kwargs["messages"] if m["role"] == "tool"]
+        return _completion({"role": "assistant", "content": " | ".join(results)})
+
+
+class ScriptedClient:
+    def __init__(self):
+        self.chat = type("Chat", (), {"completions": ScriptedCompletions()})()
+
+
+class SlowFirstService(GoogleCalendarService):
+    """Calendar "a" answers after "b", so calls complete out of start order."""
+
+    async def get_events(self, access_token, calendar_id="primary", start_date=None, end_date=None, max_results=100):
+        await asyncio.sleep(0.05 if calendar_id == "a" else 0)
+        return [{
+            "id": f"evt-{calendar_id}", "summary": f"Event on {calendar_id}",
+            "start": {"dateTime": "2026-03-02T10:00:00+00:00"}, "end": {"dateTime": "2026-03-02T11:00:00+00:00"},
+        }]
+
+
+def _record(path):
+    memory = ConversationMemory()
+    event_cache = EventCache()
+    # the primary calendar's read is served by the cache, not Google
+    event_cache.put("u1", "primary", START, END, [{
+        "id": "evt-cached", "summary": "Cached standup",
+        "start": {"dateTime": "2026-03-02T09:00:00+00:00"}, "end": {"dateTime": "2026-03-02T09:15:00+00:00"},
+    }])
+    profiles = ProfileCache()
+    profiles.put_calendars("u1", [{"id": "a", "selected": True}, {"id": "b", "selected": True}])
+
+    agent = CalendarAgent(
+        client=RecordingOpenAIClient(ScriptedClient()),
+        service=RecordingCalendarService(SlowFirstService()),
+        memory=memory,
+        model="gpt-test",
+        intent_fast_path=False,
+        event_cache=RecordingStore(event_cache, "event_cache", STORE_READS["event_cache"]),
+        profiles=RecordingStore(profiles, "profiles", STORE_READS["profiles"]),
+    )
+    agent.speculative_prefetch = False
+    conversation_id = memory.start_conversation("u1")
+
+    async def run():
+        with chat_turn(TurnRecorder(path), agent, "u1", conversation_id, "what's on monday?", "UTC") as turn:
+            turn["reply"] = await agent.handle_user_message(
+                "u1", conversation_id, "what's on monday?", "UTC", "token",
+            )
+
+    asyncio.run(run())
+    return load_turns(path)[0]
+
+
+def test_replay_matches_recording(tmp_path, monkeypatch):
+    record = _record(str(tmp_path / "turns.jsonl"))
+    assert [c["args"]["calendar_id"] for c in record["google_calls"]] == ["b", "a"]
+    assert record["agent"]["intent_fast_path"] is False
+
+    # this process runs with other settings than the recorded turn
+    monkeypatch.setattr(settings, "intent_fast_path_enabled", True)
+    monkeypatch.setattr(settings, "speculative_prefetch_enabled", True)
+
+    result = asyncio.run(replay_turn(record, model="gpt-test"))
+
+    assert "Cached standup" in result.recorded_reply
+    assert result.reply_matches, (result.recorded_reply, result.replayed_reply)
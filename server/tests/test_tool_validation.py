@@ -0,0 +1,45 @@
+"""Numeric bounds in the tool schemas come back to the model as validation errors."""
+
+import json
+
+from app.modules.ai.calendar_agent import TOOL_VALIDATOR
+
+
+def _free_slots(**overrides):
+    args = {
+        "start": "2025-12-01T00:00:00+00:00",
+        "end": "2025-12-05T00:00:00+00:00",
+        "duration_minutes": 30,
+    }
+    args.update(overrides)
+    return TOOL_VALIDATOR.validate("find_free_slots", json.dumps(args))
+
+
+def _fields(error):
+    return [d["field"] for d in error["details"]]
+
+
+def test_valid_free_slots_call_passes():
+    args, error = _free_slots(max_results=3, weekdays=[0, 4])
+    assert error is None
+    assert args["max_results"] == 3
+
+
+def test_non_positive_duration_is_rejected():
+    for duration in (0, -15):
+        args, error = _free_slots(duration_minutes=duration)
+        assert args is None
+        assert error["error"] == "invalid_arguments"
+        assert _fields(error) == ["duration_minutes"]
+
+
+def test_non_positive_max_results_is_rejected():
+    args, error = _free_slots(max_results=-1)
+    assert args is None
+    assert _fields(error) == ["max_results"]
+
+
+def test_weekday_out_of_range_is_rejected():
+    args, error = _free_slots(weekdays=[1, 7])
+    assert args is None
+    assert _fields(error) == ["weekdays.1"]
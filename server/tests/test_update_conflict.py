@@ -0,0 +1,52 @@
+"""A 412 on update is surfaced as a conflict, never retried over the concurrent edit."""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.modules.ai.calendar_agent import CalendarAgent
+from app.modules.ai.memory import ConversationMemory
+from app.modules.calendar.google_calendar_service import EventConflict, GoogleCalendarService
+
+
+LATEST = {"id": "evt1", "summary": "Lunch with Dana", "etag": '"v2"'}
+
+
+def _service(requests):
+    def handle(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.method == "PATCH":
+            if request.headers.get("If-Match") != LATEST["etag"]:
+                return httpx.Response(412, json={"error": {"code": 412}})
+            return httpx.Response(200, json={**LATEST, **json.loads(request.content), "etag": '"v3"'})
+        return httpx.Response(200, json=LATEST)
+
+    return GoogleCalendarService(transport=httpx.MockTransport(handle))
+
+
+def test_412_raises_conflict_with_latest_event():
+    requests = []
+    service = _service(requests)
+
+    with pytest.raises(EventConflict) as raised:
+        asyncio.run(service.update_event(
+            "token", "primary", "evt1", {"summary": "Lunch"}, etag='"v1"',
+        ))
+
+    assert raised.value.latest == LATEST
+    assert [r.method for r in requests] == ["PATCH", "GET"]
+
+
+def test_agent_reports_conflict_instead_of_updating():
+    requests = []
+    agent = CalendarAgent(client=None, service=_service(requests), memory=ConversationMemory())
+
+    result = asyncio.run(agent._handle_update_event(
+        "token", {"event_id": "evt1", "calendar_id": "primary", "new_summary": "Lunch"}, "UTC",
+    ))
+
+    assert result["ok"] is False
+    assert result["data"]["event"] == LATEST
+    assert sum(r.method == "PATCH" for r in requests) == 1